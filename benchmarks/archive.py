@@ -0,0 +1,66 @@
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.search import describe
+from src.adzuna_stub import make_result
+from src.archive import ArchiveWriter, read_results
+from src.config import ADZUNA_RPS, RESULTS_PER_PAGE
+from src.db import get_engine
+from src.ingest import replay
+
+# Archivo de respuestas (src/archive.py): escribe páginas sintéticas con el formato de
+# Adzuna, las lee en streaming y las recarga en una base vacía con --replay. Compara con
+# el ritmo máximo de la ingesta en vivo según la cuota (ADZUNA_RPS x RESULTS_PER_PAGE).
+# Uso: python -m benchmarks.archive [--rows 100000]
+
+KEYWORDS = ["data analyst", "analista de datos", "business intelligence", "power bi", "sql"]
+
+
+def pages(rows: int):
+    rnd = random.Random(0)
+    for start in range(0, rows, RESULTS_PER_PAGE):
+        results = []
+        for seq in range(start, min(start + RESULTS_PER_PAGE, rows)):
+            r = make_result(KEYWORDS[seq % len(KEYWORDS)], "es", seq)
+            r["title"], r["description"] = describe(rnd, seq)
+            results.append(r)
+        yield KEYWORDS[start // RESULTS_PER_PAGE % len(KEYWORDS)], start // RESULTS_PER_PAGE + 1, {
+            "count": rows, "results": results}
+
+
+def main(rows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "archive"
+        data = list(pages(rows))
+        t0 = time.perf_counter()
+        with ArchiveWriter(root=root) as archive:
+            for kw, page, d in data:
+                archive.write(kw, page, d)
+        write = time.perf_counter() - t0
+        size = sum(p.stat().st_size for p in root.rglob("*.ndjson.gz"))
+        print(f"Synthetic rows: {rows:,} in {len(data):,} pages | write {write:.1f}s "
+              f"({write / len(data) * 1000:.2f} ms/page) | {size / 1e6:.1f} MB gzip")
+
+        t0 = time.perf_counter()
+        n = sum(1 for _ in read_results(root=root))
+        read = time.perf_counter() - t0
+        print(f"Stream read: {n:,} records in {read:.1f}s ({n / read:,.0f} records/s)")
+
+        engine = get_engine(Path(tmp) / "bench.sqlite")
+        t0 = time.perf_counter()
+        replay(engine=engine, root=root, snapshot=False)
+        elapsed = time.perf_counter() - t0
+        live = ADZUNA_RPS * RESULTS_PER_PAGE
+        print(f"Replay into empty db: {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s) | "
+              f"live fetch at quota: {live:,.0f} rows/s -> x{rows / elapsed / live:,.0f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.rows)
@@ -0,0 +1,42 @@
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.indexes import fill
+from benchmarks.search import describe
+from src.db import get_engine, init_db, rebuild_clusters
+from src.enrich import backfill
+
+# Re-enriquecimiento completo (python -m src.enrich --all) con distinto número de
+# procesos sobre ofertas sintéticas ya enriquecidas, como tras subir ENRICH_VERSION.
+# Uso: python -m benchmarks.backfill [--rows 200000] [--workers 1 2 4 8]
+
+
+def main(rows: int, workers: list, chunk: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(Path(tmp) / "bench.sqlite")
+        init_db(engine)
+        fill(engine, rows, describe=describe)
+        rebuild_clusters(engine)
+        backfill(engine, force=True, chunk=chunk)  # features reales (fill las pone al azar)
+        print(f"Synthetic rows: {rows:,} | cores: {os.cpu_count()} | chunk: {chunk}")
+
+        base = None
+        for n in workers:
+            t0 = time.perf_counter()
+            done = backfill(engine, force=True, chunk=chunk, workers=n)
+            elapsed = time.perf_counter() - t0
+            base = base or elapsed
+            print(f"workers={n:<3d} {elapsed:6.1f}s {done / elapsed:9,.0f} rows/s  x{base / elapsed:.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.rows, args.workers, args.chunk)
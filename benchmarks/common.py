@@ -0,0 +1,14 @@
+import time
+
+# Utilidades compartidas por los benchmarks
+
+
+def timed(fn, repeat: int = 1):
+    # Mejor tiempo (s) de repeat ejecuciones de fn() y el resultado de la última
+    best = float("inf")
+    out = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
@@ -0,0 +1,101 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+from benchmarks.indexes import fill
+from benchmarks.search import WORDS, describe
+from src.db import get_engine, init_db, rebuild_clusters, upsert_jobs
+from src.enrich import enrich_rows
+
+# Deduplicación (src/dedup.py) sobre ofertas sintéticas en las que una parte son
+# re-publicaciones de una anterior (copia exacta o con una palabra cambiada, en otra
+# empresa y otra fecha). Mide el recálculo completo, una página de ingesta y
+# precisión / cobertura frente a los grupos reales.
+# Uso: python -m benchmarks.dedup [--rows 300000]
+
+REPOST_SHARE = 0.2
+
+
+def reposting(origins: dict):
+    # describe() que guarda en origins {i: oferta original} las re-publicaciones
+    texts = []
+
+    def make(rnd, i):
+        if texts and rnd.random() < REPOST_SHARE:
+            j = rnd.randrange(len(texts))
+            origins[i] = j
+            title, description = texts[j]
+            if rnd.random() < 0.5:
+                words = description.split()
+                words[rnd.randrange(len(words))] = rnd.choice(WORDS)
+                description = " ".join(words)
+        else:
+            title, description = describe(rnd, i)
+            j = i
+        texts.append(texts[j] if j != i else (title, description))
+        return title, description
+
+    return make
+
+
+def truth_groups(rows: int, origins: dict) -> list:
+    root = list(range(rows))
+    for i, j in origins.items():
+        while root[j] != j:
+            j = root[j]
+        root[i] = j
+    return root
+
+
+def main(rows: int, page: int):
+    origins = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(Path(tmp) / "bench.sqlite")
+        init_db(engine)
+        fill(engine, rows, describe=reposting(origins))
+
+        t0 = time.perf_counter()
+        stats = rebuild_clusters(engine)
+        elapsed = time.perf_counter() - t0
+        print(f"Synthetic rows: {rows:,} ({len(origins):,} re-posts) | full rebuild {elapsed:.1f}s "
+              f"({elapsed / rows * 1e6:.0f} µs/offer) | duplicates={stats['duplicates']:,} groups={stats['groups']:,}")
+
+        with engine.connect() as conn:
+            cluster = dict(conn.execute(text("SELECT job_id, cluster_id FROM job_features")).all())
+        root = truth_groups(rows, origins)
+        found = sum(cluster[f"syn-{i}"] == cluster[f"syn-{j}"] for i, j in origins.items())
+        members = [i for i in range(rows) if cluster[f"syn-{i}"] != f"syn-{i}"]
+        correct = sum(root[i] == root[int(cluster[f"syn-{i}"][4:])] for i in members)
+        print(f"Recall {found / max(len(origins), 1):.3f} (re-posts grouped with their original) | "
+              f"precision {correct / max(len(members), 1):.3f} (grouped offers that are real re-posts)")
+
+        # Una página de ingesta: mitad re-publicaciones de ofertas ya guardadas, mitad nuevas
+        with engine.connect() as conn:
+            sample = conn.execute(text(
+                "SELECT title, company, location, description FROM jobs ORDER BY random() LIMIT :n"
+            ), {"n": page // 2}).mappings().all()
+        new = [dict(r, id=f"repost-{k}", created="2026-01-01T00:00:00Z") for k, r in enumerate(sample)]
+        new += [dict(r, id=f"fresh-{k}", description=f"oferta nueva {k} " + r["description"][::-1])
+                for k, r in enumerate(sample)]
+        t0 = time.perf_counter()
+        upsert_jobs(engine, new, enrich=enrich_rows)
+        elapsed = time.perf_counter() - t0
+        with engine.connect() as conn:
+            flagged = conn.execute(text(
+                "SELECT SUM(job_id LIKE 'repost-%' AND is_canonical = 0), SUM(job_id LIKE 'fresh-%' AND is_canonical = 0) "
+                "FROM job_features WHERE job_id LIKE 'repost-%' OR job_id LIKE 'fresh-%'"
+            )).one()
+        print(f"Ingest page of {len(new)} offers: {elapsed * 1000:.0f} ms | re-posts flagged {flagged[0]}/{len(sample)} "
+              f"| new offers flagged {flagged[1]}/{len(sample)}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--page", type=int, default=50)
+    args = parser.parse_args()
+    main(args.rows, args.page)
@@ -0,0 +1,61 @@
+import argparse
+
+import pandas as pd
+
+from benchmarks.common import timed
+from src.classify import (
+    classify_company, classify_role, extract_city, remote_flag,
+    classify_company_batch, classify_role_batch, extract_city_batch, remote_flag_batch,
+)
+from src.config import DB_PATH
+from src.db import get_engine
+from src.enrich import enrich_row, enrich_frame
+
+# Tiempos de las reglas por fila (Series.apply) frente a las vectorizadas sobre la base de
+# datos real; la paridad se comprueba en tests/test_enrich_parity.py.
+# Uso: python -m benchmarks.enrich [--repeat N]
+
+
+def same(a: pd.Series, b: pd.Series) -> int:
+    # número de filas distintas (None == None)
+    a = a.astype(object).where(a.notna(), None)
+    b = b.astype(object).where(b.notna(), None)
+    return int((a != b).sum())
+
+
+def main(repeat: int = 3):
+    engine = get_engine(DB_PATH)
+    jobs = pd.read_sql("SELECT id, title, company, location, description FROM jobs", engine)
+    text = jobs["title"].fillna("") + " " + jobs["description"].fillna("")
+    print(f"Rows: {len(jobs)} | db={DB_PATH}")
+
+    cases = [
+        ("company_type", lambda: jobs["company"].apply(classify_company), lambda: classify_company_batch(jobs["company"])),
+        ("city", lambda: jobs["location"].apply(extract_city), lambda: extract_city_batch(jobs["location"])),
+        ("role", lambda: jobs["title"].apply(classify_role), lambda: classify_role_batch(jobs["title"])),
+        ("is_remote", lambda: text.apply(remote_flag), lambda: remote_flag_batch(text)),
+        ("enrich (all features)",
+         lambda: pd.DataFrame([enrich_row(r) for r in jobs.to_dict("records")]),
+         lambda: enrich_frame(jobs)),
+    ]
+
+    mismatches = 0
+    for name, by_row, batch in cases:
+        t_row, a = timed(by_row, repeat)
+        t_vec, b = timed(batch, repeat)
+        if isinstance(a, pd.DataFrame):
+            b = b.reset_index(drop=True)
+            diff = sum(same(a[c], b[c]) for c in a.columns)
+        else:
+            diff = same(a, b)
+        mismatches += diff
+        print(f"{name:22s} apply {t_row * 1000:8.1f} ms | vectorized {t_vec * 1000:8.1f} ms "
+              f"| x{t_row / t_vec:5.1f} | mismatches={diff}")
+
+    print("✅ Parity OK" if mismatches == 0 else f"⚠️ {mismatches} mismatching values")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args().repeat)
@@ -0,0 +1,77 @@
+import argparse
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from benchmarks.indexes import CITIES, ROLES, fill
+from src import analytics
+from src.db import get_engine, init_db
+from src.rollups import rebuild
+from src.snapshot import export_snapshot
+
+# Latencia de un cambio de filtro en el dashboard: todas las métricas con los filtros
+# globales (rol, ciudad, fechas, skill, remoto) a partir del cubo de src/analytics/cube.py,
+# sobre una tabla sintética. Mide también la carga del frame y la construcción del cubo,
+# que se hacen una vez por versión de los datos.
+# Uso: python -m benchmarks.filters [--rows 1000000]
+
+TARGET_MS = 200
+
+SCENARIOS = {
+    "role": analytics.Filters(roles=(ROLES[0],)),
+    "2 cities + remote": analytics.Filters(cities=tuple(CITIES[:2]), remote=True),
+    "date range": analytics.Filters(start=date(2024, 3, 1), end=date(2024, 9, 30)),
+    "skill": analytics.Filters(skill="python"),
+    "all filters": analytics.Filters(roles=tuple(ROLES[:2]), cities=(CITIES[0],), start=date(2024, 6, 1),
+                                     end=date(2025, 6, 1), skill="sql", remote=False),
+}
+
+
+def change(ds, filters) -> float:
+    # Lo que recalcula el dashboard al mover un filtro (sin resultados memoizados)
+    ds.recent.clear()
+    t0 = time.perf_counter()
+    for fn, kwargs in analytics.FILTERED_METRICS:
+        fn(ds, **kwargs, filters=filters)
+    return time.perf_counter() - t0
+
+
+def main(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(Path(tmp) / "bench.sqlite")
+        init_db(engine)
+        fill(engine, rows)
+        rebuild(engine)
+        export_snapshot(engine, out_dir=Path(tmp) / "snapshot")
+        ds = analytics.Dataset(engine, version=0, snapshot_dir=Path(tmp) / "snapshot")
+
+        t0 = time.perf_counter()
+        jobs = ds.frame(analytics.metrics.ROWS)
+        t_frame = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        cube = analytics.data_cube(ds)
+        t_cube = time.perf_counter() - t0
+        print(f"Rows in scope: {len(jobs):,} | frame load {t_frame:.2f}s | cube build {t_cube:.2f}s "
+              f"| {cube.cells:,} cells, {cube.nbytes() / 2**20:.0f} MB")
+
+        worst = 0.0
+        for name, filters in SCENARIOS.items():
+            best = min(change(ds, filters) for _ in range(repeat))
+            worst = max(worst, best)
+            print(f"{name:20s} {selected(ds, filters):>10,} offers {best * 1000:8.1f} ms")
+        engine.dispose()
+    mark = "✅" if worst * 1000 < TARGET_MS else "⚠️"
+    print(f"{mark} Slowest filter change {worst * 1000:.0f} ms (target < {TARGET_MS} ms)")
+
+
+def selected(ds, filters) -> int:
+    return analytics.overview(ds, filters=filters)["total"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,72 @@
+import argparse
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.common import timed
+from benchmarks.indexes import fill
+from src import frame, queries
+from src.db import get_engine, init_db
+from src.skills import mask_skills
+
+# Desglose por empresa de la pestaña Companies: frame con strings y listas de skills
+# (explode + groupby, como el dashboard original) frente al frame compacto de src/frame.py.
+# Uso: python -m benchmarks.frame [--rows 1000000]
+
+
+def legacy_breakdown(f: pd.DataFrame) -> pd.DataFrame:
+    company_summary = (
+        f.explode("skills")
+        .groupby(["company", "skills"])
+        .size()
+        .reset_index(name="count")
+        .sort_values(["company", "count"], ascending=[True, False])
+    )
+    skills_agg = (
+        company_summary.groupby("company").head(5)
+        .groupby("company")["skills"]
+        .apply(lambda x: ", ".join([s for s in x if pd.notna(s)]))
+        .reset_index()
+    )
+    company_counts = f["company"].value_counts().reset_index()
+    company_counts.columns = ["company", "offers"]
+    return company_counts.merge(skills_agg, on="company", how="left")
+
+
+def compact_breakdown(f: pd.DataFrame) -> pd.DataFrame:
+    return frame.company_counts(f).merge(frame.company_top_skills(f, 5), on="company", how="left")
+
+
+def mb(f: pd.DataFrame) -> float:
+    return f.memory_usage(deep=True).sum() / 2**20
+
+
+def main(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(Path(tmp) / "bench.sqlite")
+        init_db(engine)
+        fill(engine, rows)
+        jobs = queries.read(engine, f"SELECT j.company, f.city, f.role, f.company_type, j.category, f.skills_mask {queries.SCOPE}")
+        t_sql, _ = timed(lambda: queries.company_top_skills(engine, 5), repeat)
+        engine.dispose()
+
+    legacy = jobs.drop(columns="skills_mask").assign(skills=[mask_skills(m) for m in jobs["skills_mask"]])
+    compact = frame.compact(jobs)
+    print(f"Rows in scope: {len(jobs):,}")
+    print(f"Memory: legacy {mb(legacy):.0f} MB | compact {mb(compact):.0f} MB (x{mb(legacy) / mb(compact):.0f})")
+
+    t_legacy, a = timed(lambda: legacy_breakdown(legacy), repeat)
+    t_compact, b = timed(lambda: compact_breakdown(compact), repeat)
+    key = ["company", "offers", "skills"]
+    same = a[key].sort_values("company").reset_index(drop=True).equals(b[key].sort_values("company").reset_index(drop=True))
+    print(f"Company breakdown: legacy {t_legacy * 1000:.0f} ms | compact {t_compact * 1000:.0f} ms "
+          f"(x{t_legacy / t_compact:.0f}) | SQL company_top_skills {t_sql * 1000:.0f} ms | same result: {same}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
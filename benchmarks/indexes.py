@@ -0,0 +1,120 @@
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import text
+
+from benchmarks.common import timed
+from src import queries
+from src.db import Base, get_engine, init_db
+from src.rollups import rebuild
+from src.skills import SKILLS
+
+# Tiempos de las consultas del dashboard/ingesta sobre una tabla sintética,
+# sin índices y después de migrate() (índices + ANALYZE).
+# Uso: python -m benchmarks.indexes [--rows 1000000]
+
+CITIES = ["Madrid", "Barcelona", "Valencia", "Sevilla", "Bilbao", "Málaga", "Zaragoza", "Alicante", "Murcia", "España"]
+ROLES = ["Data Analyst", "Data Engineer", "BI Analyst", "Data Scientist", "Other"]
+COMPANY_TYPES = ["Direct Employer"] * 8 + ["Staffing / Consulting", "Job Board"]
+
+
+def fill(engine, rows: int, seed: int = 42, describe=None):
+    # describe(rnd, i) -> (title, description); por defecto textos fijos
+    rnd = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    companies = [f"Company {i}" for i in range(5000)]
+
+    raw = engine.raw_connection()
+    cur = raw.cursor()
+    batch_jobs, batch_features = [], []
+    for i in range(rows):
+        created = start + timedelta(minutes=rnd.randrange(0, 2 * 365 * 24 * 60))
+        city = rnd.choice(CITIES)
+        salary = rnd.choice([None, None, rnd.randrange(20, 90) * 1000])
+        job_id = f"syn-{i}"
+        title, description = describe(rnd, i) if describe else (f"Job {i}", "descripción " * 20)
+        batch_jobs.append((
+            job_id, title, rnd.choice(companies), f"{city}, Provincia", "IT Jobs",
+            created.strftime("%Y-%m-%dT%H:%M:%SZ"), created.strftime("%Y-%m-%d %H:%M:%S"),
+            description, f"https://example.com/{i}", salary, salary and salary + 5000,
+        ))
+        batch_features.append((
+            job_id, city, rnd.choice(COMPANY_TYPES), rnd.choice(ROLES),
+            rnd.getrandbits(len(SKILLS)) & rnd.getrandbits(len(SKILLS)), rnd.random() < 0.15,
+        ))
+        if len(batch_jobs) == 50_000 or i == rows - 1:
+            cur.executemany(
+                "INSERT INTO jobs (id, title, company, location, category, created, created_at, description, url, "
+                "salary_min, salary_max) VALUES (?,?,?,?,?,?,?,?,?,?,?)", batch_jobs)
+            cur.executemany(
+                "INSERT INTO job_features (job_id, city, company_type, role, skills_mask, is_remote, enrich_version) "
+                "VALUES (?,?,?,?,?,?,0)", batch_features)
+            raw.commit()
+            batch_jobs, batch_features = [], []
+    raw.close()
+
+
+def drop_indexes(engine):
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+
+SCENARIOS = [
+    ("latest_offers(200)", lambda e: queries.latest_offers(e, 200)),
+    ("jobs since last 7 days", lambda e: e.connect().execute(text(
+        "SELECT COUNT(*) FROM jobs WHERE created_at >= (SELECT datetime(MAX(created_at), '-7 days') FROM jobs)"
+    )).all()),
+    ("daily_trend", queries.daily_trend),
+    ("top_companies(20)", lambda e: queries.top_companies(e, 20)),
+    ("top_cities(10)", queries.top_cities),
+    ("salary_by(role)", lambda e: queries.salary_by(e, "role")),
+    ("company lookup", lambda e: e.connect().execute(text(
+        "SELECT COUNT(*) FROM jobs WHERE company = 'Company 42'"
+    )).all()),
+]
+
+
+def run(engine, repeat):
+    out = {}
+    for name, fn in SCENARIOS:
+        out[name], _ = timed(lambda: fn(engine), repeat)
+    return out
+
+
+def main(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(Path(tmp) / "bench.sqlite")
+        init_db(engine)
+        drop_indexes(engine)
+
+        t0 = time.perf_counter()
+        fill(engine, rows)
+        rebuild(engine)  # fill() escribe directamente en jobs / job_features
+        print(f"Synthetic rows: {rows:,} (loaded in {time.perf_counter() - t0:.1f}s)")
+
+        before = run(engine, repeat)
+        t0 = time.perf_counter()
+        init_db(engine)  # migrate(): crea los índices que faltan
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        print(f"Migration + ANALYZE: {time.perf_counter() - t0:.1f}s")
+        after = run(engine, repeat)
+        engine.dispose()
+
+    print(f"{'query':26s} {'no index':>10s} {'indexed':>10s}")
+    for name in before:
+        print(f"{name:26s} {before[name] * 1000:8.1f}ms {after[name] * 1000:8.1f}ms  x{before[name] / after[name]:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,52 @@
+import time
+
+import pandas as pd
+
+from src.config import DB_PATH
+from src.db import get_engine, init_db
+from src.queries import SALARY, SCOPE, read, salary_percentiles
+from src.sketch import ALPHA, QUANTILES
+
+# Percentiles de salario: sketches (rollup_salary_sketch) frente al cálculo exacto, en
+# tiempo y error relativo con el cuantil exacto "lower" (la cota ALPHA la comprueba
+# tests/test_sketch.py).
+# Uso: python -m benchmarks.salary
+
+
+def exact_lower(engine, group):
+    key = f"+f.{group}" if group else "''"
+    values = read(engine, f"SELECT {key} AS grp, {SALARY} AS v {SCOPE}")
+    values = values[(values["v"] > 0) & values["grp"].notna()]
+    pct = values.groupby("grp")["v"].quantile(list(QUANTILES.values()), interpolation="lower").unstack()
+    pct.columns = list(QUANTILES)
+    return pct
+
+
+def main():
+    engine = get_engine(DB_PATH)
+    init_db(engine)
+    print(f"db={DB_PATH} | alpha={ALPHA}")
+
+    worst = 0.0
+    for group in [None, "city", "role"]:
+        t0 = time.perf_counter()
+        sketch = salary_percentiles(engine, group).set_index(group or "grp")
+        t_sketch = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        salary_percentiles(engine, group, exact=True)
+        t_exact = time.perf_counter() - t0
+
+        exact = exact_lower(engine, group).loc[sketch.index]
+        err = ((sketch[list(QUANTILES)] - exact) / exact).abs().max().max()
+        err = 0.0 if pd.isna(err) else float(err)
+        worst = max(worst, err)
+        print(
+            f"{group or 'global':<7} groups={len(sketch):>4} | max rel err {err:.4%}"
+            f" | sketch {t_sketch * 1000:.1f} ms | exact {t_exact * 1000:.1f} ms"
+        )
+
+    print(f"Worst relative error {worst:.4%} (alpha {ALPHA:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import timed
+from benchmarks.indexes import fill
+from src.db import get_engine, init_db
+from src.search import search
+from src.skills import SKILLS
+
+# Latencia de src.search.search() sobre ofertas sintéticas con texto variado
+# (el índice FTS5 se llena con los triggers durante la carga).
+# Uso: python -m benchmarks.search [--rows 1000000]
+
+ROLES = ["Data Analyst", "Analista de datos", "Data Engineer", "Ingeniero de datos", "BI Developer",
+         "Consultor BI", "Data Scientist", "Científico de datos", "Analytics Engineer", "Técnico de reporting"]
+LEVELS = ["Junior", "Senior", "Lead", "", "", ""]
+WORDS = ("empresa equipo proyecto cliente experiencia conocimientos valorable remoto híbrido oficina "
+         "contrato indefinido salario formación inglés modelos informes cuadros mando negocio ventas "
+         "marketing finanzas logística calidad procesos automatización nube plataforma producto").split()
+
+QUERIES = ["python", "power bi", "ingeniero de datos", "snowflake dbt", "logística airflow", "senior analyt*", "xyzzy"]
+
+
+def describe(rnd, i):
+    title = f"{rnd.choice(LEVELS)} {rnd.choice(ROLES)}".strip()
+    words = rnd.choices(WORDS, k=60) + rnd.sample(SKILLS, k=rnd.randint(0, 5))
+    rnd.shuffle(words)
+    return title, " ".join(words)
+
+
+def main(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(Path(tmp) / "bench.sqlite")
+        init_db(engine)
+        t0 = time.perf_counter()
+        fill(engine, rows, describe=describe)
+        print(f"Synthetic rows: {rows:,} (loaded + indexed in {time.perf_counter() - t0:.1f}s)")
+
+        print(f"{'query':22s} {'hits':>5s} {'latency':>9s}")
+        for query in QUERIES:
+            best, hits = timed(lambda: search(engine, query, limit=50), repeat)
+            print(f"{query:22s} {len(hits):5d} {best * 1000:7.1f}ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,63 @@
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# Credenciales ficticias para el stub y sin caché de respuestas (antes de importar src.config)
+os.environ.setdefault("ADZUNA_APP_ID", "bench")
+os.environ.setdefault("ADZUNA_APP_KEY", "bench")
+os.environ["ADZUNA_CACHE"] = "0"
+
+from src.adzuna_stub import serve  # noqa: E402
+from src.db import get_engine  # noqa: E402
+from src.ingest import ingest  # noqa: E402
+
+# Ingesta por shards (país, keyword) contra el stub local con latencia simulada por
+# petición y sin cuota: el tiempo total debería depender de los workers, no del número
+# de shards (mientras el escritor único no sea el cuello de botella).
+# Uso: python -m benchmarks.shards [--countries 4] [--keywords 10] [--pages 4] [--delay 0.2]
+
+COUNTRY_CODES = ["es", "gb", "fr", "de", "it", "nl", "pl", "at"]
+
+
+def spec(countries: int, keywords: int) -> dict:
+    kws = [f"keyword {k}" for k in range(keywords)]
+    return {c: {"keywords": kws, "rps": 0.0, "burst": 1.0, "daily_limit": 0} for c in COUNTRY_CODES[:countries]}
+
+
+def run(base_url: str, countries: int, keywords: int, pages: int, workers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(Path(tmp) / "bench.sqlite")
+        t0 = time.perf_counter()
+        totals = ingest(pages, spec=spec(countries, keywords), workers=workers, engine=engine,
+                        base_url=base_url, snapshot=False, archive=False)
+        elapsed = time.perf_counter() - t0
+        engine.dispose()
+    return elapsed, totals["inserted"]
+
+
+def main(countries: int, keywords: int, pages: int, delay: float, workers: list):
+    server, base_url = serve(total_per_keyword=pages * 50, delay=delay)
+    results = []
+    # mismo número de workers con más shards, y más workers con los mismos shards
+    for c, w in [(1, workers[-1]), (countries, workers[-1])] + [(countries, w) for w in workers[:-1]]:
+        elapsed, rows = run(base_url, c, keywords, pages, w)
+        results.append((c * keywords, w, elapsed, rows))
+    server.shutdown()
+
+    print(f"Stub latency {delay * 1000:.0f} ms/request, {pages} pages per shard")
+    print(f"{'shards':>6s} {'workers':>7s} {'requests':>8s} {'time':>7s} {'rows/s':>8s}")
+    for shards, w, elapsed, rows in results:
+        print(f"{shards:6d} {w:7d} {shards * pages:8d} {elapsed:6.1f}s {rows / elapsed:8,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--countries", type=int, default=4)
+    parser.add_argument("--keywords", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 8, 16, 32])
+    args = parser.parse_args()
+    main(args.countries, args.keywords, args.pages, args.delay, args.workers)
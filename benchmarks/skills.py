@@ -0,0 +1,53 @@
+import argparse
+import re
+
+import pandas as pd
+
+from benchmarks.common import timed
+from src.config import DB_PATH
+from src.db import get_engine
+from src.skills import SKILLS, SKILL_ALIASES, extract_skills, extract_skills_batch, skills_mask_batch
+
+# Micro-benchmark del extractor de skills sobre las descripciones guardadas.
+# Uso: python -m benchmarks.skills [--repeat N]
+
+
+def extract_skills_legacy(text: str):
+    # Implementación anterior: un re.search (compilado al vuelo) por skill
+    if not text:
+        return []
+    t = text.lower()
+    found = []
+    for s in SKILLS:
+        pattern = r"\b" + re.escape(s) + r"\b"
+        if re.search(pattern, t):
+            found.append(s)
+    return sorted(set(found))
+
+
+def main(repeat: int = 3):
+    engine = get_engine(DB_PATH)
+    df = pd.read_sql("SELECT title, description FROM jobs", engine)
+    texts = df["title"].fillna("") + " " + df["description"].fillna("")
+    print(f"Texts: {len(texts)} | skills: {len(SKILLS)} | db={DB_PATH}")
+
+    t_legacy, legacy = timed(lambda: [extract_skills_legacy(t) for t in texts], repeat)
+    t_single, single = timed(lambda: [extract_skills(t) for t in texts], repeat)
+    t_batch, _ = timed(lambda: extract_skills_batch(texts), repeat)
+    t_mask, _ = timed(lambda: skills_mask_batch(texts), repeat)
+
+    for name, t in [("legacy (per-skill re.search)", t_legacy), ("extract_skills (single pass)", t_single),
+                    ("extract_skills_batch", t_batch), ("skills_mask_batch", t_mask)]:
+        print(f"{name:32s} {t * 1000:9.1f} ms  {len(texts) / t:12,.0f} texts/s  x{t_legacy / t:.1f}")
+
+    # Diferencias esperadas sólo por los alias (pyspark -> spark, postgres -> postgresql, ...)
+    aliases = {a for al in SKILL_ALIASES.values() for a in al}
+    diff = [i for i, (a, b) in enumerate(zip(legacy, single)) if a != b]
+    unexplained = [i for i in diff if not any(a in texts.iloc[i].lower() for a in aliases)]
+    print(f"Rows differing from legacy: {len(diff)} (all alias matches: {not unexplained})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args().repeat)
@@ -0,0 +1,89 @@
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.indexes import fill
+from src.db import get_engine, init_db
+from src.queries import SCOPE, read
+from src.snapshot import SCOPE_FILTER, export_snapshot, load_snapshot
+
+# Carga de las filas del dashboard desde SQLite (pd.read_sql) frente a la copia Parquet.
+# Cada lectura va en un proceso nuevo para medir su pico de RSS por separado.
+# Uso: python -m benchmarks.snapshot [--rows 1000000]
+
+COLUMNS = ["company", "city", "role", "created_at", "skills_mask", "salary_min", "salary_max"]
+SQL_COLUMNS = "j.company, f.city, f.role, j.created_at, f.skills_mask, j.salary_min, j.salary_max"
+
+
+def peak_rss_kb() -> int:
+    # VmHWM es del proceso actual; ru_maxrss puede heredar el pico del padre tras fork + exec
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(source: str, db_path: Path, snapshot_dir: Path):
+    base = peak_rss_kb()
+    t0 = time.perf_counter()
+    if source == "sqlite":
+        jobs = read(get_engine(db_path), f"SELECT {SQL_COLUMNS} {SCOPE}")
+    else:
+        jobs = load_snapshot(COLUMNS, filters=SCOPE_FILTER, snapshot_dir=snapshot_dir)
+    elapsed = time.perf_counter() - t0
+    peak = peak_rss_kb() - base
+    print(json.dumps({
+        "rows": len(jobs), "seconds": elapsed, "peak_rss_mb": peak / 1024,
+        "frame_mb": jobs.memory_usage(deep=True).sum() / 2**20,
+    }))
+
+
+def measure(source, db_path, snapshot_dir):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.snapshot", "--child", source, "--db", str(db_path), "--dir", str(snapshot_dir)],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout)
+
+
+def main(rows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path, snapshot_dir = Path(tmp) / "bench.sqlite", Path(tmp) / "snapshot"
+        engine = get_engine(db_path)
+        init_db(engine)
+        fill(engine, rows)
+
+        t0 = time.perf_counter()
+        export_snapshot(engine, snapshot_dir)
+        size = sum(p.stat().st_size for p in snapshot_dir.rglob("*.parquet")) / 2**20
+        print(f"Synthetic rows: {rows:,} | export {time.perf_counter() - t0:.1f}s | parquet {size:.1f} MB")
+        engine.dispose()
+
+        results = {source: measure(source, db_path, snapshot_dir) for source in ("sqlite", "parquet")}
+
+    print(f"{'source':8s} {'rows':>9s} {'load':>9s} {'peak RSS':>10s} {'frame':>9s}")
+    for source, r in results.items():
+        print(f"{source:8s} {r['rows']:9,d} {r['seconds'] * 1000:7.0f}ms {r['peak_rss_mb']:8.0f}MB {r['frame_mb']:7.0f}MB")
+    sqlite, parquet = results["sqlite"], results["parquet"]
+    print(f"Parquet: x{sqlite['seconds'] / parquet['seconds']:.1f} faster, "
+          f"x{sqlite['peak_rss_mb'] / max(parquet['peak_rss_mb'], 1):.1f} less peak memory")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--child", choices=["sqlite", "parquet"])
+    parser.add_argument("--db", type=Path)
+    parser.add_argument("--dir", type=Path)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.db, args.dir)
+    else:
+        main(args.rows)
@@ -0,0 +1,198 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Credenciales ficticias para el stub y sin caché de respuestas (antes de importar src.config)
+os.environ.setdefault("ADZUNA_APP_ID", "bench")
+os.environ.setdefault("ADZUNA_APP_KEY", "bench")
+os.environ["ADZUNA_CACHE"] = "0"
+
+from benchmarks.common import timed  # noqa: E402
+from benchmarks.filters import change  # noqa: E402
+from benchmarks.synthetic import posting  # noqa: E402
+from src import analytics, frame, queries  # noqa: E402
+from src.adzuna_stub import serve  # noqa: E402
+from src.config import COUNTRY, KEYWORDS, RESULTS_PER_PAGE  # noqa: E402
+from src.db import get_engine, rebuild_clusters  # noqa: E402
+from src.enrich import backfill  # noqa: E402
+from src.ingest import ingest  # noqa: E402
+from src.search import search  # noqa: E402
+from src.skills import extract_skills, skills_mask_batch  # noqa: E402
+from src.snapshot import export_snapshot, load_jobs  # noqa: E402
+
+# Benchmark de extremo a extremo sin red: el stub local sirve ofertas sintéticas
+# (benchmarks/synthetic.py), se ingieren en un jobs.sqlite temporal y se miden el
+# enriquecimiento, la deduplicación, la copia Parquet y cada consulta del dashboard.
+# Resultados en JSON para comparar entre versiones:
+#   python -m benchmarks.suite --sizes 10000 100000 1000000 --out before.json
+#   python -m benchmarks.suite --compare before.json
+# Con --compare sale con código 1 si algún escenario es más lento que la tolerancia.
+
+# Consultas del dashboard (mismos argumentos que dashboard.py)
+DASHBOARD_QUERIES = [
+    ("overview_stats", {}),
+    ("daily_trend", {}),
+    ("duplicate_count", {}),
+    ("top_skills", {}),
+    ("top_cities", {"n": 10}),
+    ("role_counts", {}),
+    ("salary_summary", {}),
+    ("salary_by", {"group": "city"}),
+    ("salary_by", {"group": "role"}),
+    ("latest_offers", {"n": 200}),
+]
+
+# Diferencias por debajo de esto son ruido aunque superen la tolerancia relativa
+MIN_REGRESSION_S = 0.005
+
+
+def quietly(fn):
+    # ingest / backfill informan con print; en el benchmark sólo interesa el tiempo
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn()
+
+
+def all_metrics(engine, snapshot_dir):
+    # Todo el dashboard desde cero (Dataset nuevo, sin memo), como tras una escritura
+    ds = analytics.Dataset(engine, version=0, snapshot_dir=snapshot_dir)
+    for fn, kwargs in analytics.METRICS:
+        fn(ds, **kwargs)
+
+
+def run_size(rows: int, repeat: int) -> list:
+    results = []
+
+    def record(scenario, seconds, n=None):
+        results.append({"rows": rows, "scenario": scenario, "seconds": round(seconds, 6),
+                        "rows_per_s": round(n / seconds) if n and seconds else None})
+        rate = f"{n / seconds:12,.0f} rows/s" if n and seconds else ""
+        print(f"{rows:>9,} {scenario:34s} {seconds * 1000:10.1f} ms {rate}")
+
+    per_keyword = math.ceil(rows / len(KEYWORDS))
+    spec = {COUNTRY: {"keywords": KEYWORDS, "rps": 0.0, "burst": 1.0, "daily_limit": 0}}
+    server, base_url = serve(total_per_keyword=per_keyword, result=posting)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(Path(tmp) / "jobs.sqlite")
+        snapshot_dir = Path(tmp) / "snapshot"
+
+        t0 = time.perf_counter()
+        totals = quietly(lambda: ingest(math.ceil(per_keyword / RESULTS_PER_PAGE), spec=spec, engine=engine,
+                                        base_url=base_url, snapshot=False, archive=False))
+        record("ingest (stub, enrich, dedup)", time.perf_counter() - t0, totals["inserted"])
+        server.shutdown()
+
+        t0 = time.perf_counter()
+        done = quietly(lambda: backfill(engine, force=True))
+        record("enrich.backfill --all", time.perf_counter() - t0, done)
+
+        texts = queries.read(engine, "SELECT title || ' ' || coalesce(description, '') AS text FROM jobs")["text"]
+        best, _ = timed(lambda: [extract_skills(t) for t in texts], 1)
+        record("skills.extract_skills (per row)", best, len(texts))
+        best, _ = timed(lambda: skills_mask_batch(texts), repeat)
+        record("skills.skills_mask_batch", best, len(texts))
+
+        t0 = time.perf_counter()
+        rebuild_clusters(engine)
+        record("dedup.rebuild", time.perf_counter() - t0, rows)
+
+        t0 = time.perf_counter()
+        export_snapshot(engine, out_dir=snapshot_dir)
+        record("snapshot.export", time.perf_counter() - t0, rows)
+
+        for name, kwargs in DASHBOARD_QUERIES:
+            best, _ = timed(lambda: getattr(queries, name)(engine, **kwargs), repeat)
+            label = name + "".join(f" {v}" for v in kwargs.values())
+            record(f"queries.{label}", best)
+
+        columns = ["company", "skills_mask"]
+        best, jobs = timed(lambda: frame.compact(load_jobs(engine, columns, snapshot_dir=snapshot_dir)), repeat)
+        record("frame.load (snapshot)", best, len(jobs))
+        best, _ = timed(lambda: frame.company_counts(jobs), repeat)
+        record("frame.company_counts", best)
+        best, _ = timed(lambda: frame.company_top_skills(jobs), repeat)
+        record("frame.company_top_skills", best)
+
+        best, _ = timed(lambda: all_metrics(engine, snapshot_dir), repeat)
+        record("analytics (all metrics, cold)", best)
+
+        ds = analytics.Dataset(engine, version=0, snapshot_dir=snapshot_dir)
+        best, _ = timed(lambda: analytics.Cube(ds.frame(analytics.metrics.ROWS)), 1)
+        record("analytics.cube build", best, rows)
+        best, _ = timed(lambda: change(ds, analytics.Filters(skill="python", remote=True)), repeat)
+        record("analytics filter change", best)
+
+        best, _ = timed(lambda: search(engine, "python"), repeat)
+        record("search python", best)
+        engine.dispose()
+    return results
+
+
+def meta() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parents[1]).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> int:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["rows"], r["scenario"]): r["seconds"] for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%})")
+    for r in results:
+        old = baseline.get((r["rows"], r["scenario"]))
+        if old is None:
+            continue
+        ratio = r["seconds"] / old if old else float("inf")
+        slower = ratio > 1 + tolerance and r["seconds"] - old > MIN_REGRESSION_S
+        regressions += slower
+        flag = "⚠️ slower" if slower else ""
+        print(f"{r['rows']:>9,} {r['scenario']:34s} {old * 1000:10.1f} -> {r['seconds'] * 1000:10.1f} ms  x{ratio:.2f} {flag}")
+    return regressions
+
+
+def main(sizes: list, repeat: int, out: str, baseline: str | None, tolerance: float):
+    print(f"{'rows':>9s} {'scenario':34s} {'time':>13s}")
+    results = []
+    for rows in sizes:
+        results += run_size(rows, repeat)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta(), "results": results}, f, indent=2)
+    print(f"✅ Results written to {out}")
+    if baseline:
+        regressions = compare(results, baseline, tolerance)
+        if regressions:
+            print(f"⚠️ {regressions} scenario(s) slower than the baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000],
+                        help="filas sintéticas por ejecución (p.ej. 10000 100000 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones de las consultas (se queda la mejor)")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON de una ejecución anterior")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="margen antes de marcar una regresión")
+    args = parser.parse_args()
+    main(args.sizes, args.repeat, args.out, args.compare, args.tolerance)
@@ -0,0 +1,100 @@
+import random
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from src.skills import SKILL_ALIASES, SKILLS
+
+# Ofertas sintéticas con la forma de un resultado de la API de Adzuna (como las que guarda
+# src.ingest.job_row): títulos en español e inglés, descripciones con skills y alias,
+# empresas directas / consultoras / portales, ubicaciones con el formato real (también
+# "España" a secas), salarios a veces vacíos y ~10% de re-publicaciones de una oferta
+# anterior. Determinista: la oferta seq de un keyword es siempre la misma, sin generar
+# las anteriores (el stub puede servir cualquier página).
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+REPOST_SHARE = 0.1
+
+ROLES_ES = ["Analista de datos", "Ingeniero/a de datos", "Científico/a de datos", "Analista BI",
+            "Consultor/a Business Intelligence", "Técnico/a de reporting", "Analista Programador/a SQL"]
+ROLES_EN = ["Data Analyst", "Data Engineer", "Data Scientist", "BI Developer", "Analytics Engineer",
+            "Reporting Analyst", "Machine Learning Engineer", "Power BI Developer"]
+LEVELS = ["Junior", "Senior", "Lead", "Mid", "", "", "", ""]
+SUFFIXES = ["", "", "", " (H/M)", " - Remoto", " | Teletrabajo", " — Híbrido", " (m/f/d)"]
+
+LOCATIONS = [
+    "Madrid, Comunidad de Madrid", "Barcelona, Cataluña", "Valencia, Comunidad Valenciana",
+    "Sevilla, Andalucía", "Málaga, Andalucía", "Bilbao, Vizcaya", "Zaragoza, Aragón",
+    "Granollers, Barcelona", "Alcobendas, Madrid", "Vizcaya, País Vasco", "Madrid", "Barcelona",
+    "España", "España",
+]
+EMPLOYERS = ["Banco Ejemplo", "Retail Corp", "Energía Sur", "Novartis", "TF Bank", "El Corte Ingles",
+             "Telefónica Tech", "Mercadona IT", "Seguros Atlántico", "Logística Norte", "Acme Analytics",
+             "Fintech Madrid", "Hospital Clínico", "Iberia Digital", "Grupo Hotelero Sol"]
+STAFFING = ["Tandem Global HR Consulting", "Adecco", "Randstad", "Page Personnel", "Tobar Consulting",
+            "Talent Search España", "Selección IT"]
+BOARDS = ["domestiko.com", "Indeed", "LinkedIn", "Unknown", ""]
+CATEGORIES = ["Trabajos en informática", "Unknown", "Trabajos en contabilidad y finanzas",
+              "Trabajos en consultoría", "IT Jobs"]
+
+PHRASES = [
+    "Buscamos incorporar a nuestro equipo un perfil con experiencia en",
+    "We are looking for someone comfortable with",
+    "Valorable conocimiento de", "Experience with", "Se requiere dominio de",
+    "Trabajarás con herramientas como", "Nice to have:", "Imprescindible experiencia con",
+]
+FILLER = ("proyecto cliente equipo negocio informes cuadros de mando modelos datos calidad procesos "
+          "automatización nube plataforma producto ventas marketing finanzas logística stakeholders "
+          "dashboards pipelines reporting requirements team growth contrato indefinido salario formación "
+          "inglés oficina flexible").split()
+REMOTE = ["Trabajo 100% remoto.", "Modelo híbrido, 2 días en oficina.", "Teletrabajo parcial.",
+          "Fully remote within Spain.", "", "", "", ""]
+SKILL_WORDS = SKILLS + [a for aliases in SKILL_ALIASES.values() for a in aliases]
+
+
+def _text(rnd: random.Random) -> dict:
+    english = rnd.random() < 0.35
+    role = rnd.choice(ROLES_EN if english else ROLES_ES)
+    title = f"{rnd.choice(LEVELS)} {role}{rnd.choice(SUFFIXES)}".strip()
+    kind = rnd.random()
+    company = rnd.choice(EMPLOYERS if kind < 0.75 else STAFFING if kind < 0.92 else BOARDS)
+    parts = []
+    for _ in range(rnd.randint(3, 8)):
+        skills = rnd.sample(SKILL_WORDS, k=rnd.randint(1, 3))
+        parts.append(f"{rnd.choice(PHRASES)} {', '.join(skills)}. " + " ".join(rnd.choices(FILLER, k=rnd.randint(8, 25))) + ".")
+    parts.append(rnd.choice(REMOTE))
+    return {
+        "title": title,
+        "company": company,
+        "location": rnd.choice(LOCATIONS),
+        "category": rnd.choice(CATEGORIES),
+        "description": " ".join(parts).strip(),
+    }
+
+
+def posting(keyword: str, country: str, seq: int) -> dict:
+    # Resultado de Adzuna número seq del keyword (mismo contrato que adzuna_stub.make_result)
+    seed = zlib.crc32(f"{country}:{keyword}".encode())
+    rnd = random.Random(seed * 1_000_003 + seq)
+    if seq and rnd.random() < REPOST_SHARE:
+        # re-publicación: mismo texto que una oferta anterior, otro id y otra fecha
+        text = _text(random.Random(seed * 1_000_003 + rnd.randrange(seq)))
+    else:
+        text = _text(rnd)
+    created = START + timedelta(minutes=10 * seq + rnd.randrange(10))
+    salary = rnd.choice([None, None, None, rnd.randrange(18, 90) * 1000])
+    return {
+        "id": f"syn-{seed:08x}-{seq}",
+        "title": text["title"],
+        "company": {"display_name": text["company"]} if text["company"] else {},
+        "location": {"display_name": text["location"], "area": [country.upper()]},
+        "category": {"label": text["category"], "tag": "it-jobs"},
+        "created": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "description": text["description"],
+        "redirect_url": f"https://www.adzuna.{country}/details/{seed:08x}{seq}",
+        "salary_min": salary,
+        "salary_max": salary and salary + rnd.choice([0, 4000, 8000, 12000]),
+        "salary_is_predicted": "1" if salary is None or rnd.random() < 0.3 else "0",
+        "contract_type": rnd.choice(["permanent", "contract", None]),
+        "latitude": 40.4 + rnd.uniform(-3, 3),
+        "longitude": -3.7 + rnd.uniform(-4, 4),
+    }
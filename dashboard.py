@@ -1,11 +1,13 @@
-import re
+from datetime import datetime
+
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from sqlalchemy import create_engine
 
-from src.config import DB_PATH
-from src.skills import extract_skills
+from src.config import DB_PATH, SALARY_EXACT
+from src import analytics, trace
+from src.db import get_engine, db_fingerprint, data_pending, schema_pending
+from src.search import search
 
 
 def style_bar(fig, *, height=380, x_title=None, y_title=None):
@@ -138,147 +140,105 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-engine = create_engine(f"sqlite:///{DB_PATH}", future=True)
-df = pd.read_sql("SELECT * FROM jobs", engine)
-
-df = df[df["company"].notna()]
-df = df[df["company"].astype(str).str.strip() != ""]
-df = df[df["company"].astype(str).str.lower() != "unknown"]
-
-df = df[~df["company"].fillna("").str.contains(r"\.com", case=False)]
-job_boards = ["indeed", "linkedin", "infojobs", "jooble", "trabajos.com"]
-df = df[~df["company"].fillna("").str.lower().isin(job_boards)]
-
-
-def classify_company(name):
-    if not name:
-        return "Unknown"
-
-    name_lower = str(name).lower()
-
-    if ".com" in name_lower or "indeed" in name_lower or "linkedin" in name_lower:
-        return "Job Board"
-
-    staffing_keywords = [
-        "ett",
-        "trabajo temporal",
-        "consult",
-        "recruit",
-        "talent",
-        "personnel",
-        "rrhh",
-        "selección",
-        "manpower",
-        "adecco",
-        "randstad",
-        "page personnel",
-    ]
-
-    if any(k in name_lower for k in staffing_keywords):
-        return "Staffing / Consulting"
-
-    return "Direct Employer"
-
-
-df["company_type"] = df["company"].apply(classify_company)
-df = df[df["company_type"] == "Direct Employer"].copy()
-
 
-def extract_city(location):
-    if not location:
-        return None
-    return str(location).split(",")[0].strip()
+@st.cache_resource
+def get_db():
+    # El dashboard no migra ni escribe: eso es `python -m src.db --migrate`
+    return get_engine(DB_PATH)
 
 
-def classify_role(title: str) -> str:
-    t = (title or "").lower()
+@st.cache_resource(max_entries=1)
+def pending_migration(fingerprint):
+    # Se vuelve a comprobar cuando cambia la base de datos (db_fingerprint)
+    schema = schema_pending(get_db())
+    return schema, [] if schema else data_pending(get_db())
 
-    patterns = [
-        ("Data Engineer", r"\bdata engineer\b|\bdata engineering\b|\bingenier[oa] de datos\b|\bdata platform\b"),
-        ("Data Scientist", r"\bdata scientist\b|\bcient[ií]fic[oa] de datos\b|\bml engineer\b|\bmachine learning\b"),
-        ("BI Analyst", r"\bbi\b|\bbusiness intelligence\b|\bpower bi\b|\btableau\b|\bqlik\b"),
-        ("Data Analyst", r"\bdata analyst\b|\banalista de datos\b|\banalyst\b|\banalista\b|\banalytics\b"),
-    ]
 
-    for role, pat in patterns:
-        if re.search(pat, t):
-            return role
-    return "Other"
+# ?diagnostics=1 en la URL: spans de esta ejecución (src/trace.py) en un panel al final
+spans = trace.collect("diagnostics" in st.query_params)
 
+fingerprint = db_fingerprint(DB_PATH)
+schema_todo, data_todo = pending_migration(fingerprint)
+if schema_todo:
+    st.error(
+        f"The database needs migrating ({', '.join(schema_todo)}). "
+        "Run `python -m src.db --migrate` and reload this page."
+    )
+    st.stop()
+if data_todo:
+    st.warning(
+        f"Not migrated yet: {', '.join(data_todo)}. Figures may be incomplete until "
+        "`python -m src.db --migrate` runs."
+    )
 
-def safe_mode(series, default="—"):
-    try:
-        vc = series.value_counts()
-        return vc.index[0] if len(vc) else default
-    except Exception:
-        return default
-
-
-def remote_flag(text: str) -> bool:
-    t = (text or "").lower()
-    keywords = [
-        "remote",
-        "remoto",
-        "teletrabajo",
-        "work from home",
-        "wfh",
-        "fully remote",
-        "100% remote",
-        "híbrido",
-        "hybrid",
-    ]
-    return any(k in t for k in keywords)
-
-
-df["city"] = df["location"].apply(extract_city)
-
-if "created" in df.columns:
-    df["created_dt"] = pd.to_datetime(df["created"], errors="coerce")
-
-df["text"] = (df["title"].fillna("") + " " + df["description"].fillna(""))
-df["skills"] = df["text"].apply(extract_skills)
-df["role"] = df["title"].apply(classify_role)
-
-df = df[df["city"].fillna("").str.lower() != "españa"].copy()
-
-f = df.copy()
-
-total_offers = len(f)
-
-skills_exploded = f.explode("skills")
-top_skill = safe_mode(skills_exploded["skills"].dropna(), default="—")
+# Métricas de src/analytics, calculadas una vez por versión de los datos y compartidas
+# entre sesiones; aquí sólo se pintan
+ds = analytics.dataset(get_db(), salary_exact=SALARY_EXACT)
+
+if fingerprint:
+    # Última escritura en la base de datos (ingesta / backfill)
+    data_as_of = datetime.fromtimestamp(max(p[1] for p in fingerprint) / 1e9)
+    as_of_text = f"Data as of {data_as_of:%Y-%m-%d %H:%M}"
+    latest_offer = analytics.latest_offer_date(ds)
+    if latest_offer:
+        as_of_text += f" · latest offer {latest_offer:%Y-%m-%d}"
+    st.markdown(
+        f"<p class='muted' style='text-align:center; font-size:13px;'>{as_of_text}</p>",
+        unsafe_allow_html=True,
+    )
 
-top_company = safe_mode(f["company"].fillna("Unknown"), default="—")
-top_city = safe_mode(f["city"].fillna("Unknown"), default="—")
+# Filtros globales. Sin filtros todo sale de las rollups; con filtros, del cubo en memoria
+# (src/analytics/cube.py), que se construye la primera vez y sólo se recorta después
+with st.sidebar:
+    st.markdown('<div class="section-title">Filters</div>', unsafe_allow_html=True)
+    roles = st.multiselect("Role", analytics.role_counts(ds)["role"].tolist())
+    cities = st.multiselect("City", analytics.top_cities(ds, n=-1)["city"].tolist())
+    days = analytics.daily_trend(ds)["date"]
+    period = st.date_input(
+        "Posted between", value=(days.min(), days.max()), min_value=days.min(), max_value=days.max(),
+    ) if len(days) else ()
+    skill = st.selectbox("Skill", ["Any", *analytics.top_skills(ds)["skill"]])
+    work_mode = st.radio("Work mode", ["Any", "Remote / hybrid", "On-site"])
+
+filters = analytics.Filters(
+    roles=tuple(roles),
+    cities=tuple(cities),
+    # el rango completo no filtra (incluye las ofertas sin fecha)
+    start=period[0] if len(period) > 0 and period[0] > days.min() else None,
+    end=period[1] if len(period) > 1 and period[1] < days.max() else None,
+    skill=None if skill == "Any" else skill,
+    remote={"Any": None, "Remote / hybrid": True, "On-site": False}[work_mode],
+)
 
-top_city_count = f["city"].fillna("Unknown").value_counts().iloc[0] if len(f) else 0
-top_city_pct = round(100 * top_city_count / len(f), 1) if len(f) else 0.0
-delta_html = f"<span class='kpi-pill'>↑ {top_city_pct}% of offers</span>" if len(f) else ""
+kpis = analytics.kpis(ds, filters=filters)
+total_offers = kpis["total_offers"]
+duplicates = kpis["duplicates"]
+delta_html = f"<span class='kpi-pill'>↑ {kpis['top_city_pct']}% of offers</span>" if total_offers else ""
 
 st.markdown(
     f"""
     <div class="kpi-grid">
       <div class="kpi-card">
-        <div class="kpi-label">Total offers</div>
+        <div class="kpi-label">Unique offers</div>
         <div class="kpi-value">{total_offers}</div>
-        <div class="kpi-sub">Current dataset</div>
+        <div class="kpi-sub">{f"{duplicates} re-posts merged" if duplicates else "Filtered selection" if filters.active else "Current dataset"}</div>
       </div>
 
       <div class="kpi-card">
         <div class="kpi-label">Top skill</div>
-        <div class="kpi-value">{top_skill}</div>
+        <div class="kpi-value">{kpis["top_skill"]}</div>
         <div class="kpi-sub">Most mentioned</div>
       </div>
 
       <div class="kpi-card">
         <div class="kpi-label">Top company</div>
-        <div class="kpi-value">{top_company}</div>
+        <div class="kpi-value">{kpis["top_company"]}</div>
         <div class="kpi-sub">Most listings</div>
       </div>
 
       <div class="kpi-card">
         <div class="kpi-label">Top city</div>
-        <div class="kpi-value">{top_city}{delta_html}</div>
+        <div class="kpi-value">{kpis["top_city"]}{delta_html}</div>
         <div class="kpi-sub">Share of offers</div>
       </div>
     </div>
@@ -286,18 +246,7 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-f = f.copy()
-f["is_remote"] = f["text"].apply(remote_flag) if "text" in f.columns else False
-remote_share = round(100 * f["is_remote"].mean(), 1) if len(f) else 0.0
-
-role_series = f["role"].dropna()
-role_series = role_series[role_series != "Other"]
-top_role = safe_mode(role_series, default="—")
-most_skill = safe_mode(f.explode("skills")["skills"].dropna(), default="—")
-
-city_counts_all = f["city"].fillna("").str.strip().str.lower().value_counts()
-madrid_share = round(100 * city_counts_all.get("madrid", 0) / max(1, len(f)), 1) if len(f) else 0.0
-barcelona_share = round(100 * city_counts_all.get("barcelona", 0) / max(1, len(f)), 1) if len(f) else 0.0
+insights = analytics.insights(ds, filters=filters)
 
 st.markdown(
     f"""
@@ -307,35 +256,35 @@ st.markdown(
       <div class="insight-item">
         <div class="insight-dot"></div>
         <div class="insight-text">
-          <span class="insight-strong">Madrid</span> concentrates <span class="insight-strong">{madrid_share}%</span> of offers.
+          <span class="insight-strong">Madrid</span> concentrates <span class="insight-strong">{insights["madrid_share"]}%</span> of offers.
         </div>
       </div>
 
       <div class="insight-item">
         <div class="insight-dot"></div>
         <div class="insight-text">
-          <span class="insight-strong">Barcelona</span> concentrates <span class="insight-strong">{barcelona_share}%</span> of offers.
+          <span class="insight-strong">Barcelona</span> concentrates <span class="insight-strong">{insights["barcelona_share"]}%</span> of offers.
         </div>
       </div>
 
       <div class="insight-item">
         <div class="insight-dot"></div>
         <div class="insight-text">
-          Top role is <span class="insight-strong">{top_role}</span>.
+          Top role is <span class="insight-strong">{insights["top_role"]}</span>.
         </div>
       </div>
 
       <div class="insight-item">
         <div class="insight-dot"></div>
         <div class="insight-text">
-          Most demanded skill is <span class="insight-strong">{most_skill}</span>.
+          Most demanded skill is <span class="insight-strong">{insights["top_skill"]}</span>.
         </div>
       </div>
 
       <div class="insight-item">
         <div class="insight-dot"></div>
         <div class="insight-text">
-          Remote / hybrid mentions appear in <span class="insight-strong">{remote_share}%</span> of offers.
+          Remote / hybrid mentions appear in <span class="insight-strong">{insights["remote_share"]}%</span> of offers.
         </div>
       </div>
     </div>
@@ -347,7 +296,7 @@ st.markdown("<hr/>", unsafe_allow_html=True)
 
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["Overview", "Companies", "Skills", "Salary", "Data"])
 
-with tab1:
+with tab1, trace.span("tab.overview"):
     st.markdown('<div class="section-title">Market snapshot</div>', unsafe_allow_html=True)
     st.markdown('<div class="muted">High-level view based on the current dataset.</div>', unsafe_allow_html=True)
 
@@ -355,13 +304,7 @@ with tab1:
 
     with c1:
         st.markdown('<div class="section-title">Top skills</div><div class="muted">Top 10</div>', unsafe_allow_html=True)
-        top_skills_df = (
-            f.explode("skills")["skills"]
-            .value_counts()
-            .head(10)
-            .reset_index()
-        )
-        top_skills_df.columns = ["skill", "count"]
+        top_skills_df = analytics.top_skills(ds, n=10, filters=filters)
 
         if len(top_skills_df):
             fig = px.bar(top_skills_df.sort_values("count", ascending=True), x="count", y="skill", orientation="h")
@@ -373,13 +316,7 @@ with tab1:
 
     with c2:
         st.markdown('<div class="section-title">Top cities</div><div class="muted">Top 10</div>', unsafe_allow_html=True)
-        top_cities_df = (
-            f["city"].fillna("Unknown")
-            .value_counts()
-            .head(10)
-            .reset_index()
-        )
-        top_cities_df.columns = ["city", "count"]
+        top_cities_df = analytics.top_cities(ds, filters=filters)
 
         if len(top_cities_df):
             fig = px.bar(top_cities_df.sort_values("count", ascending=True), x="count", y="city", orientation="h")
@@ -392,30 +329,18 @@ with tab1:
     st.markdown("<hr/>", unsafe_allow_html=True)
 
     st.markdown('<div class="section-title">Posting trend</div><div class="muted">Daily volume</div>', unsafe_allow_html=True)
-    if "created_dt" in f.columns and f["created_dt"].notna().any():
-        trend = (
-            f.dropna(subset=["created_dt"])
-            .groupby(f["created_dt"].dt.date)
-            .size()
-            .reset_index(name="offers")
-        )
-        trend.columns = ["date", "offers"]
+    trend = analytics.daily_trend(ds, filters=filters)
+    if len(trend):
         fig = px.line(trend, x="date", y="offers")
         fig.update_layout(height=320, margin=dict(l=10, r=10, t=10, b=10), template="simple_white")
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No valid dates found to plot the trend.")
 
-with tab2:
+with tab2, trace.span("tab.companies"):
     st.markdown('<div class="section-title">Top companies</div><div class="muted">Direct employers with the most listings</div>', unsafe_allow_html=True)
 
-    top_companies_df = (
-        f["company"].fillna("Unknown")
-        .value_counts()
-        .head(20)
-        .reset_index()
-    )
-    top_companies_df.columns = ["company", "offers"]
+    top_companies_df = analytics.company_counts(ds, filters=filters).head(20)
 
     if len(top_companies_df):
         fig = px.bar(top_companies_df.sort_values("offers", ascending=True), x="offers", y="company", orientation="h")
@@ -429,41 +354,12 @@ with tab2:
 
     st.markdown('<div class="section-title">Company breakdown</div><div class="muted">Offers + top skills (Top 5)</div>', unsafe_allow_html=True)
 
-    company_skills = f.explode("skills")
-    company_summary = (
-        company_skills
-        .groupby(["company", "skills"])
-        .size()
-        .reset_index(name="count")
-        .sort_values(["company", "count"], ascending=[True, False])
-    )
-
-    top_skills_per_company = company_summary.groupby("company").head(5)
-    skills_agg = (
-        top_skills_per_company
-        .groupby("company")["skills"]
-        .apply(lambda x: ", ".join([s for s in x if pd.notna(s)]))
-        .reset_index()
-    )
-
-    company_counts = f["company"].value_counts().reset_index()
-    company_counts.columns = ["company", "offers"]
-
-    final_table = company_counts.merge(skills_agg, on="company", how="left")
-    final_table["skills"] = final_table["skills"].fillna("—")
+    st.dataframe(analytics.company_breakdown(ds, n=50, filters=filters), use_container_width=True, hide_index=True)
 
-    st.dataframe(final_table.head(50), use_container_width=True, hide_index=True)
-
-with tab3:
+with tab3, trace.span("tab.skills"):
     st.markdown('<div class="section-title">Explore skills</div><div class="muted">What skills appear most in the dataset</div>', unsafe_allow_html=True)
 
-    top_skills15 = (
-        f.explode("skills")["skills"]
-        .value_counts()
-        .head(15)
-        .reset_index()
-    )
-    top_skills15.columns = ["skill", "count"]
+    top_skills15 = analytics.top_skills(ds, n=15, filters=filters)
 
     if len(top_skills15):
         fig = px.bar(top_skills15.sort_values("count", ascending=True), x="count", y="skill", orientation="h")
@@ -476,149 +372,176 @@ with tab3:
     st.markdown("<hr/>", unsafe_allow_html=True)
 
     st.markdown('<div class="section-title">Skill coverage</div><div class="muted">How many offers mention at least one tracked skill</div>', unsafe_allow_html=True)
-    has_any_skill = f["skills"].apply(lambda x: isinstance(x, list) and len(x) > 0).mean() if len(f) else 0
-    st.metric("Offers with ≥1 tracked skill", f"{round(has_any_skill * 100, 1)}%")
+    st.metric("Offers with ≥1 tracked skill", f"{analytics.skill_coverage(ds, filters=filters)}%")
 
-with tab4:
+with tab4, trace.span("tab.salary"):
     st.markdown(
         '<div class="section-title">Salary intelligence</div>'
         '<div class="muted">Based on Adzuna salary fields when available</div>',
         unsafe_allow_html=True,
     )
 
-    needed = {"salary_min", "salary_max"}
-    if not needed.issubset(set(f.columns)):
-        st.warning(
-            "Salary columns not found in the database yet. "
-            "Make sure you added them to db.py, updated ingest.py, and re-ingested."
-        )
-    else:
-        s = f.copy()
-        s["salary_value"] = s[["salary_min", "salary_max"]].mean(axis=1, skipna=True)
-        s = s[s["salary_value"].notna() & (s["salary_value"] > 0)]
+    salary = analytics.salary_kpis(ds, filters=filters)
+    avg_salary = salary["avg_salary"]
+    med_salary = salary["median_salary"]
 
-        pct_with_salary = round(100 * len(s) / max(1, len(f)), 1)
-        avg_salary = s["salary_value"].mean() if len(s) else None
-        med_salary = s["salary_value"].median() if len(s) else None
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Offers with salary", f"{salary['pct_with_salary']}%")
+    c2.metric("Average salary", f"{avg_salary:,.0f}" if avg_salary else "—")
+    c3.metric("Median salary", f"{med_salary:,.0f}" if med_salary else "—")
 
-        c1, c2, c3 = st.columns(3)
-        c1.metric("Offers with salary", f"{pct_with_salary}%")
-        c2.metric("Average salary", f"{avg_salary:,.0f}" if avg_salary else "—")
-        c3.metric("Median salary", f"{med_salary:,.0f}" if med_salary else "—")
+    p1, p2, p3 = st.columns(3)
+    for col, label, key in [(p1, "P25", "p25_salary"), (p2, "P75", "p75_salary"), (p3, "P90", "p90_salary")]:
+        col.metric(f"{label} salary", f"{salary[key]:,.0f}" if salary[key] else "—")
 
-        st.markdown("<hr/>", unsafe_allow_html=True)
+    st.markdown("<hr/>", unsafe_allow_html=True)
 
-        st.markdown(
-            '<div class="section-title">Average salary by city</div>'
-            '<div class="muted">Top cities with enough salary data</div>',
-            unsafe_allow_html=True,
-        )
+    st.markdown(
+        '<div class="section-title">Average salary by city</div>'
+        '<div class="muted">Top cities with enough salary data</div>',
+        unsafe_allow_html=True,
+    )
+
+    min_n = st.slider("Minimum salary observations per city", 5, 50, 10, step=5)
+    city_salary = analytics.salary_by_city(ds, min_n=min_n, filters=filters)
 
-        city_salary = (
-            s.groupby("city")
-            .agg(avg_salary=("salary_value", "mean"), n=("salary_value", "size"))
-            .reset_index()
+    if len(city_salary):
+        fig = px.bar(
+            city_salary.sort_values("avg_salary", ascending=True),
+            x="avg_salary",
+            y="city",
+            orientation="h",
+            hover_data=["n"],
         )
+        fig.update_traces(
+            texttemplate="€%{x:,.0f}",
+            hovertemplate="%{y}<br><b>€%{x:,.0f}</b><br>n=%{customdata[0]}<extra></extra>",
+        )
+        fig = style_bar(fig, height=420, x_title="avg_salary (€)", y_title="")
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Not enough salary data per city yet. Try lowering the minimum observations slider.")
 
-        min_n = st.slider("Minimum salary observations per city", 5, 50, 10, step=5)
-        city_salary = city_salary[city_salary["n"] >= min_n].sort_values("avg_salary", ascending=False).head(10)
+    st.markdown("<hr/>", unsafe_allow_html=True)
 
-        if len(city_salary):
-            fig = px.bar(
-                city_salary.sort_values("avg_salary", ascending=True),
-                x="avg_salary",
-                y="city",
-                orientation="h",
-                hover_data=["n"],
-            )
-            fig.update_traces(
-                texttemplate="€%{x:,.0f}",
-                hovertemplate="%{y}<br><b>€%{x:,.0f}</b><br>n=%{customdata[0]}<extra></extra>",
-            )
-            fig = style_bar(fig, height=420, x_title="avg_salary (€)", y_title="")
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("Not enough salary data per city yet. Try lowering the minimum observations slider.")
+    st.markdown(
+        '<div class="section-title">Offers by role</div>'
+        '<div class="muted">All offers (not only salary)</div>',
+        unsafe_allow_html=True,
+    )
 
-        st.markdown("<hr/>", unsafe_allow_html=True)
+    fig = px.bar(
+        analytics.role_counts(ds, filters=filters).sort_values("offers", ascending=True),
+        x="offers",
+        y="role",
+        orientation="h",
+    )
+    fig.update_traces(texttemplate="%{x:,}", hovertemplate="%{y}<br><b>%{x:,}</b><extra></extra>")
+    fig = style_bar(fig, height=380, x_title="offers", y_title="")
+    st.plotly_chart(fig, use_container_width=True)
 
-        st.markdown(
-            '<div class="section-title">Offers by role</div>'
-            '<div class="muted">All offers (not only salary)</div>',
-            unsafe_allow_html=True,
-        )
+    st.markdown("<hr/>", unsafe_allow_html=True)
 
-        role_counts = f["role"].value_counts().reset_index()
-        role_counts.columns = ["role", "offers"]
+    st.markdown(
+        '<div class="section-title">Average salary by role</div>'
+        '<div class="muted">Only offers with salary</div>',
+        unsafe_allow_html=True,
+    )
 
+    min_role_n = st.slider("Minimum salary observations per role", 5, 100, 10, step=5)
+    role_salary = analytics.salary_by_role(ds, min_n=min_role_n, filters=filters)
+
+    if len(role_salary):
         fig = px.bar(
-            role_counts.sort_values("offers", ascending=True),
-            x="offers",
+            role_salary.sort_values("avg_salary", ascending=True),
+            x="avg_salary",
             y="role",
             orientation="h",
+            hover_data=["median_salary", "n"],
+        )
+        fig.update_traces(
+            texttemplate="€%{x:,.0f}",
+            hovertemplate="%{y}<br><b>€%{x:,.0f}</b><br>n=%{customdata[1]}<extra></extra>",
         )
-        fig.update_traces(texttemplate="%{x:,}", hovertemplate="%{y}<br><b>%{x:,}</b><extra></extra>")
-        fig = style_bar(fig, height=380, x_title="offers", y_title="")
+        fig = style_bar(fig, height=380, x_title="avg_salary (€)", y_title="")
         st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Not enough salary data per role yet. Try lowering the minimum observations slider.")
 
-        st.markdown("<hr/>", unsafe_allow_html=True)
+    st.markdown("<hr/>", unsafe_allow_html=True)
 
-        st.markdown(
-            '<div class="section-title">Average salary by role</div>'
-            '<div class="muted">Only offers with salary</div>',
-            unsafe_allow_html=True,
-        )
+    st.markdown(
+        '<div class="section-title">Salary bands by role</div>'
+        '<div class="muted">P25 – P75 range, median and P90</div>',
+        unsafe_allow_html=True,
+    )
 
-        role_salary = (
-            s.groupby("role")
-            .agg(
-                avg_salary=("salary_value", "mean"),
-                median_salary=("salary_value", "median"),
-                n=("salary_value", "size"),
-            )
-            .reset_index()
+    if len(role_salary):
+        bands = analytics.salary_bands(ds, min_n=min_role_n, filters=filters).sort_values("median_salary", ascending=True)
+        fig = px.bar(
+            bands,
+            x=bands["p75_salary"] - bands["p25_salary"],
+            y="role",
+            base="p25_salary",
+            orientation="h",
+            hover_data=["p25_salary", "median_salary", "p75_salary", "p90_salary", "n"],
+        )
+        fig.update_traces(
+            texttemplate="",
+            hovertemplate=(
+                "%{y}<br>P25 €%{customdata[0]:,.0f} · <b>median €%{customdata[1]:,.0f}</b>"
+                " · P75 €%{customdata[2]:,.0f}<br>P90 €%{customdata[3]:,.0f} · n=%{customdata[4]}<extra></extra>"
+            ),
+        )
+        fig = style_bar(fig, height=380, x_title="salary (€)", y_title="")
+        fig.add_scatter(
+            x=bands["median_salary"], y=bands["role"], mode="markers",
+            marker=dict(color="black", symbol="line-ns-open", size=18), name="median", hoverinfo="skip",
         )
+        fig.update_layout(showlegend=False)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Not enough salary data per role yet. Try lowering the minimum observations slider.")
 
-        min_role_n = st.slider("Minimum salary observations per role", 5, 100, 10, step=5)
-        role_salary = role_salary[role_salary["n"] >= min_role_n].sort_values("avg_salary", ascending=False)
+with tab5, trace.span("tab.data"):
+    st.markdown('<div class="section-title">Search offers</div><div class="muted">Title and description (full-text index)</div>', unsafe_allow_html=True)
 
-        if len(role_salary):
-            fig = px.bar(
-                role_salary.sort_values("avg_salary", ascending=True),
-                x="avg_salary",
-                y="role",
-                orientation="h",
-                hover_data=["median_salary", "n"],
-            )
-            fig.update_traces(
-                texttemplate="€%{x:,.0f}",
-                hovertemplate="%{y}<br><b>€%{x:,.0f}</b><br>n=%{customdata[1]}<extra></extra>",
-            )
-            fig = style_bar(fig, height=380, x_title="avg_salary (€)", y_title="")
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("Not enough salary data per role yet. Try lowering the minimum observations slider.")
+    search_text = st.text_input("Search", placeholder="e.g. power bi madrid, ingeniero de datos, dbt", label_visibility="collapsed")
 
-with tab5:
-    st.markdown('<div class="section-title">Latest offers</div><div class="muted">Raw data view</div>', unsafe_allow_html=True)
+    if search_text.strip():
+        results = search(get_db(), search_text, limit=200)
+        st.caption(f"{len(results)} matching offers (top 200 by relevance among the most recent postings)")
+        st.dataframe(results.drop(columns="id"), use_container_width=True, hide_index=True)
+        st.markdown("<hr/>", unsafe_allow_html=True)
 
-    cols = ["created", "title", "company", "city", "category", "url"]
-    cols = [c for c in cols if c in f.columns]
+    st.markdown('<div class="section-title">Latest offers</div><div class="muted">Raw data view</div>', unsafe_allow_html=True)
 
+    # con filtros puede haber muy pocas ofertas: el slider necesita al menos un paso
+    max_rows = max(100, min(5000, total_offers))
     n_rows = st.slider(
         "Rows to display",
         min_value=50,
-        max_value=min(5000, len(f)) if len(f) else 50,
-        value=200,
+        max_value=max_rows,
+        value=min(200, max_rows),
         step=50,
     )
 
     st.dataframe(
-        f.sort_values("created", ascending=False)[cols].head(n_rows),
+        analytics.latest_offers(ds, filters=filters).head(n_rows),
         use_container_width=True,
         hide_index=True,
     )
 
+if spans is not None:
+    with st.expander("Diagnostics", expanded=True):
+        st.caption("Spans of this run: what was computed (memo misses), SQL and per-tab render time")
+        if spans:
+            st.dataframe(
+                pd.DataFrame(spans).drop(columns=["ts", "thread", "pid"]), use_container_width=True, hide_index=True,
+            )
+        else:
+            st.info("Nothing traced in this run.")
+
 st.markdown("---")
 st.markdown(
     """
@@ -1,19 +1,192 @@
+import math
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 import requests
-from .config import ADZUNA_APP_ID, ADZUNA_APP_KEY, COUNTRY
+from requests.adapters import HTTPAdapter
+
+from .config import (
+    ADZUNA_APP_ID, ADZUNA_APP_KEY, ADZUNA_BASE_URL, COUNTRY, FETCH_WORKERS,
+    ADZUNA_RPS, ADZUNA_BURST, ADZUNA_DAILY_LIMIT, ADZUNA_MAX_RETRIES,
+    ADZUNA_CACHE, ADZUNA_CACHE_PATH, ADZUNA_CACHE_TTL, ADZUNA_CACHE_MAX_MB,
+)
+from .http_cache import ResponseCache
+from .rate_limit import QuotaExhausted, RequestScheduler
+from .trace import span
 
-BASE_URL = "https://api.adzuna.com/v1/api/jobs"
+BASE_URL = ADZUNA_BASE_URL
 
 class AdzunaClient:
-    def search_jobs(self, keyword: str, page: int = 1, results_per_page: int = 20):
-        url = f"{BASE_URL}/{COUNTRY}/search/{page}"
-        
+    def __init__(self, base_url: str = BASE_URL, max_workers: int = FETCH_WORKERS, timeout: int = 30,
+                 scheduler: RequestScheduler | None = None, cache: ResponseCache | None = None,
+                 schedulers: dict | None = None):
+        # schedulers: {país: RequestScheduler} con la cuota de cada mercado (src/shards.py);
+        # los países que no están usan scheduler
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.scheduler = scheduler or RequestScheduler(
+            rate=ADZUNA_RPS,
+            burst=ADZUNA_BURST,
+            daily_limit=ADZUNA_DAILY_LIMIT,
+            max_retries=ADZUNA_MAX_RETRIES,
+        )
+        self.schedulers = schedulers or {}
+        self.exhausted = set()  # países sin cuota en el último fetch_pages
+        if cache is None and ADZUNA_CACHE:
+            cache = ResponseCache(ADZUNA_CACHE_PATH, ttl=ADZUNA_CACHE_TTL, max_bytes=int(ADZUNA_CACHE_MAX_MB * 1e6))
+        self.cache = cache
+
+        # Sesión compartida: reutiliza conexiones keep-alive entre peticiones y threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def search_jobs(self, keyword: str, page: int = 1, results_per_page: int = 20, country: str = COUNTRY,
+                    **filters):
+        # filters: parámetros extra de Adzuna (sort_by, max_days_old, ...)
+        url = f"{self.base_url}/{country}/search/{page}"
+        scheduler = self.schedulers.get(country, self.scheduler)
+
         params = {
             "app_id": ADZUNA_APP_ID,
             "app_key": ADZUNA_APP_KEY,
             "results_per_page": results_per_page,
             "what": keyword,
+            **filters,
         }
 
-        response = requests.get(url, params=params, timeout=30)
+        with span("api.fetch", country=country, keyword=keyword, page=page) as s:
+            response, cached = self._get(scheduler, url, params)
+            s.set(cached=response is None)
+        with span("api.parse") as s:
+            data = (cached if response is None else response).json()
+            s.set(rows=len(data.get("results") or []))
+        return data
+
+    def _get(self, scheduler, url, params):
+        # (response, None) o (None, entrada de caché) si la caché sirve la respuesta
+        if self.cache is None:
+            response = scheduler.send(lambda: self.session.get(url, params=params, timeout=self.timeout))
+            response.raise_for_status()
+            return response, None
+
+        # Con caché: fresca -> sin petición; caducada -> petición condicional
+        key = self.cache.key(url, params)
+        cached, fresh = self.cache.get(key)
+        if fresh:
+            return None, cached
+        headers = cached.validators() if cached else {}
+        response = scheduler.send(
+            lambda: self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        )
+        if response.status_code == 304 and cached:
+            self.cache.refresh(key)
+            return None, cached
         response.raise_for_status()
-        return response.json()
+        self.cache.put(key, url, response.content,
+                       response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return response, None
+
+    def _daily_limited(self, country: str) -> bool:
+        return bool(self.schedulers.get(country, self.scheduler).daily_limit)
+
+    def fetch_pages(self, keywords, max_pages: int, results_per_page: int = 20,
+                    filters_by_keyword=None, stop=None, per_keyword: int | None = None):
+        # Descarga páginas de varios keywords en paralelo (como mucho max_workers en vuelo).
+        # keywords: keywords de COUNTRY o shards (país, keyword) de varios mercados.
+        # Un keyword deja de pedir páginas en cuanto una vuelve vacía o stop(kw, results) es True.
+        # filters_by_keyword: {keyword: {parámetros extra}} para search_jobs.
+        # per_keyword: máximo de páginas en vuelo por keyword (evita pedir páginas de más).
+        # Con el "count" de la primera respuesta ya no se piden páginas más allá del final; en
+        # los mercados con cuota diaria, hasta conocerlo sólo va una página en vuelo por keyword.
+        # Devuelve (keyword, page, data) según van llegando, no en orden.
+        # Si un país agota su cuota se dejan sus keywords (quedan en self.exhausted) y siguen
+        # los demás. Si una petición falla por otra causa se deja de pedir, se entregan las que
+        # ya estaban en vuelo y se relanza el error al final.
+        keywords = list(keywords)
+        country = {kw: kw[0] if isinstance(kw, tuple) else COUNTRY for kw in keywords}
+        next_page = {kw: 1 for kw in keywords}
+        last_page = {}  # keyword -> primera página que ya no se entrega
+        total_pages = {}  # keyword -> páginas según el "count" de Adzuna
+        pending = {}
+        in_flight = {kw: 0 for kw in keywords}
+        error = None
+        self.exhausted = set()
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        def fill():
+            if error is not None:
+                return
+            progressed = True
+            while progressed and len(pending) < self.max_workers:
+                progressed = False
+                for kw in keywords:
+                    if len(pending) >= self.max_workers:
+                        break
+                    page = next_page[kw]
+                    if kw in last_page or page > min(max_pages, total_pages.get(kw, max_pages)):
+                        continue
+                    if per_keyword and in_flight[kw] >= per_keyword:
+                        continue
+                    if in_flight[kw] and kw not in total_pages and self._daily_limited(country[kw]):
+                        continue
+                    filters = (filters_by_keyword or {}).get(kw, {})
+                    keyword = kw[1] if isinstance(kw, tuple) else kw
+                    fut = pool.submit(self.search_jobs, keyword, page=page, results_per_page=results_per_page,
+                                      country=country[kw], **filters)
+                    pending[fut] = (kw, page)
+                    in_flight[kw] += 1
+                    next_page[kw] = page + 1
+                    progressed = True
+
+        try:
+            fill()
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    kw, page = pending.pop(fut)
+                    in_flight[kw] -= 1
+                    if page >= last_page.get(kw, max_pages + 1):
+                        # página especulativa más allá del final del keyword
+                        continue
+                    try:
+                        data = fut.result()
+                    except QuotaExhausted:
+                        # sólo se para ese mercado; lo ya en vuelo se entrega
+                        self.exhausted.add(country[kw])
+                        for other in keywords:
+                            if country[other] == country[kw] and other not in last_page:
+                                last_page[other] = next_page[other]
+                        continue
+                    except Exception as e:
+                        # no pedimos más, pero entregamos lo que ya está en vuelo
+                        error = error or e
+                        continue
+                    if isinstance(data.get("count"), int):
+                        total_pages[kw] = math.ceil(data["count"] / results_per_page)
+                    results = data.get("results") or []
+                    if not results:
+                        last_page[kw] = min(page, last_page.get(kw, page))
+                        continue
+                    if stop is not None and stop(kw, results):
+                        # esta página se entrega, las siguientes no
+                        last_page[kw] = min(page + 1, last_page.get(kw, page + 1))
+                    yield kw, page, data
+                fill()
+            if error is not None:
+                raise error
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
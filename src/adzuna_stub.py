@@ -0,0 +1,138 @@
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Servidor HTTP local que imita /{country}/search/{page} de Adzuna con JSON enlatado.
+# Uso: python -m src.adzuna_stub --port 8765
+#      ADZUNA_BASE_URL=http://127.0.0.1:8765 python -m src.ingest
+
+CITIES = ["Madrid, Comunidad de Madrid", "Barcelona, Cataluña", "Valencia, Comunidad Valenciana", "Sevilla, Andalucía"]
+COMPANIES = ["Acme Analytics", "Banco Ejemplo", "Retail Corp", "Energía Sur"]
+
+PATH_RE = re.compile(r"^/(?P<country>[a-z]{2})/search/(?P<page>\d+)$")
+
+
+# Las ofertas forman una línea temporal: la n-ésima se publica n horas después de EPOCH.
+# Con más total aparecen ofertas nuevas (ids nuevos) y las antiguas no cambian.
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_result(keyword: str, country: str, seq: int) -> dict:
+    seed = zlib.crc32(f"{country}:{keyword}".encode())
+    created = EPOCH + timedelta(hours=seq)
+    return {
+        "id": f"stub-{seed:08x}-{seq}",
+        "title": f"{keyword.title()} #{seq}",
+        "company": {"display_name": COMPANIES[seq % len(COMPANIES)]},
+        "location": {"display_name": CITIES[seq % len(CITIES)]},
+        "category": {"label": "IT Jobs"},
+        "created": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "description": f"Buscamos perfil {keyword} con SQL, Python y Power BI.",
+        "redirect_url": f"https://example.com/jobs/{seq}",
+        "salary_min": 28000 + 1000 * (seq % 10),
+        "salary_max": 36000 + 1000 * (seq % 10),
+        "salary_is_predicted": "0",
+    }
+
+
+def make_page(keyword: str, country: str, page: int, results_per_page: int, total: int,
+              max_days_old: int | None = None, result=make_result) -> dict:
+    # result(keyword, country, seq) -> oferta; p.ej. benchmarks.synthetic.posting
+    # Más recientes primero (equivale a sort_by=date)
+    seqs = range(total - 1, -1, -1)
+    if max_days_old is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_days_old)
+        seqs = [s for s in seqs if EPOCH + timedelta(hours=s) >= cutoff]
+    start = (page - 1) * results_per_page
+    return {
+        "count": len(seqs),
+        "results": [result(keyword, country, s) for s in seqs[start:start + results_per_page]],
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        if self.server.delay:
+            time.sleep(self.server.delay)  # latencia de red simulada
+        if self.server.throttle_every and next(self.server.counter) % self.server.throttle_every == 0:
+            # simula la cuota de Adzuna
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        url = urlparse(self.path)
+        m = PATH_RE.match(url.path)
+        if not m:
+            self.send_error(404)
+            return
+
+        qs = parse_qs(url.query)
+        keyword = qs.get("what", [""])[0]
+        results_per_page = int(qs.get("results_per_page", ["20"])[0])
+        max_days_old = int(qs["max_days_old"][0]) if "max_days_old" in qs else None
+        page = make_page(keyword, m["country"], int(m["page"]), results_per_page,
+                         self.server.total_per_keyword, max_days_old, self.server.result)
+
+        body = json.dumps(page).encode()
+        etag = f'"{zlib.crc32(body):08x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(port: int = 0, total_per_keyword: int = 500, throttle_every: int = 0, delay: float = 0,
+                result=make_result):
+    # throttle_every=N: una de cada N peticiones responde 429 con Retry-After
+    # delay: segundos de espera antes de cada respuesta
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.total_per_keyword = total_per_keyword
+    server.throttle_every = throttle_every
+    server.delay = delay
+    server.result = result
+    server.counter = itertools.count(1)
+    return server
+
+
+def serve(port: int = 0, total_per_keyword: int = 500, throttle_every: int = 0, delay: float = 0,
+          result=make_result):
+    # Arranca el stub en un thread; devuelve (server, base_url). Parar con server.shutdown().
+    server = make_server(port, total_per_keyword, throttle_every, delay, result)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--total", type=int, default=500, help="resultados por keyword")
+    parser.add_argument("--throttle-every", type=int, default=0, help="devuelve 429 cada N peticiones")
+    parser.add_argument("--delay", type=float, default=0, help="segundos de latencia por petición")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.total, args.throttle_every, args.delay)
+    print(f"Adzuna stub on http://127.0.0.1:{args.port}")
+    server.serve_forever()
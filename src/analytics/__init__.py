@@ -0,0 +1,10 @@
+# Motor de métricas del dashboard sin Streamlit: funciones puras de un Dataset (los datos
+# en una versión de la base de datos), memoizadas por versión. dashboard.py sólo pinta;
+# python -m src.analytics las precalcula todas.
+from .cube import Cube, Selection
+from .dataset import NO_FILTERS, Dataset, Filters, dataset, metric
+from .metrics import (
+    FILTERED_METRICS, METRICS, company_breakdown, company_counts, daily_trend, data_cube, insights, kpis, latest_offer_date,
+    latest_offers, overview, role_counts, salary_bands, salary_by_city, salary_by_role, salary_kpis, selection,
+    skill_coverage, top_cities, top_skills,
+)
@@ -0,0 +1,30 @@
+import time
+
+from ..config import DB_PATH
+from ..db import get_engine, init_db
+from . import FILTERED_METRICS, METRICS, Filters, data_cube, dataset, role_counts
+
+# Calcula todas las métricas del dashboard sobre DB_PATH y mide cada una (en frío: las
+# consultas y frames compartidos se cargan en la primera métrica que los usa). Después
+# construye el cubo de los filtros y mide un cambio de filtro (el rol más frecuente).
+if __name__ == "__main__":
+    engine = get_engine(DB_PATH)
+    init_db(engine)
+    ds = dataset(engine)
+    t_start = time.perf_counter()
+    for fn, kwargs in METRICS:
+        t0 = time.perf_counter()
+        fn(ds, **kwargs)
+        label = fn.__name__ + "".join(f" {k}={v}" for k, v in kwargs.items())
+        print(f"{label:24s} {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+    t0 = time.perf_counter()
+    cube = data_cube(ds)
+    print(f"{'cube':24s} {(time.perf_counter() - t0) * 1000:8.1f} ms  ({cube.cells:,} cells, {cube.nbytes() / 2**20:.1f} MB)")
+    roles = role_counts(ds)
+    filters = Filters(roles=tuple(roles["role"].head(1)))
+    t0 = time.perf_counter()
+    for fn, kwargs in FILTERED_METRICS:
+        fn(ds, **kwargs, filters=filters)
+    print(f"{'filter change':24s} {(time.perf_counter() - t0) * 1000:8.1f} ms  ({', '.join(filters.roles)})")
+    print(f"✅ Analytics | version={ds.version} | metrics={len(METRICS)} | {time.perf_counter() - t_start:.2f}s")
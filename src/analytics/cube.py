@@ -0,0 +1,264 @@
+import numpy as np
+import pandas as pd
+
+from .. import frame
+from ..sketch import LOG_GAMMA, QUANTILES, bucket_value
+from ..skills import SKILLS
+from .dataset import Filters
+
+# Cubo de las ofertas del dashboard para los filtros globales: una celda por combinación
+# (skill, día, ciudad, rol, remoto) con ofertas, ofertas con skill, nº y suma de salarios
+# y su sketch de cuantiles (src/sketch.py). La skill 0 cuenta todas las ofertas y la
+# skill i + 1 sólo las que mencionan SKILLS[i] (una oferta está en varias). Las celdas
+# van ordenadas por skill: filtrar es una máscara sobre las celdas de una skill y agregar
+# un bincount, sin recorrer ofertas. Las de la skill 0 guardan además las menciones de
+# cada skill y row_cell lleva cada fila del frame a su celda, para las vistas por oferta
+# (empresas, últimas ofertas).
+
+UNKNOWN_CITY = "Unknown"
+
+
+def salary_values(rows: pd.DataFrame) -> np.ndarray:
+    # Media de salary_min / salary_max ignorando nulos (queries.SALARY); NaN sin salario
+    lo = rows["salary_min"].to_numpy(dtype=float)
+    hi = rows["salary_max"].to_numpy(dtype=float)
+    return np.where(np.isnan(lo), hi, np.where(np.isnan(hi), lo, (lo + hi) / 2))
+
+
+def _codes(col: pd.Series) -> tuple:
+    # códigos de una columna category y sus etiquetas; nulos -> "" (como en las rollups)
+    col = col.astype("category")
+    labels = np.array([*col.cat.categories.astype(str), ""], dtype=object)
+    codes = col.cat.codes.to_numpy().astype(np.int64)
+    return np.where(codes < 0, len(labels) - 1, codes), labels
+
+
+class Cube:
+    def __init__(self, rows: pd.DataFrame):
+        n = len(rows)
+        created = pd.to_datetime(rows["created_at"])
+        if created.dt.tz is not None:
+            created = created.dt.tz_localize(None)
+        days = created.to_numpy(dtype="datetime64[D]")
+        dated = ~np.isnat(days)
+        self.day0 = days[dated].min() if dated.any() else np.datetime64("1970-01-01")
+        day = np.where(dated, (days - self.day0).astype(np.int64), -1)
+        # el último código de día es "sin fecha"
+        self.undated = int(day.max(initial=-1)) + 1
+        day[~dated] = self.undated
+
+        city, self.city_labels = _codes(rows["city"])
+        role, self.role_labels = _codes(rows["role"])
+        remote = rows["is_remote"].fillna(0).to_numpy().astype(bool).astype(np.int64)
+        self.masks = rows["skills_mask"].to_numpy().astype(frame.MASK_DTYPE)
+        self.created = created.to_numpy(dtype="datetime64[us]").view(np.int64)
+        self.ids = rows["id"].to_numpy(dtype=object)
+        self.salary = salary_values(rows)
+
+        # una fila por oferta (skill 0) y otra por cada skill que menciona
+        pair_row, pair_skill = np.nonzero(frame.skill_matrix(self.masks))
+        row = np.concatenate([np.arange(n), pair_row])
+        skill = np.concatenate([np.zeros(n, dtype=np.int64), pair_skill + 1])
+        shape = (len(SKILLS) + 1, self.undated + 1, len(self.city_labels), len(self.role_labels), 2)
+        key = np.ravel_multi_index((skill, day[row], city[row], role[row], remote[row]), shape)
+        cells, inverse = np.unique(key, return_inverse=True)
+        inverse = inverse.ravel()
+        self.skill, self.day, self.city, self.role, self.remote = np.unravel_index(cells, shape)
+        self.offsets = np.searchsorted(self.skill, np.arange(len(SKILLS) + 2))
+        self.row_cell = inverse[:n]
+
+        m = len(cells)
+        self.offers = np.bincount(inverse, minlength=m)
+        self.with_skill = np.bincount(inverse, weights=self.masks[row] != 0, minlength=m).astype(np.int64)
+        salary = self.salary[row]
+        paid = salary > 0
+        self.salary_n = np.bincount(inverse[paid], minlength=m)
+        self.salary_sum = np.bincount(inverse[paid], weights=salary[paid], minlength=m)
+        self.mentions = np.bincount(
+            self.row_cell[pair_row] * len(SKILLS) + pair_skill, minlength=self.offsets[1] * len(SKILLS),
+        ).reshape(-1, len(SKILLS))
+
+        # sketch: (celda, cubeta) -> nº de salarios, ordenado por celda
+        bucket = np.ceil(np.log(salary[paid]) / LOG_GAMMA).astype(np.int64)
+        self.bucket0 = int(bucket.min(initial=0))
+        self.n_buckets = int(bucket.max(initial=0)) - self.bucket0 + 1
+        pairs, counts = np.unique(inverse[paid] * self.n_buckets + bucket - self.bucket0, return_counts=True)
+        self.sketch_cell, self.sketch_bucket = np.divmod(pairs, self.n_buckets)
+        self.sketch_n = counts
+
+    @property
+    def cells(self) -> int:
+        return len(self.offers)
+
+    def nbytes(self) -> int:
+        return sum(v.nbytes for v in vars(self).values() if isinstance(v, np.ndarray))
+
+    def day_code(self, day) -> int:
+        return int((np.datetime64(day, "D") - self.day0).astype(np.int64))
+
+    def cell_mask(self, k: int, filters: Filters) -> np.ndarray:
+        # celdas de la skill k que cumplen los filtros de dimensión
+        cells = slice(self.offsets[k], self.offsets[k + 1])
+        keep = np.ones(cells.stop - cells.start, dtype=bool)
+        if filters.roles:
+            keep &= np.isin(self.role[cells], np.flatnonzero(np.isin(self.role_labels, filters.roles)))
+        if filters.cities:
+            wanted = ["" if c == UNKNOWN_CITY else c for c in filters.cities]
+            keep &= np.isin(self.city[cells], np.flatnonzero(np.isin(self.city_labels, wanted)))
+        if filters.remote is not None:
+            keep &= self.remote[cells] == int(filters.remote)
+        if filters.start is not None or filters.end is not None:
+            day = self.day[cells]
+            keep &= day < self.undated
+            if filters.start is not None:
+                keep &= day >= self.day_code(filters.start)
+            if filters.end is not None:
+                keep &= day <= self.day_code(filters.end)
+        return keep
+
+    def select(self, filters: Filters) -> "Selection":
+        return Selection(self, filters)
+
+
+class Selection:
+    # Celdas del cubo que cumplen unos filtros y sus agregados (mismas columnas que src/queries.py)
+    def __init__(self, cube: Cube, filters: Filters):
+        self.cube = cube
+        self.filters = filters
+        self.k = 0 if filters.skill is None else SKILLS.index(filters.skill) + 1
+        self.index = np.flatnonzero(cube.cell_mask(self.k, filters)) + cube.offsets[self.k]
+        self._rows = None
+
+    def _by(self, dim: str, values: np.ndarray, size: int) -> np.ndarray:
+        return np.bincount(getattr(self.cube, dim)[self.index], weights=values[self.index], minlength=size)
+
+    @property
+    def rows(self) -> np.ndarray:
+        # máscara de filas del frame (analytics.metrics.ROWS) dentro de la selección
+        if self._rows is None:
+            cube = self.cube
+            base = self.index if not self.k else np.flatnonzero(cube.cell_mask(0, self.filters))
+            keep = np.zeros(cube.offsets[1], dtype=bool)
+            keep[base] = True
+            rows = keep[cube.row_cell]
+            if self.k:
+                rows &= ((cube.masks >> frame.MASK_DTYPE(self.k - 1)) & 1).astype(bool)
+            self._rows = rows
+        return self._rows
+
+    def overview(self) -> dict:
+        cube, idx = self.cube, self.index
+        offers = cube.offers[idx]
+        by_city = self._by("city", cube.offers, len(cube.city_labels))
+        city = np.array([c.strip().lower() for c in cube.city_labels])
+        return {
+            "total": int(offers.sum()),
+            "remote": int(offers[cube.remote[idx] == 1].sum()),
+            "with_skill": int(cube.with_skill[idx].sum()),
+            "madrid": int(by_city[city == "madrid"].sum()),
+            "barcelona": int(by_city[city == "barcelona"].sum()),
+        }
+
+    def top_skills(self, n: int | None = None) -> pd.DataFrame:
+        if self.k:
+            # menciones junto a la skill filtrada: sobre las filas de la selección
+            counts = frame.skill_matrix(self.cube.masks[self.rows]).sum(axis=0, dtype=np.int64)
+        else:
+            counts = self.cube.mentions[self.index].sum(axis=0)
+        return frame.ranked_skills(counts, n)
+
+    def _counts(self, dim: str, name: str, labels: np.ndarray) -> pd.DataFrame:
+        counts = self._by(dim, self.cube.offers, len(labels)).astype(np.int64)
+        out = pd.DataFrame({dim: labels, name: counts})
+        out = out[out[name] > 0].groupby(dim, as_index=False, sort=False)[name].sum()
+        return out.sort_values([name, dim], ascending=[False, True], ignore_index=True)
+
+    def top_cities(self, n: int = 10) -> pd.DataFrame:
+        labels = np.where(self.cube.city_labels == "", UNKNOWN_CITY, self.cube.city_labels)
+        out = self._counts("city", "count", labels)
+        return out.head(n) if n >= 0 else out
+
+    def role_counts(self) -> pd.DataFrame:
+        return self._counts("role", "offers", self.cube.role_labels)
+
+    def daily_trend(self) -> pd.DataFrame:
+        counts = self._by("day", self.cube.offers, self.cube.undated + 1)[:-1].astype(np.int64)
+        days = np.flatnonzero(counts)
+        return pd.DataFrame({
+            "date": pd.to_datetime(self.cube.day0 + days).date,
+            "offers": counts[days],
+        })
+
+    def _percentiles(self, group: str | None, size: int) -> np.ndarray:
+        # grupos x QUANTILES desde los sketches de las celdas seleccionadas (NaN sin datos)
+        cube = self.cube
+        lo, hi = np.searchsorted(cube.sketch_cell, [cube.offsets[self.k], cube.offsets[self.k + 1]])
+        keep = np.zeros(cube.cells, dtype=bool)
+        keep[self.index] = True
+        cell = cube.sketch_cell[lo:hi]
+        take = keep[cell]
+        cell = cell[take]
+        codes = getattr(cube, group)[cell] if group else np.zeros(len(cell), dtype=np.int64)
+        counts = np.bincount(
+            codes * cube.n_buckets + cube.sketch_bucket[lo:hi][take],
+            weights=cube.sketch_n[lo:hi][take], minlength=size * cube.n_buckets,
+        ).reshape(size, cube.n_buckets)
+        cum = counts.cumsum(axis=1)
+        total = cum[:, -1]
+        out = np.full((size, len(QUANTILES)), np.nan)
+        for j, q in enumerate(QUANTILES.values()):
+            first = (cum > (q * (total - 1))[:, None]).argmax(axis=1)
+            out[:, j] = np.where(total > 0, bucket_value(cube.bucket0 + first), np.nan)
+        return out
+
+    def _exact(self, group: str | None) -> pd.DataFrame:
+        # percentiles exactos sobre las filas de la selección (SALARY_EXACT=1)
+        cube = self.cube
+        rows = self.rows
+        grp = getattr(cube, f"{group}_labels")[getattr(cube, group)[cube.row_cell[rows]]] if group else ""
+        values = pd.DataFrame({"grp": grp, "v": cube.salary[rows]})
+        values = values[values["v"] > 0]
+        if values.empty:
+            return pd.DataFrame(columns=["grp", *QUANTILES])
+        pct = values.groupby("grp")["v"].quantile(list(QUANTILES.values())).unstack()
+        pct.columns = list(QUANTILES)
+        return pct.reset_index()
+
+    def salary_summary(self, exact: bool = False) -> dict:
+        cube, idx = self.cube, self.index
+        n = int(cube.salary_n[idx].sum())
+        if exact:
+            pct = self._exact(None)
+            values = {name: pct[name].iloc[0] if len(pct) else None for name in QUANTILES}
+        else:
+            values = {name: v if v == v else None for name, v in zip(QUANTILES, self._percentiles(None, 1)[0])}
+        return {"n": n, "avg_salary": cube.salary_sum[idx].sum() / n if n else None, **values}
+
+    def salary_by(self, group: str, exact: bool = False) -> pd.DataFrame:
+        # group: "city" o "role" -> group, avg_salary, median_salary, p25/p75/p90, n
+        cube = self.cube
+        labels = getattr(cube, f"{group}_labels")
+        n = self._by(group, cube.salary_n, len(labels)).astype(np.int64)
+        total = self._by(group, cube.salary_sum, len(labels))
+        keep = (n > 0) & (labels != "")
+        out = pd.DataFrame({group: labels[keep], "avg_salary": total[keep] / n[keep], "n": n[keep]})
+        if exact:
+            out = out.merge(self._exact(group).rename(columns={"grp": group}), on=group, how="left")
+        else:
+            pct = self._percentiles(group, len(labels))[keep]
+            for j, name in enumerate(QUANTILES):
+                out[name] = pct[:, j]
+        out = out.sort_values(group, ignore_index=True)
+        return out[[group, "avg_salary", *QUANTILES, "n"]]
+
+    def latest(self, limit: int) -> np.ndarray:
+        # posiciones de las filas más recientes: created_at desc y, a igualdad, id desc, como
+        # queries.latest_offers (sin fecha al final)
+        positions = np.flatnonzero(self.rows)
+        key = ~self.cube.created[positions]
+        if len(positions) > limit:
+            # sólo se ordenan las candidatas (las limit más recientes y sus empates)
+            keep = key <= np.partition(key, limit - 1)[limit - 1]
+            positions, key = positions[keep], key[keep]
+        _, id_rank = np.unique(self.cube.ids[positions], return_inverse=True)
+        return positions[np.lexsort((-id_rank.ravel(), key))][:limit]
@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from typing import NamedTuple
+
+from .. import frame, queries
+from ..config import SALARY_EXACT, SNAPSHOT_DIR
+from ..db import data_version, db_fingerprint
+from ..snapshot import load_jobs
+from ..trace import span
+
+# Entrada de las métricas: los datos del dashboard en una versión de la base de datos
+# (data_version, que sube con cada escritura). Consultas, frames y el resultado de cada
+# métrica se calculan una vez por versión y se comparten entre sesiones: no modificar
+# lo que devuelven.
+
+# Resultados con filtros que se guardan por versión (los más recientes)
+FILTERED_MEMO = 256
+
+
+class Filters(NamedTuple):
+    # Filtros globales del dashboard; vacíos = todas las ofertas
+    roles: tuple = ()
+    cities: tuple = ()
+    start: date | None = None
+    end: date | None = None
+    skill: str | None = None
+    remote: bool | None = None
+
+    @property
+    def active(self) -> bool:
+        return self != NO_FILTERS
+
+
+NO_FILTERS = Filters()
+
+
+class Dataset:
+    def __init__(self, engine, version: int, salary_exact: bool = SALARY_EXACT, snapshot_dir=SNAPSHOT_DIR):
+        self.engine = engine
+        self.version = version
+        self.salary_exact = salary_exact
+        self.snapshot_dir = snapshot_dir
+        self.memo = {}
+        self.recent = OrderedDict()
+        self.lock = threading.Lock()
+
+    def cached(self, key, compute, keep: bool = True):
+        # Dos sesiones pueden calcular lo mismo a la vez; se queda el último, son iguales.
+        # keep=False: a un LRU de FILTERED_MEMO entradas (hay demasiadas combinaciones de filtros)
+        if keep:
+            if key not in self.memo:
+                self.memo[key] = compute()
+            return self.memo[key]
+        with self.lock:
+            if key in self.recent:
+                self.recent.move_to_end(key)
+                return self.recent[key]
+        value = compute()
+        with self.lock:
+            self.recent[key] = value
+            while len(self.recent) > FILTERED_MEMO:
+                self.recent.popitem(last=False)
+        return value
+
+    def query(self, name: str, **kwargs):
+        # Resultado de queries.<name>(engine, **kwargs)
+        key = ("query", name, tuple(sorted(kwargs.items())))
+        return self.cached(key, lambda: self._traced("sql." + name, getattr(queries, name), self.engine, **kwargs))
+
+    def frame(self, columns):
+        # Filas del dashboard con esas columnas en formato compacto (Parquet si está al día)
+        columns = tuple(columns)
+        return self.cached(
+            ("frame", columns),
+            lambda: self._load(list(columns)),
+        )
+
+    def _load(self, columns):
+        with span("frame.load", columns=len(columns)) as s:
+            jobs = frame.compact(load_jobs(self.engine, columns, snapshot_dir=self.snapshot_dir))
+            s.set(rows=len(jobs))
+        return jobs
+
+    @staticmethod
+    def _traced(name, fn, *args, **kwargs):
+        # Sólo se mide lo que se calcula (un acierto del memo no abre span)
+        with span(name) as s:
+            result = fn(*args, **kwargs)
+            if hasattr(result, "shape"):  # DataFrame / Series
+                s.set(result_rows=result.shape[0])
+        return result
+
+
+def metric(fn):
+    # Memoiza fn(ds, ...) en el Dataset: una vez por versión de los datos y argumentos
+    @wraps(fn)
+    def wrapper(ds: Dataset, *args, **kwargs):
+        filtered = any(isinstance(v, Filters) and v.active for v in (*args, *kwargs.values()))
+        return ds.cached(
+            (fn.__name__, args, tuple(sorted(kwargs.items()))),
+            lambda: ds._traced("metric." + fn.__name__, fn, ds, *args, **kwargs),
+            keep=not filtered,
+        )
+    return wrapper
+
+
+_current = {}  # (url, opciones) -> (db_fingerprint, Dataset)
+_lock = threading.Lock()
+
+
+def dataset(engine, **options) -> Dataset:
+    # Dataset de la versión actual: el mismo objeto (y su memo) mientras no cambien los datos.
+    # Si el fichero no ha cambiado (db_fingerprint, sólo stat) ni siquiera se abre SQLite;
+    # si ha cambiado, se mira data_version (no toda escritura es de datos del dashboard)
+    key = (str(engine.url), tuple(sorted(options.items())))
+    fingerprint = db_fingerprint(engine.url.database) if engine.url.database else ()
+    with _lock:
+        seen, ds = _current.get(key, ((), None))
+    if ds is not None and fingerprint and seen == fingerprint:
+        return ds
+    version = data_version(engine)  # después del stat: una escritura entre ambos se ve la próxima vez
+    with _lock:
+        seen, ds = _current.get(key, ((), None))
+        if ds is None or ds.version != version:
+            ds = Dataset(engine, version, **options)
+        _current[key] = (fingerprint, ds)
+    return ds
@@ -0,0 +1,215 @@
+import pandas as pd
+
+from .. import frame
+from .cube import Cube, Selection
+from .dataset import NO_FILTERS, Dataset, Filters, metric
+
+# KPIs, insights y los datos de cada gráfico del dashboard a partir de un Dataset.
+# Funciones puras de la versión de los datos (memoizadas con @metric); dashboard.py sólo
+# las pinta. Las tablas salen en orden de lectura (la primera fila es la mayor).
+# Sin filtros, todo sale de SQL (casi siempre de las rollups); con filtros, del cubo
+# (src/analytics/cube.py), que se construye la primera vez que se filtra.
+
+# Filas del dashboard que se cargan en memoria, sólo con filtros (cubo, empresas y
+# últimas ofertas)
+ROWS = ("id", "created", "title", "company", "city", "role", "category", "url", "created_at",
+        "is_remote", "skills_mask", "salary_min", "salary_max")
+COMPANY_COLUMNS = ["company", "skills_mask"]
+LATEST_COLUMNS = ["created", "title", "company", "city", "category", "url"]
+
+
+def _first(df: pd.DataFrame, col: str, default="—"):
+    return df[col].iloc[0] if len(df) else default
+
+
+def _share(part, total) -> float:
+    # porcentaje con un decimal
+    return round(100 * part / total, 1) if total else 0.0
+
+
+@metric
+def data_cube(ds: Dataset) -> Cube:
+    return Cube(ds.frame(ROWS))
+
+
+@metric
+def selection(ds: Dataset, filters: Filters) -> Selection:
+    return data_cube(ds).select(filters)
+
+
+def _rows(ds: Dataset, filters: Filters, columns: list) -> pd.DataFrame:
+    # Filas de la selección (filters.active)
+    return ds.frame(ROWS)[columns][selection(ds, filters).rows]
+
+
+@metric
+def overview(ds: Dataset, filters: Filters = NO_FILTERS) -> dict:
+    # total, remote, with_skill, madrid, barcelona (ofertas del dashboard)
+    if filters.active:
+        return selection(ds, filters).overview()
+    return ds.query("overview_stats")
+
+
+@metric
+def top_skills(ds: Dataset, n: int | None = None, filters: Filters = NO_FILTERS) -> pd.DataFrame:
+    if filters.active:
+        skills = top_skills(ds, filters=filters) if n else selection(ds, filters).top_skills()
+    else:
+        skills = ds.query("top_skills")
+    return skills.head(n) if n else skills
+
+
+@metric
+def top_cities(ds: Dataset, n: int = 10, filters: Filters = NO_FILTERS) -> pd.DataFrame:
+    # n=-1: todas
+    if filters.active:
+        return selection(ds, filters).top_cities(n)
+    return ds.query("top_cities", n=n)
+
+
+@metric
+def company_counts(ds: Dataset, filters: Filters = NO_FILTERS) -> pd.DataFrame:
+    if filters.active:
+        return frame.company_counts(_rows(ds, filters, ["company"]))
+    return ds.query("top_companies")
+
+
+@metric
+def role_counts(ds: Dataset, filters: Filters = NO_FILTERS) -> pd.DataFrame:
+    if filters.active:
+        return selection(ds, filters).role_counts()
+    return ds.query("role_counts")
+
+
+@metric
+def daily_trend(ds: Dataset, filters: Filters = NO_FILTERS) -> pd.DataFrame:
+    if filters.active:
+        return selection(ds, filters).daily_trend()
+    return ds.query("daily_trend")
+
+
+@metric
+def latest_offer_date(ds: Dataset):
+    trend = daily_trend(ds)
+    return trend["date"].max() if len(trend) else None
+
+
+@metric
+def kpis(ds: Dataset, filters: Filters = NO_FILTERS) -> dict:
+    # duplicates sólo sin filtros: las re-publicaciones no están en el cubo
+    total = overview(ds, filters=filters)["total"]
+    cities = top_cities(ds, filters=filters)
+    return {
+        "total_offers": total,
+        "duplicates": 0 if filters.active else ds.query("duplicate_count"),
+        "top_skill": _first(top_skills(ds, filters=filters), "skill"),
+        "top_company": _first(company_counts(ds, filters=filters), "company"),
+        "top_city": _first(cities, "city"),
+        "top_city_pct": _share(cities["count"].iloc[0] if len(cities) else 0, total),
+    }
+
+
+@metric
+def insights(ds: Dataset, filters: Filters = NO_FILTERS) -> dict:
+    stats = overview(ds, filters=filters)
+    roles = role_counts(ds, filters=filters)
+    return {
+        "madrid_share": _share(stats["madrid"], stats["total"]),
+        "barcelona_share": _share(stats["barcelona"], stats["total"]),
+        "top_role": _first(roles[roles["role"] != "Other"], "role"),
+        "top_skill": _first(top_skills(ds, filters=filters), "skill"),
+        "remote_share": _share(stats["remote"], stats["total"]),
+    }
+
+
+@metric
+def skill_coverage(ds: Dataset, filters: Filters = NO_FILTERS) -> float:
+    # % de ofertas con al menos una skill
+    stats = overview(ds, filters=filters)
+    return _share(stats["with_skill"], stats["total"])
+
+
+@metric
+def company_breakdown(ds: Dataset, n: int = 50, per_company: int = 5, filters: Filters = NO_FILTERS) -> pd.DataFrame:
+    # company, offers, skills (las per_company más citadas); sólo se cuentan las skills
+    # de las filas de las n empresas de la tabla
+    table = company_counts(ds, filters=filters).head(n)
+    if filters.active:
+        jobs = _rows(ds, filters, COMPANY_COLUMNS)
+        skills = frame.company_top_skills(jobs[jobs["company"].isin(table["company"])], per_company=per_company)
+    else:
+        skills = ds.query("company_top_skills", per_company=per_company)
+    table = table.merge(skills, on="company", how="left")
+    table["skills"] = table["skills"].fillna("—")
+    return table
+
+
+def _salary_summary(ds: Dataset, filters: Filters) -> dict:
+    if filters.active:
+        return selection(ds, filters).salary_summary(exact=ds.salary_exact)
+    return ds.query("salary_summary", exact=ds.salary_exact)
+
+
+def _salary_by(ds: Dataset, group: str, filters: Filters) -> pd.DataFrame:
+    if filters.active:
+        return selection(ds, filters).salary_by(group, exact=ds.salary_exact)
+    return ds.query("salary_by", group=group, exact=ds.salary_exact)
+
+
+@metric
+def salary_kpis(ds: Dataset, filters: Filters = NO_FILTERS) -> dict:
+    # pct_with_salary + avg_salary / median_salary / p25 / p75 / p90 (None sin datos)
+    salary = _salary_summary(ds, filters)
+    return {"pct_with_salary": _share(salary["n"], overview(ds, filters=filters)["total"]), **salary}
+
+
+@metric
+def salary_by_city(ds: Dataset, min_n: int = 10, n: int = 10, filters: Filters = NO_FILTERS) -> pd.DataFrame:
+    # las n ciudades con mejor salario medio entre las que tienen al menos min_n salarios
+    cities = _salary_by(ds, "city", filters)
+    return cities[cities["n"] >= min_n].sort_values("avg_salary", ascending=False).head(n)
+
+
+@metric
+def salary_by_role(ds: Dataset, min_n: int = 10, filters: Filters = NO_FILTERS) -> pd.DataFrame:
+    roles = _salary_by(ds, "role", filters)
+    return roles[roles["n"] >= min_n].sort_values("avg_salary", ascending=False)
+
+
+@metric
+def salary_bands(ds: Dataset, min_n: int = 10, filters: Filters = NO_FILTERS) -> pd.DataFrame:
+    # P25-P75 por rol, de mayor a menor mediana
+    return salary_by_role(ds, min_n, filters=filters).sort_values("median_salary", ascending=False)
+
+
+@metric
+def latest_offers(ds: Dataset, limit: int = 5000, filters: Filters = NO_FILTERS) -> pd.DataFrame:
+    # Se lee una vez por versión y filtros: mover el slider del dashboard no vuelve a leer datos
+    if filters.active:
+        return ds.frame(ROWS).iloc[selection(ds, filters).latest(limit)][LATEST_COLUMNS]
+    return ds.query("latest_offers", n=limit)
+
+
+# Lo que pinta el dashboard con los valores por defecto; python -m src.analytics los
+# calcula todos (y mide cada uno)
+METRICS = [
+    (kpis, {}),
+    (insights, {}),
+    (top_skills, {"n": 10}),
+    (top_skills, {"n": 15}),
+    (top_cities, {}),
+    (daily_trend, {}),
+    (latest_offer_date, {}),
+    (company_counts, {}),
+    (company_breakdown, {}),
+    (skill_coverage, {}),
+    (salary_kpis, {}),
+    (salary_by_city, {}),
+    (role_counts, {}),
+    (salary_by_role, {}),
+    (salary_bands, {}),
+    (latest_offers, {}),
+]
+
+# Las que dependen de los filtros del sidebar
+FILTERED_METRICS = [(fn, kwargs) for fn, kwargs in METRICS if fn is not latest_offer_date]
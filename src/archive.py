@@ -0,0 +1,96 @@
+import gzip
+import json
+import re
+from datetime import datetime, timezone
+
+from .config import ARCHIVE_DIR, COUNTRY
+
+# Archivo de las respuestas crudas de Adzuna: NDJSON comprimido con gzip, un fichero por
+# ejecución y shard (ARCHIVE_DIR/<run>/<país>-<keyword>.ndjson.gz) y una línea por página:
+#   {"country": ..., "keyword": ..., "page": ..., "fetched": ..., "data": <respuesta tal cual>}
+# Permite recargar jobs sin red (python -m src.ingest --replay), p. ej. tras añadir
+# un campo a job_row().
+
+# gzip 9 (el valor por defecto) cuesta ~3x más que 6 y apenas comprime más el JSON
+COMPRESS_LEVEL = 6
+
+def run_id(now: datetime | None = None) -> str:
+    # Ordenable: las ejecuciones se reproducen de la más antigua a la más reciente
+    return (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+
+def shard_file(country: str, keyword: str) -> str:
+    return re.sub(r"\W+", "-", f"{country} {keyword}".strip().lower()).strip("-") + ".ndjson.gz"
+
+
+class ArchiveWriter:
+    # Sólo lo usa el thread de la etapa fetch (fetch() en src/ingest.py); un fichero abierto por shard
+    def __init__(self, run: str | None = None, root=ARCHIVE_DIR):
+        self.run = run or run_id()
+        self.dir = root / self.run
+        self.files = {}
+        self.pages = 0
+
+    def write(self, keyword: str, page: int, data: dict, country: str = COUNTRY):
+        f = self.files.get((country, keyword))
+        if f is None:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            f = self.files[(country, keyword)] = gzip.open(
+                self.dir / shard_file(country, keyword), "at", compresslevel=COMPRESS_LEVEL, encoding="utf-8")
+        fetched = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        record = {"country": country, "keyword": keyword, "page": page, "fetched": fetched, "data": data}
+        f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.pages += 1
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def runs(root=ARCHIVE_DIR) -> list:
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir() and any(p.glob("*.ndjson.gz")))
+
+def read_pages(run: str, root=ARCHIVE_DIR):
+    # Página a página, sin descomprimir ficheros enteros. Un fichero cortado (ejecución
+    # interrumpida) se lee hasta la última línea completa.
+    for path in sorted((root / run).glob("*.ndjson.gz")):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"⚠️ Truncated record in {path}")
+                        break
+        except (EOFError, gzip.BadGzipFile):
+            print(f"⚠️ Truncated archive {path}")
+
+def read_page_results(selected: list | None = None, root=ARCHIVE_DIR):
+    # (país, ofertas crudas de una página) de las ejecuciones elegidas (todas por defecto),
+    # en orden de ejecución
+    for run in selected or runs(root):
+        for record in read_pages(run, root):
+            yield record.get("country", COUNTRY), record["data"].get("results", []) or []
+
+def read_results(selected: list | None = None, root=ARCHIVE_DIR):
+    # (país, oferta cruda), una a una
+    for country, results in read_page_results(selected, root):
+        for r in results:
+            yield country, r
+
+
+if __name__ == "__main__":
+    # Lista las ejecuciones guardadas
+    for run in runs():
+        files = list((ARCHIVE_DIR / run).glob("*.ndjson.gz"))
+        size = sum(p.stat().st_size for p in files)
+        print(f"{run}  shards={len(files)}  {size / 1e6:.1f} MB")
+    print(f"✅ Archive | runs={len(runs())} | dir={ARCHIVE_DIR}")
@@ -0,0 +1,149 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    # con pyarrow, str.lower / str.contains se ejecutan en Arrow (RE2) sin pasar por Python
+    # (salvo \b con letras no ASCII, ver _contains)
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = object
+
+# Reglas de clasificación. Cada regla tiene versión por fila (classify_*) y
+# vectorizada sobre una Series (*_batch); ambas deben dar las mismas etiquetas
+# (tests/test_enrich_parity.py).
+
+JOB_BOARD_KEYWORDS = [".com", "indeed", "linkedin"]
+
+STAFFING_KEYWORDS = [
+    "ett",
+    "trabajo temporal",
+    "consult",
+    "recruit",
+    "talent",
+    "personnel",
+    "rrhh",
+    "selección",
+    "manpower",
+    "adecco",
+    "randstad",
+    "page personnel",
+]
+
+ROLE_PATTERNS = [
+    ("Data Engineer", r"\bdata engineer\b|\bdata engineering\b|\bingenier[oa] de datos\b|\bdata platform\b"),
+    ("Data Scientist", r"\bdata scientist\b|\bcient[ií]fic[oa] de datos\b|\bml engineer\b|\bmachine learning\b"),
+    ("BI Analyst", r"\bbi\b|\bbusiness intelligence\b|\bpower bi\b|\btableau\b|\bqlik\b"),
+    ("Data Analyst", r"\bdata analyst\b|\banalista de datos\b|\banalyst\b|\banalista\b|\banalytics\b"),
+]
+
+REMOTE_KEYWORDS = [
+    "remote",
+    "remoto",
+    "teletrabajo",
+    "work from home",
+    "wfh",
+    "fully remote",
+    "100% remote",
+    "híbrido",
+    "hybrid",
+]
+
+
+def keywords_re(keywords):
+    # subcadena literal, igual que `k in text`
+    return re.compile("|".join(re.escape(k) for k in keywords))
+
+
+JOB_BOARD_RE = keywords_re(JOB_BOARD_KEYWORDS)
+STAFFING_RE = keywords_re(STAFFING_KEYWORDS)
+REMOTE_RE = keywords_re(REMOTE_KEYWORDS)
+ROLE_RES = [(role, re.compile(pat)) for role, pat in ROLE_PATTERNS]
+
+
+def classify_company(name):
+    if not name:
+        return "Unknown"
+
+    name_lower = str(name).lower()
+
+    if JOB_BOARD_RE.search(name_lower):
+        return "Job Board"
+
+    if STAFFING_RE.search(name_lower):
+        return "Staffing / Consulting"
+
+    return "Direct Employer"
+
+
+def extract_city(location):
+    if not location:
+        return None
+    return str(location).split(",")[0].strip()
+
+
+def classify_role(title: str) -> str:
+    t = (title or "").lower()
+
+    for role, pat in ROLE_RES:
+        if pat.search(t):
+            return role
+    return "Other"
+
+
+def remote_flag(text: str) -> bool:
+    t = (text or "").lower()
+    return bool(REMOTE_RE.search(t))
+
+
+def _lower(s: pd.Series) -> pd.Series:
+    return s.fillna("").astype(str).astype(STRING_DTYPE).str.lower()
+
+
+def _non_ascii(lower: pd.Series) -> np.ndarray:
+    return lower.str.contains(r"[^\x00-\x7f]", regex=True).to_numpy(dtype=bool)
+
+
+def _contains(lower: pd.Series, pat: re.Pattern, non_ascii: np.ndarray | None = None) -> np.ndarray:
+    hits = lower.str.contains(pat.pattern, regex=True).to_numpy(dtype=bool)
+    if r"\b" in pat.pattern:
+        # En RE2 \b sólo conoce letras ASCII ("ñbi" tendría frontera antes de "bi"): las filas
+        # con algún carácter no ASCII se repiten con re de Python, como la versión por fila
+        non_ascii = _non_ascii(lower) if non_ascii is None else non_ascii
+        if non_ascii.any():
+            hits = hits.copy()
+            hits[non_ascii] = lower[non_ascii].astype(object).str.contains(pat, regex=True).to_numpy(dtype=bool)
+    return hits
+
+
+def classify_company_batch(names: pd.Series) -> pd.Series:
+    lower = _lower(names)
+    labels = np.select(
+        [(lower == "").to_numpy(dtype=bool), _contains(lower, JOB_BOARD_RE), _contains(lower, STAFFING_RE)],
+        ["Unknown", "Job Board", "Staffing / Consulting"],
+        default="Direct Employer",
+    )
+    return pd.Series(labels, index=names.index, dtype=object)
+
+
+def extract_city_batch(locations: pd.Series) -> pd.Series:
+    loc = locations.fillna("").astype(str)
+    city = loc.str.split(",", n=1).str[0].str.strip()
+    return city.where(loc != "", None)
+
+
+def classify_role_batch(titles: pd.Series) -> pd.Series:
+    lower = _lower(titles)
+    non_ascii = _non_ascii(lower)
+    labels = np.select(
+        [_contains(lower, pat, non_ascii) for _, pat in ROLE_RES],
+        [role for role, _ in ROLE_RES],
+        default="Other",
+    )
+    return pd.Series(labels, index=titles.index, dtype=object)
+
+
+def remote_flag_batch(texts: pd.Series) -> pd.Series:
+    return pd.Series(_contains(_lower(texts), REMOTE_RE), index=texts.index)
@@ -17,10 +17,46 @@ load_dotenv(ROOT / ".env")
 ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
 ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY")
 
+ADZUNA_BASE_URL = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api/jobs")
+
+# Mercado por defecto y el que muestra el dashboard
 COUNTRY = "es"
+# Mercados que se ingieren (p.ej. ADZUNA_COUNTRIES=es,gb,fr) si no hay INGEST_SPEC
+COUNTRIES = [c.strip().lower() for c in os.getenv("ADZUNA_COUNTRIES", COUNTRY).split(",") if c.strip()]
 RESULTS_PER_PAGE = 50
 
-DB_PATH = ROOT / "db" / "jobs.sqlite"
+# Peticiones simultáneas contra la API (una conexión keep-alive por worker)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+
+# Cuota de Adzuna (0 = sin límite). Por defecto ~25 peticiones/minuto y 250/día.
+ADZUNA_RPS = float(os.getenv("ADZUNA_RPS", str(25 / 60)))
+ADZUNA_BURST = float(os.getenv("ADZUNA_BURST", "1"))
+ADZUNA_DAILY_LIMIT = int(os.getenv("ADZUNA_DAILY_LIMIT", "250"))
+ADZUNA_MAX_RETRIES = int(os.getenv("ADZUNA_MAX_RETRIES", "5"))
+
+# Caché en disco de respuestas (src/http_cache.py); opcional, pensada para desarrollo y
+# backfills repetidos. TTL en segundos; al pasar de ADZUNA_CACHE_MAX_MB se desalojan las menos usadas.
+ADZUNA_CACHE = os.getenv("ADZUNA_CACHE", "0") == "1"
+ADZUNA_CACHE_TTL = float(os.getenv("ADZUNA_CACHE_TTL", str(24 * 3600)))
+ADZUNA_CACHE_MAX_MB = float(os.getenv("ADZUNA_CACHE_MAX_MB", "200"))
+
+# Percentiles de salario exactos (todas las ofertas) en vez de los sketches; para validar
+SALARY_EXACT = os.getenv("SALARY_EXACT", "0") == "1"
+
+DB_PATH = Path(os.getenv("JOBS_DB_PATH", ROOT / "db" / "jobs.sqlite"))
+
+ADZUNA_CACHE_PATH = Path(os.getenv("ADZUNA_CACHE_PATH", DB_PATH.parent / "http_cache.sqlite"))
+
+# Copia Parquet de las ofertas enriquecidas (python -m src.snapshot); junto a la base de datos
+SNAPSHOT_DIR = Path(os.getenv("JOBS_SNAPSHOT_DIR", DB_PATH.parent / "snapshot"))
+
+# Respuestas crudas de la API (src/archive.py); JOBS_ARCHIVE=0 deja de guardarlas
+ARCHIVE_DIR = Path(os.getenv("JOBS_ARCHIVE_DIR", DB_PATH.parent / "archive"))
+ARCHIVE = os.getenv("JOBS_ARCHIVE", "1") == "1"
+
+# Spans de tiempo / memoria por etapa (src/trace.py), como JSON lines; desactivado por defecto
+TRACE = os.getenv("JOBS_TRACE", "0") == "1"
+TRACE_PATH = Path(os.getenv("JOBS_TRACE_PATH", DB_PATH.parent / "trace.jsonl"))
 
 KEYWORDS = [
     "data analyst",
@@ -30,6 +66,9 @@ KEYWORDS = [
     "sql",
 ]
 
+# Fichero JSON con países, keywords y cuota por país para la ingesta (ver src/shards.py)
+INGEST_SPEC = os.getenv("INGEST_SPEC")
+
 def require_env():
     if not ADZUNA_APP_ID or not ADZUNA_APP_KEY:
         raise RuntimeError("Faltan ADZUNA_APP_ID / ADZUNA_APP_KEY en .env")
\ No newline at end of file
@@ -1,7 +1,16 @@
+import argparse
 from pathlib import Path
-from sqlalchemy import create_engine, Column, String, Text
+from sqlalchemy import create_engine, event, inspect, Column, String, Text
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy import Float, Integer
+from sqlalchemy import DateTime, Float, Integer, LargeBinary, bindparam, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .config import COUNTRY
+from .dedup import assign_clusters, cluster_all, clusters_missing
+from .rollups import apply_rollups, ensure_built, recompute, rollups_missing
+from .search import ensure_fts
+from .sketch import salary_bucket
+from .trace import span
 
 Base = declarative_base()
 
@@ -10,10 +19,11 @@ class Job(Base):
 
     id = Column(String, primary_key=True)  
     title = Column(String)
-    company = Column(String)
-    location = Column(String)
+    company = Column(String, index=True)
+    location = Column(String, index=True)
     category = Column(String, nullable=True)
-    created = Column(String, nullable=True)
+    created = Column(String, nullable=True)  # tal cual llega de Adzuna
+    created_at = Column(DateTime, nullable=True, index=True)  # created en UTC, ordenable
     description = Column(Text, nullable=True)
     url = Column(String)
     salary_min = Column(Float, nullable=True)
@@ -21,12 +31,478 @@ class Job(Base):
     salary_is_predicted = Column(Integer, nullable=True)
     salary_interval = Column(String, nullable=True) 
     currency = Column(String, nullable=True)
+    country = Column(String, nullable=True)  # mercado de Adzuna ("es", "gb", ...)
+
+class JobFeatures(Base):
+    # Campos derivados de cada oferta, calculados en la ingesta (ver src/enrich.py)
+    __tablename__ = "job_features"
+
+    job_id = Column(String, primary_key=True)
+    city = Column(String, nullable=True, index=True)
+    company_type = Column(String)
+    role = Column(String, index=True)
+    skills = Column(String)  # separadas por comas, p.ej. "python,sql"
+    skills_mask = Column(Integer)  # bit i = SKILLS[i]
+    is_remote = Column(Integer)
+    enrich_version = Column(Integer)
+    # Grupo de ofertas repetidas (src/dedup.py): id de la canónica y 0 en las demás
+    cluster_id = Column(String, nullable=True, index=True)
+    is_canonical = Column(Integer, nullable=True, index=True)  # NULL = sin calcular (cuenta como única)
+
+class IngestState(Base):
+    # Marca de agua por shard (país, keyword) para la ingesta incremental
+    __tablename__ = "ingest_state"
+
+    country = Column(String, primary_key=True)
+    keyword = Column(String, primary_key=True)
+    last_created = Column(String, nullable=True)  # created más reciente visto (ISO 8601)
+    last_run = Column(String, nullable=True)
+
+class ApiUsage(Base):
+    # Peticiones a Adzuna por día UTC y país: la cuota diaria se respeta entre ejecuciones
+    __tablename__ = "api_usage"
+
+    day = Column(String, primary_key=True)  # YYYY-MM-DD (UTC)
+    country = Column(String, primary_key=True)
+    requests = Column(Integer, nullable=False, default=0)
+
+class JobMinhash(Base):
+    # Firma MinHash de cada oferta (NUM_PERM + TITLE_PERM uint32 little-endian, src/dedup.py)
+    __tablename__ = "job_minhash"
+
+    job_id = Column(String, primary_key=True)
+    signature = Column(LargeBinary)
+
+class JobLsh(Base):
+    # Cubetas LSH: una fila por banda de la firma y oferta
+    __tablename__ = "job_lsh"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    bucket = Column(Integer, primary_key=True)
+    job_id = Column(String, primary_key=True)
+
+class BackfillState(Base):
+    # Progreso de un backfill completo de features (python -m src.enrich --all) para reanudarlo
+    __tablename__ = "backfill_state"
+
+    run = Column(String, primary_key=True)  # p.ej. "all-v2"
+    last_id = Column(String)  # último id escrito (los bloques van en orden de id)
+    rows = Column(Integer)
+    updated = Column(String)
+
+class DataVersion(Base):
+    # Contador que sube con cada escritura en jobs / job_features (una sola fila, id=1)
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer)
+
+class SnapshotDirty(Base):
+    # Meses (month= del snapshot Parquet, src/snapshot.py) con ofertas que han cambiado
+    # desde el último export; "*" = todos. Se apuntan en la misma transacción que la escritura
+    __tablename__ = "snapshot_dirty"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    month = Column(String, nullable=False)
+
+# Agregados de las ofertas válidas, mantenidos en la ingesta (ver src/rollups.py).
+# Las claves no admiten NULL (no chocarían en el ON CONFLICT): "" = sin dato.
+class RollupDaily(Base):
+    __tablename__ = "rollup_daily"
+
+    day = Column(String, primary_key=True)  # YYYY-MM-DD
+    city = Column(String, primary_key=True)
+    role = Column(String, primary_key=True)
+    company_type = Column(String, primary_key=True)
+    offers = Column(Integer)
+    remote = Column(Integer)
+    with_skill = Column(Integer)  # ofertas con al menos una skill
+
+class RollupSkillDaily(Base):
+    __tablename__ = "rollup_skill_daily"
+
+    day = Column(String, primary_key=True)
+    skill = Column(String, primary_key=True)
+    company_type = Column(String, primary_key=True)
+    mentions = Column(Integer)
+
+class RollupSalary(Base):
+    __tablename__ = "rollup_salary"
+
+    city = Column(String, primary_key=True)
+    role = Column(String, primary_key=True)
+    company_type = Column(String, primary_key=True)
+    n = Column(Integer)  # ofertas con salario
+    total = Column(Float)  # suma de salarios (media de min / max)
+
+class RollupSalarySketch(Base):
+    # Sketch de cuantiles de salario por grupo: ofertas por cubeta (ver src/sketch.py)
+    __tablename__ = "rollup_salary_sketch"
+
+    city = Column(String, primary_key=True)
+    role = Column(String, primary_key=True)
+    company_type = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    n = Column(Integer)
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # lectores (dashboard) y escritor (ingesta) no se bloquean
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -64000,  # ~64 MB
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,
+}
+
+def _set_pragmas(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cur.execute(f"PRAGMA {name}={value}")
+    cur.close()
+
+def _register_functions(dbapi_conn, _record):
+    # Funciones Python usadas en el SQL de las rollups
+    dbapi_conn.create_function("salary_bucket", 1, salary_bucket, deterministic=True)
 
 def get_engine(db_path: Path):
-    return create_engine(f"sqlite:///{db_path}", future=True)
+    engine = create_engine(f"sqlite:///{db_path}", future=True)
+    event.listen(engine, "connect", _set_pragmas)
+    event.listen(engine, "connect", _register_functions)
+    return engine
+
+def db_fingerprint(db_path: Path):
+    # Cambia con cada escritura (fichero principal y -wal); sólo hace stat, no abre SQLite
+    parts = []
+    for p in (Path(db_path), Path(f"{db_path}-wal")):
+        if p.exists():
+            st = p.stat()
+            parts.append((p.name, st.st_mtime_ns, st.st_size))
+    return tuple(parts)
 
 def init_db(engine):
+    # Migración completa (la usan los comandos de la CLI); el dashboard sólo comprueba
+    # con schema_pending() / data_pending() y pide `python -m src.db --migrate`
     Base.metadata.create_all(engine)
+    migrate(engine)
+    if clusters_missing(engine):
+        rebuild_clusters(engine)
+    ensure_built(engine)
+
+# Formato de texto de created_at en SQLite, el mismo que usa el ORM
+CREATED_AT_FORMAT = "%Y-%m-%d %H:%M:%S.000000"
+
+def migrate(engine):
+    # Idempotente: añade columnas e índices que falten en bases de datos antiguas
+    insp = inspect(engine)
+    changed = 0  # filas de jobs reescritas
+    with engine.begin() as conn:
+        # ingest_state era por keyword: la clave pasa a (país, keyword), hay que recrearla
+        if "country" not in {c["name"] for c in insp.get_columns("ingest_state")}:
+            conn.execute(text("ALTER TABLE ingest_state RENAME TO ingest_state_old"))
+            IngestState.__table__.create(conn)
+            conn.execute(text(
+                "INSERT INTO ingest_state (country, keyword, last_created, last_run) "
+                "SELECT :country, keyword, last_created, last_run FROM ingest_state_old"
+            ), {"country": COUNTRY})
+            conn.execute(text("DROP TABLE ingest_state_old"))
+
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name not in existing:
+                    col_type = col.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{col.name}" {col_type}'))
+                    if (table.name, col.name) == ("jobs", "country"):
+                        # todo lo anterior venía del único mercado que había
+                        changed += conn.execute(
+                            text("UPDATE jobs SET country = :country"), {"country": COUNTRY}
+                        ).rowcount
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+        # mismo texto que escribe el ORM (DateTime de SQLite lleva microsegundos): si no, el
+        # orden y las igualdades sobre created_at fallan entre formatos
+        changed += conn.execute(text(
+            f"UPDATE jobs SET created_at = strftime('{CREATED_AT_FORMAT}', created) "
+            "WHERE created_at IS NULL AND created IS NOT NULL"
+        )).rowcount
+        if conn.exec_driver_sql("PRAGMA user_version").scalar() < 1:
+            # bases migradas antes con datetime(created), sin microsegundos (una sola vez)
+            changed += conn.execute(text(
+                "UPDATE jobs SET created_at = created_at || '.000000' WHERE length(created_at) = 19"
+            )).rowcount
+            conn.exec_driver_sql("PRAGMA user_version = 1")
+        if changed:
+            # las rollups van por día de created_at (y marca todo el snapshot para re-exportar)
+            recompute(conn)
+            bump_data_version(conn)
+
+        # Índice FTS5 de título / descripción (src/search.py)
+        ensure_fts(conn)
+
+def schema_pending(engine) -> list:
+    # Tablas, columnas e índices que añadiría migrate(), sin escribir nada
+    insp = inspect(engine)
+    tables = set(insp.get_table_names())
+    pending = [f"table {t}" for t in Base.metadata.tables if t not in tables]
+    if "jobs_fts" not in tables:
+        pending.append("search index")
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        columns = {c["name"] for c in insp.get_columns(table.name)}
+        indexes = {i["name"] for i in insp.get_indexes(table.name)}
+        pending += [f"column {table.name}.{c.name}" for c in table.columns if c.name not in columns]
+        pending += [f"index {i.name}" for i in table.indexes if i.name not in indexes]
+    return pending
+
+def data_pending(engine) -> list:
+    # Datos que rellenaría `python -m src.db --migrate` (con el esquema ya al día), sin escribir
+    from .enrich import ENRICH_VERSION
+
+    pending = []
+    with engine.connect() as conn:
+        def exists(sql, **params):
+            return conn.execute(text(f"SELECT EXISTS ({sql})"), params).scalar() == 1
+
+        if exists("SELECT 1 FROM jobs WHERE created_at IS NULL AND created IS NOT NULL") or (
+            conn.exec_driver_sql("PRAGMA user_version").scalar() < 1
+            and exists("SELECT 1 FROM jobs WHERE length(created_at) = 19")
+        ):
+            pending.append("created_at")
+        if exists(
+            "SELECT 1 FROM jobs j LEFT JOIN job_features f ON f.job_id = j.id "
+            "WHERE f.job_id IS NULL OR f.enrich_version != :version",
+            version=ENRICH_VERSION,
+        ):
+            pending.append("job features")
+    if clusters_missing(engine):
+        pending.append("duplicate groups")
+    if rollups_missing(engine):
+        pending.append("rollups")
+    return pending
 
 def get_session(engine):
-    return sessionmaker(bind=engine, future=True)()
\ No newline at end of file
+    return sessionmaker(bind=engine, future=True)()
+
+JOB_COLUMNS = [c.name for c in Job.__table__.columns]
+
+# SQLite limita el número de parámetros por sentencia
+IN_CHUNK = 500
+
+def existing_job_ids(conn, ids):
+    found = set()
+    for i in range(0, len(ids), IN_CHUNK):
+        chunk = ids[i:i + IN_CHUNK]
+        found.update(conn.execute(select(Job.id).where(Job.id.in_(chunk))).scalars())
+    return found
+
+def unclustered_ids(conn, ids):
+    # Ofertas con features pero sin grupo de repetidas (src/dedup.py)
+    found = []
+    for i in range(0, len(ids), IN_CHUNK):
+        chunk = ids[i:i + IN_CHUNK]
+        found += conn.execute(
+            select(JobFeatures.job_id).where(JobFeatures.job_id.in_(chunk), JobFeatures.is_canonical.is_(None))
+        ).scalars()
+    return found
+
+def bump_data_version(conn):
+    conn.execute(text(
+        "INSERT INTO data_version (id, version) VALUES (1, 1) "
+        "ON CONFLICT (id) DO UPDATE SET version = version + 1"
+    ))
+
+def data_version(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(DataVersion.version)).scalar() or 0
+
+def upsert_jobs(engine, rows, update: bool = False, enrich=None):
+    # rows: dicts con las columnas de Job. Un INSERT ... ON CONFLICT(id) en executemany.
+    # update=False -> DO NOTHING (las existentes se cuentan como skipped)
+    # enrich: función filas -> features; se guardan en la misma transacción para las filas escritas
+    # Las rollups se actualizan en la misma transacción (resta de lo reescrito + suma de lo escrito)
+    # y las ofertas escritas se asignan a su grupo de repetidas (src/dedup.py)
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+
+    by_id = {}
+    for r in rows:
+        if r.get("id"):
+            by_id[r["id"]] = {c: r.get(c) for c in JOB_COLUMNS}
+    if not by_id:
+        return counts
+
+    stmt = sqlite_insert(Job.__table__)
+    if update:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={c: stmt.excluded[c] for c in JOB_COLUMNS if c != "id"},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
+
+    with span("db.write", rows=len(by_id)) as s, engine.begin() as conn:
+        existing = existing_job_ids(conn, list(by_id))
+        written = [job_id for job_id in by_id if update or job_id not in existing]
+        s.set(written=len(written))
+        with span("db.rollups"):
+            apply_rollups(conn, [job_id for job_id in written if job_id in existing], sign=-1)
+        with span("db.insert", rows=len(by_id)):
+            conn.execute(stmt, list(by_id.values()))
+        if enrich is not None and written:
+            with span("enrich", rows=len(written)):
+                conn.execute(features_upsert_stmt(), enrich([by_id[job_id] for job_id in written]))
+        with span("db.rollups", rows=len(written)):
+            apply_rollups(conn, written)
+        with span("dedup", rows=len(written)):
+            assign_clusters(conn, written)
+        if written:
+            bump_data_version(conn)
+
+    counts["inserted"] = len(by_id) - len(existing)
+    counts["updated" if update else "skipped"] = len(existing)
+    return counts
+
+def load_watermarks(engine):
+    # {(país, keyword): created}
+    with engine.connect() as conn:
+        rows = conn.execute(select(IngestState.country, IngestState.keyword, IngestState.last_created))
+        return {(country, kw): created for country, kw, created in rows if created}
+
+def save_watermarks(engine, watermarks: dict, last_run: str):
+    if not watermarks:
+        return
+    stmt = sqlite_insert(IngestState.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["country", "keyword"],
+        set_={"last_created": stmt.excluded.last_created, "last_run": stmt.excluded.last_run},
+    )
+    rows = [
+        {"country": country, "keyword": kw, "last_created": c, "last_run": last_run}
+        for (country, kw), c in watermarks.items()
+    ]
+    with engine.begin() as conn:
+        conn.execute(stmt, rows)
+
+def load_api_usage(engine, day: str) -> dict:
+    # {país: peticiones hechas ese día}
+    with engine.connect() as conn:
+        rows = conn.execute(select(ApiUsage.country, ApiUsage.requests).where(ApiUsage.day == day))
+        return dict(rows.all())
+
+def save_api_usage(engine, issued: dict):
+    # issued: {país: {día: peticiones}} de esta ejecución; se suman a lo ya guardado
+    rows = [
+        {"day": day, "country": country, "requests": n}
+        for country, by_day in issued.items() for day, n in by_day.items() if n
+    ]
+    if not rows:
+        return
+    stmt = sqlite_insert(ApiUsage.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "country"],
+        set_={"requests": ApiUsage.__table__.c.requests + stmt.excluded.requests},
+    )
+    with engine.begin() as conn:
+        conn.execute(stmt, rows)
+
+def load_checkpoint(engine, run: str):
+    with engine.connect() as conn:
+        row = conn.execute(select(BackfillState.last_id, BackfillState.rows).where(BackfillState.run == run)).first()
+        return tuple(row) if row else None
+
+def save_checkpoint(engine, run: str, last_id: str, rows: int, updated: str):
+    stmt = sqlite_insert(BackfillState.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["run"],
+        set_={"last_id": stmt.excluded.last_id, "rows": stmt.excluded.rows, "updated": stmt.excluded.updated},
+    )
+    with engine.begin() as conn:
+        conn.execute(stmt, {"run": run, "last_id": last_id, "rows": rows, "updated": updated})
+
+def clear_checkpoint(engine, run: str):
+    with engine.begin() as conn:
+        conn.execute(BackfillState.__table__.delete().where(BackfillState.run == run))
+
+# Columnas que calcula el enrich; cluster_id / is_canonical las mantiene src/dedup.py
+FEATURE_COLUMNS = [c.name for c in JobFeatures.__table__.columns if c.name not in ("cluster_id", "is_canonical")]
+
+def features_upsert_stmt():
+    stmt = sqlite_insert(JobFeatures.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=["job_id"],
+        set_={c: stmt.excluded[c] for c in FEATURE_COLUMNS if c != "job_id"},
+    )
+
+def current_features(conn, ids) -> dict:
+    # job_id -> valores actuales de FEATURE_COLUMNS
+    found = {}
+    cols = [JobFeatures.__table__.c[c] for c in FEATURE_COLUMNS]
+    for i in range(0, len(ids), IN_CHUNK):
+        chunk = ids[i:i + IN_CHUNK]
+        for row in conn.execute(select(*cols).where(JobFeatures.job_id.in_(chunk))).mappings():
+            found[row["job_id"]] = dict(row)
+    return found
+
+def upsert_features(engine, rows):
+    # Sólo se reescriben (y se corrigen en las rollups) las features que cambian;
+    # al resto le basta con el nuevo enrich_version
+    if not rows:
+        return 0
+    with engine.begin() as conn:
+        current = current_features(conn, [r["job_id"] for r in rows])
+        changed = [
+            r for r in rows
+            if any(current.get(r["job_id"], {}).get(c, object()) != r[c] for c in FEATURE_COLUMNS if c != "enrich_version")
+        ]
+        ids = [r["job_id"] for r in changed]
+        rewritten = set(ids)
+        apply_rollups(conn, ids, sign=-1)
+        if changed:
+            conn.execute(features_upsert_stmt(), changed)
+        stamp = [
+            {"b_id": r["job_id"], "b_version": r["enrich_version"]}
+            for r in rows if r["job_id"] in current and r["job_id"] not in rewritten
+        ]
+        if stamp:
+            conn.execute(
+                update(JobFeatures.__table__)
+                .where(JobFeatures.job_id == bindparam("b_id"))
+                .values(enrich_version=bindparam("b_version")),
+                stamp,
+            )
+        apply_rollups(conn, ids)
+        # el texto no cambia al re-enriquecer: sólo se agrupan las features nuevas
+        assign_clusters(conn, unclustered_ids(conn, ids))
+        if changed:
+            bump_data_version(conn)
+    return len(rows)
+
+def rebuild_clusters(engine) -> dict:
+    # Grupos de repetidas de todas las ofertas desde cero y, con ellos, las rollups
+    with engine.begin() as conn:
+        stats = cluster_all(conn)
+        recompute(conn)
+        bump_data_version(conn)
+    return stats
+
+if __name__ == "__main__":
+    from .config import DB_PATH
+    from .enrich import backfill
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--migrate", action="store_true",
+                        help="aplicar la migración: esquema, created_at, features, grupos y rollups")
+    args = parser.parse_args()
+
+    engine = get_engine(DB_PATH)
+    if args.migrate:
+        init_db(engine)
+        n = backfill(engine)
+        print(f"✅ Migrated | features={n} | db={DB_PATH}")
+    else:
+        pending = schema_pending(engine) or data_pending(engine)
+        if pending:
+            print(f"⚠️ Pending migration: {', '.join(pending)} | run python -m src.db --migrate | db={DB_PATH}")
+        else:
+            print(f"✅ Database up to date | db={DB_PATH}")
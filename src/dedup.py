@@ -0,0 +1,346 @@
+import argparse
+import unicodedata
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from .queries import VALID_POSTING
+from .rollups import apply_rollups
+
+# Detección de ofertas repetidas (mismo anuncio con otro id de Adzuna o en otro portal).
+# Cada oferta se resume en una firma MinHash de los shingles (3 palabras seguidas) de
+# título + empresa + descripción normalizados; la fracción de posiciones iguales entre
+# dos firmas estima su similitud de Jaccard. Con LSH la firma se parte en BANDS bandas y
+# sólo se comparan las ofertas que coinciden en alguna banda entera (job_lsh), así que
+# el coste crece con el número de ofertas, no con el de parejas.
+# Adzuna corta la descripción y en muchas empresas es casi toda texto corporativo: la
+# firma lleva además TITLE_PERM valores sobre las palabras del título, y dos ofertas sólo
+# son la misma si se parecen el texto y el título.
+# Las repetidas forman un grupo: cluster_id = id de la oferta canónica (la publicada
+# primero entre las que cuenta el dashboard, p.ej. con ciudad concreta) y
+# is_canonical = 0 en el resto. Los conteos del dashboard sólo incluyen las
+# canónicas (ver queries.VALID_JOB). Modelos en src/db.py.
+
+SHINGLE_WORDS = 3
+BANDS, ROWS = 10, 6
+NUM_PERM = BANDS * ROWS
+TITLE_PERM = 32
+# Jaccard estimado a partir del cual dos ofertas se consideran la misma
+THRESHOLD = 0.7
+TITLE_THRESHOLD = 0.7
+
+# Cubetas LSH de hasta este tamaño: se comparan todas las parejas; en las mayores
+# (texto corporativo repetido) cada oferta sólo con la primera
+BUCKET_ALL_PAIRS = 32
+
+SIGNATURE_CHUNK = 1000  # ofertas por bloque al calcular firmas (memoria ~ shingles x NUM_PERM)
+READ_CHUNK = 20_000
+
+_rng = np.random.default_rng(20240101)
+_U64 = dict(dtype=np.uint64, endpoint=True)
+PERM_A = _rng.integers(0, 2**64 - 1, NUM_PERM + TITLE_PERM, **_U64) | np.uint64(1)
+PERM_B = _rng.integers(0, 2**64 - 1, NUM_PERM + TITLE_PERM, **_U64)
+SHINGLE_MIX = _rng.integers(0, 2**64 - 1, SHINGLE_WORDS, **_U64) | np.uint64(1)
+BAND_MIX = _rng.integers(0, 2**64 - 1, ROWS, **_U64) | np.uint64(1)
+BAND_SEED = _rng.integers(0, 2**64 - 1, BANDS, **_U64)
+
+# minúsculas y dígitos; el resto separa palabras ("\n" separa ofertas en un bloque)
+_SEPARATORS = {c: " " for c in range(128) if not chr(c).isalnum() and chr(c) != "\n"}
+
+
+def normalize(texts) -> list:
+    # palabras de cada texto: minúsculas, sin tildes ni signos (todo el bloque de una vez)
+    joined = "\n".join((t or "").replace("\n", " ") for t in texts).lower()
+    joined = unicodedata.normalize("NFKD", joined).encode("ascii", "ignore").decode()
+    return [line.split() for line in joined.translate(_SEPARATORS).split("\n")]
+
+
+def job_text(job) -> str:
+    return " ".join(job.get(c) or "" for c in ("title", "company", "description"))
+
+
+def signatures(jobs) -> np.ndarray:
+    # ofertas x (NUM_PERM + TITLE_PERM) uint32: mínimo de cada función hash sobre los
+    # shingles del texto y sobre las palabras del título
+    jobs = list(jobs)
+    out = [
+        np.hstack([
+            _minhash([job_text(j) for j in chunk], SHINGLE_WORDS, slice(0, NUM_PERM)),
+            _minhash([j.get("title") for j in chunk], 1, slice(NUM_PERM, None)),
+        ])
+        for chunk in (jobs[i:i + SIGNATURE_CHUNK] for i in range(0, len(jobs), SIGNATURE_CHUNK))
+    ]
+    return np.concatenate(out) if out else np.empty((0, NUM_PERM + TITLE_PERM), dtype=np.uint32)
+
+
+def _minhash(texts, size: int, perms: slice) -> np.ndarray:
+    words = [w + [""] * (size - len(w)) for w in normalize(texts)]
+    lengths = np.array([len(w) for w in words])
+    flat = pd.util.hash_array(np.array(list(chain.from_iterable(words)), dtype=object))
+    # posición de inicio de cada shingle dentro de flat (sin cruzar de una oferta a otra)
+    n_shingles = lengths - size + 1
+    starts = np.cumsum(n_shingles) - n_shingles
+    pos = np.arange(n_shingles.sum()) + np.repeat(np.cumsum(lengths) - lengths - starts, n_shingles)
+    shingles = sum(flat[pos + k] * SHINGLE_MIX[k] for k in range(size))
+    # hash multiply-shift (aritmética módulo 2^64) y mínimo por oferta
+    hashed = ((shingles[:, None] * PERM_A[perms] + PERM_B[perms]) >> np.uint64(32)).astype(np.uint32)
+    return np.minimum.reduceat(hashed, starts, axis=0)
+
+
+def band_keys(sigs: np.ndarray) -> np.ndarray:
+    # ofertas x BANDS (int64): un hash por banda de ROWS valores de la firma del texto
+    bands = sigs[:, :NUM_PERM].reshape(len(sigs), BANDS, ROWS).astype(np.uint64)
+    return ((bands * BAND_MIX).sum(axis=2, dtype=np.uint64) + BAND_SEED).view(np.int64)
+
+
+def same_offer(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    text_sim = (a[..., :NUM_PERM] == b[..., :NUM_PERM]).mean(axis=-1)
+    title_sim = (a[..., NUM_PERM:] == b[..., NUM_PERM:]).mean(axis=-1)
+    return (text_sim >= THRESHOLD) & (title_sim >= TITLE_THRESHOLD)
+
+
+def candidate_pairs(keys: np.ndarray) -> np.ndarray:
+    # parejas (i, j) de filas que comparten alguna banda, sin generar nunca todas las
+    # parejas de una cubeta grande
+    n = len(keys)
+    flat, row = keys.ravel(), np.repeat(np.arange(n), BANDS)
+    order = np.lexsort((row, flat))
+    flat, row = flat[order], row[order]
+    first = np.r_[True, flat[1:] != flat[:-1]]
+    group = np.cumsum(first) - 1
+    size = np.bincount(group)[group]
+    head = row[np.flatnonzero(first)[group]]
+    pairs = [np.stack([head, row], axis=1)[(size > BUCKET_ALL_PAIRS) & ~first]]
+    small = size <= BUCKET_ALL_PAIRS
+    for d in range(1, min(BUCKET_ALL_PAIRS, len(flat))):
+        same = small[:-d] & (group[:-d] == group[d:])
+        pairs.append(np.stack([row[:-d][same], row[d:][same]], axis=1))
+    pairs = np.concatenate(pairs)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    return np.unique(pairs, axis=0) if len(pairs) else pairs.reshape(0, 2)
+
+
+def _verified(pairs: np.ndarray, sigs: np.ndarray) -> np.ndarray:
+    keep = np.zeros(len(pairs), dtype=bool)
+    for i in range(0, len(pairs), 100_000):
+        p = pairs[i:i + 100_000]
+        keep[i:i + 100_000] = same_offer(sigs[p[:, 0]], sigs[p[:, 1]])
+    return pairs[keep]
+
+
+def _components(n: int, pairs) -> np.ndarray:
+    # union-find: raíz de cada fila
+    parent = np.arange(n)
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    while True:
+        nxt = parent[parent]
+        if np.array_equal(nxt, parent):
+            return parent
+        parent = nxt
+
+
+# Orden para elegir la canónica: antes los anuncios válidos, luego el más antiguo
+ORDER_SQL = f"CASE WHEN {VALID_POSTING} THEN 0 ELSE 1 END AS hidden, j.created_at"
+
+
+def _assign(ids, order, roots) -> dict:
+    # job_id -> (cluster_id, is_canonical); order: (hidden, created_at) de cada oferta
+    order = sorted(range(len(ids)), key=lambda i: (roots[i], order[i][0], order[i][1] or "9999", ids[i]))
+    flags, canonical = {}, {}
+    for i in order:
+        head = canonical.setdefault(roots[i], ids[i])
+        flags[ids[i]] = (head, int(head == ids[i]))
+    return flags
+
+
+def _pack(sig) -> bytes:
+    return sig.astype("<u4").tobytes()
+
+
+def _unpack(blob) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<u4")
+
+
+def _store(conn, ids, sigs):
+    conn.exec_driver_sql(
+        "INSERT OR REPLACE INTO job_minhash (job_id, signature) VALUES (?, ?)",
+        [(job_id, _pack(s)) for job_id, s in zip(ids, sigs)],
+    )
+    conn.exec_driver_sql(
+        "INSERT OR IGNORE INTO job_lsh (bucket, job_id) VALUES (?, ?)",
+        [(int(k), job_id) for job_id, row in zip(ids, band_keys(sigs)) for k in row],
+    )
+
+
+def _write_flags(conn, flags: dict):
+    if not flags:
+        return
+    conn.execute(text("CREATE TEMP TABLE IF NOT EXISTS dedup_flags (job_id TEXT PRIMARY KEY, cluster_id TEXT, is_canonical INTEGER)"))
+    conn.execute(text("DELETE FROM dedup_flags"))
+    conn.exec_driver_sql("INSERT INTO dedup_flags VALUES (?, ?, ?)", [(k, c, f) for k, (c, f) in flags.items()])
+    conn.execute(text("""
+        UPDATE job_features SET cluster_id = d.cluster_id, is_canonical = d.is_canonical
+        FROM dedup_flags d WHERE d.job_id = job_features.job_id
+    """))
+
+
+def cluster_all(conn) -> dict:
+    # Recalcula firmas, cubetas y grupos de todas las ofertas (las rollups van aparte)
+    ids, order, sigs = [], [], []
+    last = 0
+    while True:
+        rows = conn.execute(text(f"""
+            SELECT j.rowid, j.id, j.title, j.company, j.description, {ORDER_SQL}
+            FROM jobs j LEFT JOIN job_features f ON f.job_id = j.id
+            WHERE j.rowid > :last ORDER BY j.rowid LIMIT :n
+        """), {"last": last, "n": READ_CHUNK}).mappings().all()
+        if not rows:
+            break
+        ids += [r["id"] for r in rows]
+        order += [(r["hidden"], r["created_at"]) for r in rows]
+        sigs.append(signatures(rows))
+        last = rows[-1]["rowid"]
+    sigs = np.concatenate(sigs) if sigs else signatures([])
+
+    conn.execute(text("DELETE FROM job_minhash"))
+    conn.execute(text("DELETE FROM job_lsh"))
+    _store(conn, ids, sigs)
+
+    roots = _components(len(ids), _verified(candidate_pairs(band_keys(sigs)), sigs))
+    flags = _assign(ids, order, roots.tolist())
+    _write_flags(conn, flags)
+    duplicates = sum(1 for _, canonical in flags.values() if not canonical)
+    return {"offers": len(ids), "duplicates": duplicates, "groups": len(set(c for c, f in flags.values() if not f))}
+
+
+def _rows(conn, sql: str, ids) -> list:
+    # sql con "IN ({ids})"; parámetros "?" del driver (text() reanaliza cada lista larga)
+    out = []
+    ids = list(ids)
+    for i in range(0, len(ids), 500):
+        chunk = tuple(ids[i:i + 500])
+        out += conn.exec_driver_sql(sql.format(ids=", ".join("?" * len(chunk))), chunk).all()
+    return out
+
+
+def assign_clusters(conn, ids):
+    # ids: ofertas recién escritas en jobs / job_features (con sus rollups ya sumadas).
+    # Guarda sus firmas, las une a los grupos con los que coinciden y recalcula la canónica
+    # de esos grupos. Los grupos sólo crecen (una oferta reescrita sigue en el suyo);
+    # `python -m src.dedup --rebuild` los recalcula desde cero.
+    # Las rollups de las ofertas que cambian de grupo o de canónica se restan y se vuelven
+    # a sumar aquí, en la misma transacción.
+    if not ids:
+        return
+    jobs = _rows(conn, "SELECT id, title, company, description FROM jobs WHERE id IN ({ids})", ids)
+    if not jobs:
+        return
+    ids = [j.id for j in jobs]
+    sigs = signatures(j._mapping for j in jobs)
+    keys = band_keys(sigs)
+
+    # firmas anteriores de las ofertas reescritas: fuera sus cubetas
+    old = _rows(conn, "SELECT job_id, signature FROM job_minhash WHERE job_id IN ({ids})", ids)
+    if old:
+        stale = band_keys(np.stack([_unpack(s) for _, s in old]))
+        conn.exec_driver_sql(
+            "DELETE FROM job_lsh WHERE bucket = ? AND job_id = ?",
+            [(int(k), job_id) for (job_id, _), row in zip(old, stale) for k in row],
+        )
+
+    # candidatas ya guardadas con alguna banda en común
+    conn.execute(text("CREATE TEMP TABLE IF NOT EXISTS dedup_keys (bucket INTEGER, pos INTEGER)"))
+    conn.execute(text("DELETE FROM dedup_keys"))
+    conn.exec_driver_sql("INSERT INTO dedup_keys VALUES (?, ?)", [(int(k), i) for i, row in enumerate(keys) for k in row])
+    found = conn.execute(text(
+        "SELECT DISTINCT k.pos, l.job_id FROM dedup_keys k CROSS JOIN job_lsh l ON l.bucket = k.bucket"
+    )).all()
+    others = sorted({job_id for _, job_id in found} - set(ids))
+    other_sigs = dict(
+        (job_id, _unpack(s)) for job_id, s in _rows(conn, "SELECT job_id, signature FROM job_minhash WHERE job_id IN ({ids})", others)
+    )
+    _store(conn, ids, sigs)
+
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        parent[find(a)] = find(b)
+
+    for job_id in ids:
+        find(job_id)
+    for pos, job_id in found:
+        if job_id in other_sigs and same_offer(sigs[pos], other_sigs[job_id]):
+            union(ids[pos], job_id)
+    for a, b in _verified(candidate_pairs(keys), sigs):
+        union(ids[a], ids[b])
+
+    # grupos actuales de las implicadas: se fusionan enteros
+    clusters = {c for _, c in _rows(conn, "SELECT job_id, cluster_id FROM job_features WHERE job_id IN ({ids})", list(parent)) if c}
+    members = _rows(conn, "SELECT job_id, cluster_id FROM job_features WHERE cluster_id IN ({ids})", clusters)
+    for job_id, cluster_id in members:
+        union(job_id, cluster_id)
+
+    nodes = list(parent)
+    current = {
+        job_id: ((cluster_id, canonical), (hidden, created))
+        for job_id, cluster_id, canonical, hidden, created in _rows(conn, f"""
+            SELECT f.job_id, f.cluster_id, f.is_canonical, {ORDER_SQL}
+            FROM job_features f JOIN jobs j ON j.id = f.job_id
+            WHERE f.job_id IN ({{ids}})
+        """, nodes)
+    }
+    nodes = [n for n in nodes if n in current]
+    flags = _assign(nodes, [current[n][1] for n in nodes], [find(n) for n in nodes])
+
+    changed = [n for n in nodes if current[n][0] != flags[n]]
+    apply_rollups(conn, changed, sign=-1)
+    _write_flags(conn, {n: flags[n] for n in changed})
+    apply_rollups(conn, changed)
+
+
+def clusters_missing(engine) -> bool:
+    # Bases de datos anteriores a la deduplicación: hay features pero ninguna firma
+    with engine.connect() as conn:
+        def has_rows(table):
+            return conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first() is not None
+
+        return has_rows("job_features") and not has_rows("job_minhash")
+
+
+if __name__ == "__main__":
+    from .config import DB_PATH
+    from .db import get_engine, init_db, rebuild_clusters
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rebuild", action="store_true", help="recalcular firmas y grupos de todas las ofertas")
+    args = parser.parse_args()
+
+    engine = get_engine(DB_PATH)
+    init_db(engine)
+    if args.rebuild:
+        stats = rebuild_clusters(engine)
+        print(f"✅ Dedup rebuilt | offers={stats['offers']} | duplicates={stats['duplicates']} | groups={stats['groups']} | db={DB_PATH}")
+    with engine.connect() as conn:
+        row = conn.execute(text(
+            "SELECT COUNT(*), SUM(is_canonical = 0), COUNT(DISTINCT CASE WHEN is_canonical = 0 THEN cluster_id END) FROM job_features"
+        )).one()
+    print(f"✅ Dedup | offers={row[0]} | duplicates={row[1] or 0} | groups={row[2]} | db={DB_PATH}")
@@ -0,0 +1,155 @@
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import pandas as pd
+from sqlalchemy import select, or_
+
+from .classify import (
+    classify_company, classify_role, extract_city, remote_flag,
+    classify_company_batch, classify_role_batch, extract_city_batch, remote_flag_batch,
+)
+from .config import DB_PATH
+from .db import (
+    get_engine, init_db, upsert_features, Job, JobFeatures,
+    load_checkpoint, save_checkpoint, clear_checkpoint,
+)
+from .skills import extract_skills, skills_mask, skills_mask_batch, mask_skills
+from .trace import annotate, traced
+
+# Subir al cambiar SKILLS o cualquiera de las reglas de este módulo:
+# las filas con una versión anterior se vuelven a enriquecer en el backfill.
+ENRICH_VERSION = 2
+
+BACKFILL_CHUNK = 1000
+
+
+def enrich_row(job: dict) -> dict:
+    # job: dict con al menos id, title, company, location, description
+    text = (job.get("title") or "") + " " + (job.get("description") or "")
+    skills = extract_skills(text)
+    return {
+        "job_id": job["id"],
+        "city": extract_city(job.get("location")),
+        "company_type": classify_company(job.get("company")),
+        "role": classify_role(job.get("title")),
+        "skills": ",".join(skills),
+        "skills_mask": skills_mask(skills),
+        "is_remote": 1 if remote_flag(text) else 0,
+        "enrich_version": ENRICH_VERSION,
+    }
+
+
+def enrich_frame(jobs: pd.DataFrame) -> pd.DataFrame:
+    # Versión vectorizada de enrich_row para un DataFrame con id, title, company, location, description
+    text = jobs["title"].fillna("") + " " + jobs["description"].fillna("")
+    masks = skills_mask_batch(text)
+    return pd.DataFrame({
+        "job_id": jobs["id"],
+        "city": extract_city_batch(jobs["location"]),
+        "company_type": classify_company_batch(jobs["company"]),
+        "role": classify_role_batch(jobs["title"]),
+        "skills": [",".join(mask_skills(m)) for m in masks],
+        "skills_mask": masks,
+        "is_remote": remote_flag_batch(text).astype(int),
+        "enrich_version": ENRICH_VERSION,
+    })
+
+
+def enrich_rows(rows) -> list:
+    if not rows:
+        return []
+    jobs = pd.DataFrame([dict(r) for r in rows], columns=["id", "title", "company", "location", "description"])
+    features = enrich_frame(jobs).astype(object)
+    return features.where(features.notna(), None).to_dict("records")
+
+
+def _chunks(engine, query, last_id: str, chunk: int):
+    # bloques de filas en orden de id (paginación por id, una lectura corta por bloque)
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(query.where(Job.id > last_id).order_by(Job.id).limit(chunk)).mappings().all()
+        if not rows:
+            return
+        last_id = rows[-1]["id"]
+        yield [dict(r) for r in rows]
+
+
+def _enriched(chunks, workers: int):
+    # (último id, features) de cada bloque, en el mismo orden. Con workers > 1 la
+    # extracción de skills y la clasificación van a un pool de procesos, con como mucho
+    # 2 bloques por worker en vuelo; la escritura sigue en el proceso principal.
+    if workers <= 1:
+        for rows in chunks:
+            yield rows[-1]["id"], enrich_rows(rows)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for rows in chunks:
+            pending.append((rows[-1]["id"], pool.submit(enrich_rows, rows)))
+            if len(pending) > 2 * workers:
+                last_id, future = pending.popleft()
+                yield last_id, future.result()
+        while pending:
+            last_id, future = pending.popleft()
+            yield last_id, future.result()
+
+
+@traced("enrich.backfill")
+def backfill(engine, force: bool = False, chunk: int = BACKFILL_CHUNK, workers: int = 1,
+             resume: bool = True, progress=None) -> int:
+    # Enriquece las ofertas sin features o con una versión antigua (todas con force=True).
+    # Cada bloque se escribe en su propia transacción. Sin force, una ejecución
+    # interrumpida se reanuda sola (lo ya escrito deja de cumplir el filtro); con force
+    # se guarda el último id escrito en backfill_state y resume=True continúa desde ahí.
+    # progress(rows, last_id) se llama tras cada bloque.
+    cols = [Job.id, Job.title, Job.company, Job.location, Job.description]
+    query = select(*cols).outerjoin(JobFeatures, JobFeatures.job_id == Job.id)
+    if not force:
+        query = query.where(or_(JobFeatures.job_id.is_(None), JobFeatures.enrich_version != ENRICH_VERSION))
+
+    run = f"all-v{ENRICH_VERSION}"
+    done = 0
+    resumed = (load_checkpoint(engine, run) if force and resume else None) or ("", 0)
+
+    for last_id, features in _enriched(_chunks(engine, query, resumed[0], chunk), workers):
+        done += upsert_features(engine, features)
+        if force:
+            save_checkpoint(engine, run, last_id, resumed[1] + done, datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        if progress:
+            progress(done, last_id)
+    if force:
+        clear_checkpoint(engine, run)
+    annotate(rows=done)
+    return done
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--all", action="store_true", help="re-enriquecer todas las ofertas")
+    parser.add_argument("--workers", type=int, default=1, help="procesos para extraer skills / clasificar")
+    parser.add_argument("--chunk", type=int, default=BACKFILL_CHUNK, help="ofertas por bloque (y por transacción)")
+    parser.add_argument("--restart", action="store_true", help="con --all, empezar de cero aunque haya un progreso guardado")
+    args = parser.parse_args()
+
+    engine = get_engine(DB_PATH)
+    init_db(engine)
+    checkpoint = load_checkpoint(engine, f"all-v{ENRICH_VERSION}") if args.all and not args.restart else None
+    if checkpoint:
+        print(f"   Resuming after id={checkpoint[0]} ({checkpoint[1]} rows already done)")
+
+    t0 = time.perf_counter()
+    reported = [0]
+
+    def report(rows, last_id):
+        # una línea cada ~20 bloques
+        if rows - reported[0] >= 20 * args.chunk:
+            reported[0] = rows
+            print(f"   ... rows={rows} | last_id={last_id} | {rows / (time.perf_counter() - t0):.0f} rows/s", flush=True)
+
+    n = backfill(engine, force=args.all, chunk=args.chunk, workers=args.workers, resume=not args.restart, progress=report)
+    elapsed = time.perf_counter() - t0
+    print(f"✅ Enrich done | rows={n} | version={ENRICH_VERSION} | workers={args.workers} "
+          f"| {elapsed:.1f}s | db={DB_PATH}")
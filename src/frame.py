@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from .skills import SKILLS
+
+# Representación compacta de las ofertas en memoria: las columnas de texto con pocos
+# valores distintos como category (códigos enteros + diccionario) y las skills como
+# bitmask de ancho fijo (bit i = SKILLS[i]) en lugar de una lista por fila.
+# Los helpers cuentan sobre los bits y los códigos, sin explode ni strings por fila.
+
+CATEGORY_COLUMNS = ["company", "city", "role", "company_type", "category"]
+MASK_DTYPE = np.uint32 if len(SKILLS) <= 32 else np.uint64
+
+SKILL_NAMES = np.array(SKILLS)
+# Posición de cada skill en orden alfabético, para desempatar como value_counts / sort
+SKILL_ALPHA_RANK = np.argsort(np.argsort(SKILL_NAMES))
+
+
+def compact(jobs: pd.DataFrame) -> pd.DataFrame:
+    out = jobs.copy()
+    for col in CATEGORY_COLUMNS:
+        if col in out and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype("category")
+    if "skills_mask" in out:
+        out["skills_mask"] = out["skills_mask"].fillna(0).to_numpy().astype(MASK_DTYPE)
+    return out
+
+
+def skill_matrix(masks) -> np.ndarray:
+    # ofertas x skills, uint8 (1 si la oferta menciona la skill)
+    bits = np.arange(len(SKILLS), dtype=MASK_DTYPE)
+    return ((np.asarray(masks, dtype=MASK_DTYPE)[:, None] >> bits) & 1).astype(np.uint8)
+
+
+def _ranked(counts: np.ndarray) -> np.ndarray:
+    # índices de skill por count desc y, a igualdad, por nombre
+    return np.lexsort((SKILL_ALPHA_RANK, -counts))
+
+
+def ranked_skills(counts: np.ndarray, n: int | None = None) -> pd.DataFrame:
+    # skill, count a partir de un conteo por skill (orden de SKILLS), sin las que no aparecen
+    order = [i for i in _ranked(counts) if counts[i] > 0][:n]
+    return pd.DataFrame({"skill": SKILL_NAMES[order], "count": counts[order]})
+
+
+def top_skills(frame: pd.DataFrame, n: int | None = None) -> pd.DataFrame:
+    return ranked_skills(skill_matrix(frame["skills_mask"]).sum(axis=0, dtype=np.int64), n)
+
+
+def skill_coverage(frame: pd.DataFrame) -> float:
+    # proporción de ofertas con al menos una skill
+    return float((frame["skills_mask"] != 0).mean()) if len(frame) else 0.0
+
+
+def company_counts(frame: pd.DataFrame) -> pd.DataFrame:
+    counts = frame["company"].value_counts(sort=False)
+    counts = counts[counts > 0].sort_values(ascending=False, kind="stable")
+    return pd.DataFrame({"company": counts.index.astype(str), "offers": counts.to_numpy()})
+
+
+def company_skill_counts(frame: pd.DataFrame) -> np.ndarray:
+    # empresas (códigos de la categoría) x skills: un bincount por bit
+    codes = frame["company"].cat.codes.to_numpy()
+    keep = codes >= 0
+    codes, masks = codes[keep], frame["skills_mask"].to_numpy()[keep]
+    n_companies = len(frame["company"].cat.categories)
+    return np.stack(
+        [np.bincount(codes, weights=(masks >> MASK_DTYPE(bit)) & 1, minlength=n_companies) for bit in range(len(SKILLS))],
+        axis=1,
+    ).astype(np.int64)
+
+
+def company_top_skills(frame: pd.DataFrame, per_company: int = 5) -> pd.DataFrame:
+    # company, skills ("sql, python, ...") con las per_company skills más citadas de cada empresa
+    counts = company_skill_counts(frame)
+    ranked = np.lexsort((np.broadcast_to(SKILL_ALPHA_RANK, counts.shape), -counts), axis=1)[:, :per_company]
+    rows = []
+    for code, idx in enumerate(ranked):
+        idx = idx[counts[code, idx] > 0]
+        if len(idx):
+            rows.append((frame["company"].cat.categories[code], ", ".join(SKILL_NAMES[idx])))
+    return pd.DataFrame(rows, columns=["company", "skills"])
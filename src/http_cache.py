@@ -0,0 +1,142 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlencode
+
+# Caché en disco de respuestas de la API (AdzunaClient(cache=...)), en un SQLite aparte.
+# Clave: URL + parámetros ordenados sin credenciales. Una respuesta dentro del TTL se
+# sirve sin petición (no gasta cuota); caducada, se revalida con If-None-Match /
+# If-Modified-Since si el servidor mandó ETag / Last-Modified y un 304 la renueva.
+# Tamaño acotado: al pasar de max_bytes se borran las menos usadas (LRU por último acceso).
+
+SECRET_PARAMS = {"app_id", "app_key"}
+
+DDL = """
+CREATE TABLE IF NOT EXISTS responses (
+  key TEXT PRIMARY KEY,
+  url TEXT NOT NULL,
+  body BLOB NOT NULL,
+  etag TEXT,
+  last_modified TEXT,
+  stored REAL NOT NULL,
+  accessed REAL NOT NULL,
+  size INTEGER NOT NULL
+)
+"""
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, etag, last_modified, stored: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored = stored
+
+    def json(self):
+        return json.loads(zlib.decompress(self.body))
+
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, path, ttl: float = 86400, max_bytes: int = 200_000_000):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # un solo objeto conexión para todos los threads del cliente, protegido por el lock
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(DDL)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed ON responses (accessed)")
+        self.total = self.conn.execute("SELECT coalesce(sum(size), 0) FROM responses").fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evicted = 0
+        if self.total > self.max_bytes:  # p. ej. si se ha bajado ADZUNA_CACHE_MAX_MB
+            self._evict()
+
+    @staticmethod
+    def key(url: str, params: dict) -> str:
+        public = sorted((k, str(v)) for k, v in params.items() if k not in SECRET_PARAMS)
+        return hashlib.sha256(f"{url}?{urlencode(public)}".encode()).hexdigest()
+
+    def get(self, key: str) -> tuple:
+        # -> (respuesta o None, fresca). Cuenta hit sólo si se puede servir sin petición.
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, stored FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None, False
+            cached = CachedResponse(*row)
+            fresh = time.time() - cached.stored < self.ttl
+            if fresh:
+                self.hits += 1
+                self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+            else:
+                self.misses += 1
+            return cached, fresh
+
+    def put(self, key: str, url: str, data: bytes, etag=None, last_modified=None):
+        body = zlib.compress(data)
+        now = time.time()
+        with self.lock:
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body, etag, last_modified, now, now, len(body)),
+            )
+            self.total += len(body) - (old[0] if old else 0)
+            if self.total > self.max_bytes:
+                self._evict()
+
+    def refresh(self, key: str):
+        # 304 Not Modified: la copia vuelve a ser válida otro TTL
+        now = time.time()
+        with self.lock:
+            self.revalidated += 1
+            self.conn.execute("UPDATE responses SET stored = ?, accessed = ? WHERE key = ?", (now, now, key))
+
+    def _evict(self):
+        # Las menos usadas hasta quedar en el 90% del límite (no desalojar en cada put)
+        target = self.max_bytes * 0.9
+        freed = 0
+        victims = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            if self.total - freed <= target:
+                break
+            victims.append((key,))
+            freed += size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.total -= freed
+        self.evicted += len(victims)
+
+    def close(self):
+        self.conn.close()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "revalidated": self.revalidated,
+                "evicted": self.evicted,
+                "entries": self.conn.execute("SELECT count(*) FROM responses").fetchone()[0],
+                "size_mb": round(self.total / 1e6, 2),
+            }
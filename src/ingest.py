@@ -1,6 +1,21 @@
-from .config import require_env, DB_PATH, KEYWORDS, RESULTS_PER_PAGE
-from .adzuna_client import AdzunaClient
-from .db import get_engine, init_db, get_session, Job
+import argparse
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from .config import require_env, DB_PATH, COUNTRY, INGEST_SPEC, FETCH_WORKERS, RESULTS_PER_PAGE, ARCHIVE, ARCHIVE_DIR
+from .adzuna_client import AdzunaClient, BASE_URL
+from .archive import ArchiveWriter, read_page_results, runs
+from .shards import load_spec, schedulers, shards
+from .db import (
+    get_engine, init_db, upsert_jobs, load_watermarks, save_watermarks, load_api_usage, save_api_usage, data_version,
+)
+from .enrich import enrich_rows
+from .pipeline import Pipeline, Stage
+from .rate_limit import utc_today
+from .snapshot import export_snapshot, snapshot_version
+from .trace import annotate, traced
 
 def pick(d: dict, path: str, default=None):
     # path like "company.display_name"
@@ -13,56 +28,271 @@ def pick(d: dict, path: str, default=None):
             return default
     return cur
 
-def ingest(max_pages_per_keyword: int = 3):
+def parse_created(value: str):
+    # Adzuna: "2026-02-08T04:05:46Z"
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def created_at(value):
+    # datetime UTC sin tzinfo, el formato de Job.created_at
+    if not value:
+        return None
+    try:
+        return parse_created(value).astimezone(timezone.utc).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+def job_row(r: dict, country: str = COUNTRY) -> dict:
+    return {
+        "id": r.get("id"),
+        "title": r.get("title"),
+        "company": pick(r, "company.display_name"),
+        "location": pick(r, "location.display_name"),
+        "category": pick(r, "category.label"),
+        "created": r.get("created"),
+        "created_at": created_at(r.get("created")),
+        "description": r.get("description"),
+        "url": r.get("redirect_url") or r.get("adref"),
+        "salary_min": r.get("salary_min"),
+        "salary_max": r.get("salary_max"),
+        "salary_is_predicted": 1 if r.get("salary_is_predicted") else 0,
+        "salary_interval": r.get("salary_interval"),
+        "currency": r.get("currency"),
+        "country": country,
+    }
+
+def incremental_filters(watermarks: dict, now: datetime, shard_list: list) -> dict:
+    # Ordenado por fecha y limitado a los días desde la marca de agua (+1 de margen)
+    filters = {}
+    for shard in shard_list:
+        f = {"sort_by": "date"}
+        if shard in watermarks:
+            age = now - parse_created(watermarks[shard])
+            f["max_days_old"] = max(1, math.ceil(age.total_seconds() / 86400) + 1)
+        filters[shard] = f
+    return filters
+
+# La ingesta es un pipeline en streaming (src/pipeline.py):
+#   fetch (páginas de la API) -> normalize (job_row) -> dedup -> write (único escritor)
+# Cada etapa va en su thread con colas acotadas entre medias: se descarga mientras se
+# escribe y la memoria no crece con el número de páginas.
+
+def normalize(pages):
+    # (país, ofertas crudas de una página) -> filas de Job
+    for country, results in pages:
+        yield [job_row(r, country) for r in results]
+
+# Ids recordados para descartar ofertas repetidas en la misma ejecución (la misma oferta
+# sale con varios keywords); acotado para no crecer con la ejecución. Lo que se escape lo
+# descarta igualmente el upsert.
+DEDUP_WINDOW = 200_000
+
+def unique(pages, window: int = DEDUP_WINDOW):
+    seen = OrderedDict()
+    for rows in pages:
+        fresh = []
+        for r in rows:
+            if r["id"] is None or r["id"] in seen:
+                continue
+            seen[r["id"]] = None
+            fresh.append(r)
+        while len(seen) > window:
+            seen.popitem(last=False)
+        if fresh:
+            yield fresh
+
+# Filas por transacción como máximo. Cada transacción tiene un coste fijo (enrich,
+# dedup, rollups, commit): con 1 página son ~50 ms y con 20 ~25 ms por página.
+WRITE_BATCH_ROWS = 2000
+
+def writer(engine, update: bool, totals: dict):
+    # Etapa final: mientras escribe se acumulan páginas en su cola y la siguiente
+    # transacción junta todas las que haya (hasta WRITE_BATCH_ROWS filas)
+    def write(pages):
+        for rows in pages:
+            batch = list(rows)
+            while len(batch) < WRITE_BATCH_ROWS and (more := pages.next_nowait()) is not None:
+                batch.extend(more)
+            counts = upsert_jobs(engine, batch, update=update, enrich=enrich_rows)
+            for k, v in counts.items():
+                totals[k] += v
+            yield counts
+    return write
+
+def written(counts: dict) -> int:
+    return sum(counts.values())
+
+def print_stages(stats: dict):
+    for name, st in stats.items():
+        print(f"   Stage {name} | {st}")
+
+@traced("ingest")
+def ingest(max_pages_per_keyword: int = 3, update: bool = False, incremental: bool = False,
+           spec: dict | None = None, workers: int = FETCH_WORKERS, engine=None, base_url: str = BASE_URL,
+           snapshot: bool = True, archive: bool = ARCHIVE):
+    # update=True refresca las ofertas ya guardadas en lugar de saltarlas
+    # incremental=True pide por fecha y deja de paginar al llegar a lo ya visto
+    # spec: países, keywords y cuotas (src/shards.py); por defecto INGEST_SPEC / ADZUNA_COUNTRIES
     require_env()
-    client = AdzunaClient()
+    spec = spec or load_spec()
+    shard_list = shards(spec)
 
-    engine = get_engine(DB_PATH)
+    engine = engine or get_engine(DB_PATH)
     init_db(engine)
-    session = get_session(engine)
 
-    inserted = 0
-    skipped = 0
+    fetched = {country: 0 for country in spec}
+
+    now = datetime.now(timezone.utc)
+    watermarks = load_watermarks(engine) if incremental else {}
+    newest = {}        # shard -> created más reciente en esta ejecución
+    caught_up = set()  # shards que han llegado a la marca de agua o al final
+
+    def older_than_watermark(shard, results):
+        wm = watermarks.get(shard)
+        if wm and all((r.get("created") or "") <= wm for r in results):
+            caught_up.add(shard)
+            return True
+        return False
 
-    for kw in KEYWORDS:
-        for page in range(1, max_pages_per_keyword + 1):
-            data = client.search_jobs(kw, page=page, results_per_page=RESULTS_PER_PAGE)
+    archive = ArchiveWriter() if archive else None
+    # la cuota diaria cuenta también lo gastado hoy por ejecuciones anteriores
+    spent = load_api_usage(engine, utc_today().isoformat())
+    client = AdzunaClient(base_url=base_url, max_workers=workers, schedulers=schedulers(spec, spent))
+
+    # Las páginas de todos los shards llegan en paralelo (workers threads, cada país con su
+    # cuota) y pasan por el pipeline hasta el escritor único
+    pages = client.fetch_pages(
+        shard_list,
+        max_pages=max_pages_per_keyword,
+        results_per_page=RESULTS_PER_PAGE,
+        filters_by_keyword=incremental_filters(watermarks, now, shard_list) if incremental else None,
+        stop=older_than_watermark if incremental else None,
+        # en incremental casi siempre basta con la primera página: no especulamos
+        per_keyword=1 if incremental else None,
+    )
+
+    def fetch():
+        for shard, page, data in pages:
+            country, kw = shard
+            if archive:
+                archive.write(kw, page, data, country=country)
             results = data.get("results", []) or []
-            if not results:
-                break
-
-            for r in results:
-                job_id = r.get("id")
-                if not job_id:
-                    continue
-
-                if session.get(Job, job_id):
-                    skipped += 1
-                    continue
-
-                job = Job(
-                    id=job_id,
-                    title=r.get("title"),
-                    company=pick(r, "company.display_name"),
-                    location=pick(r, "location.display_name"),
-                    category=pick(r, "category.label"),
-                    created=r.get("created"),
-                    description=r.get("description"),
-                    url=r.get("redirect_url") or r.get("adref"),
-                    salary_min=r.get("salary_min"),
-                    salary_max=r.get("salary_max"),
-                    salary_is_predicted=1 if r.get("salary_is_predicted") else 0,
-                    salary_interval=r.get("salary_interval"),
-                    currency=r.get("currency"),
-                )
-
-                session.add(job)
-                inserted += 1
-
-            session.commit()
-
-    session.close()
-    print(f"✅ Ingest done | inserted={inserted} | skipped(existing)={skipped} | db={DB_PATH}")
+            if len(results) < RESULTS_PER_PAGE:
+                caught_up.add(shard)
+
+            created = [r["created"] for r in results if r.get("created")]
+            if created:
+                newest[shard] = max(newest.get(shard, ""), max(created))
+
+            fetched[country] += len(results)
+            yield country, results
+
+    totals = {"inserted": 0, "updated": 0, "skipped": 0}
+    pipeline = Pipeline("ingest", [
+        Stage("fetch", fetch, size=lambda page: len(page[1])),
+        Stage("normalize", normalize),
+        Stage("dedup", unique),
+        Stage("write", writer(engine, update, totals), size=written),
+    ])
+    try:
+        pipeline.run()
+    finally:
+        # también si el pipeline falla; los contadores del cliente siguen valiendo después
+        client.close()
+        if archive:
+            archive.close()
+        save_api_usage(engine, {country: s.issued for country, s in client.schedulers.items()})
+
+    # lo ya descargado queda guardado; el resto en la siguiente ejecución
+    for country in sorted(client.exhausted):
+        print(f"⚠️ Daily request budget exhausted for {country} ({spec[country]['daily_limit']})")
+
+    if incremental:
+        # Sólo avanzamos la marca si no queda un hueco entre la anterior y la nueva
+        marks = {}
+        for shard in shard_list:
+            if shard[0] in client.exhausted:
+                continue
+            marks[shard] = watermarks.get(shard)
+            if shard in newest and (shard not in watermarks or shard in caught_up):
+                marks[shard] = max(newest[shard], watermarks.get(shard, ""))
+        save_watermarks(engine, {s: c for s, c in marks.items() if c}, now.isoformat(timespec="seconds"))
+
+    stats = pipeline.stats()
+    print(
+        f"✅ Ingest done | inserted={totals['inserted']} | updated={totals['updated']} "
+        f"| skipped(existing)={totals['skipped']} | duplicates={stats['normalize']['rows'] - stats['dedup']['rows']} "
+        f"| shards={len(shard_list)} | transactions={stats['write']['items']} | db={engine.url.database}"
+    )
+    print_stages(stats)
+    for country, n in fetched.items():
+        print(f"   {country} | fetched={n} | API {client.schedulers[country].stats()}")
+    if client.cache is not None:
+        print(f"   Cache | {client.cache.stats()}")
+    if archive and archive.pages:
+        print(f"   Archive | pages={archive.pages} | run={archive.run}")
+    annotate(rows=sum(totals.values()))
+    if snapshot:
+        refresh_snapshot(engine)
+    return totals
+
+def refresh_snapshot(engine):
+    # Copia Parquet para el dashboard; sólo si ha cambiado algo desde la última, y
+    # reescribiendo sólo los meses tocados
+    if snapshot_version() != data_version(engine):
+        print(f"   Snapshot | rows={export_snapshot(engine, incremental=True)}")
+
+@traced("ingest.replay")
+def replay(selected: list | None = None, update: bool = False, engine=None, root=ARCHIVE_DIR,
+           snapshot: bool = True):
+    # Recarga jobs desde el archivo (src/archive.py), sin red ni cuota, con el mismo pipeline
+    # que la ingesta. Las ejecuciones van de la más antigua a la más reciente, así que con
+    # update=True queda la última versión de cada oferta (p. ej. para rellenar un campo nuevo
+    # de job_row()); por eso entonces no se descartan repetidas, que ganaría la primera.
+    engine = engine or get_engine(DB_PATH)
+    init_db(engine)
+    totals = {"inserted": 0, "updated": 0, "skipped": 0}
+    t0 = time.perf_counter()
+
+    stages = [
+        Stage("read", lambda: read_page_results(selected, root), size=lambda page: len(page[1])),
+        Stage("normalize", normalize),
+        Stage("dedup", unique),
+        Stage("write", writer(engine, update, totals), size=written),
+    ]
+    pipeline = Pipeline("replay", [s for s in stages if not (update and s.name == "dedup")])
+    stats = pipeline.run()
+
+    elapsed = time.perf_counter() - t0
+    seen = stats["normalize"]["rows"]
+    print(
+        f"✅ Replay done | records={seen} | inserted={totals['inserted']} | updated={totals['updated']} "
+        f"| skipped(existing)={totals['skipped']} | {seen / max(elapsed, 1e-9):,.0f} records/s "
+        f"| db={engine.url.database}"
+    )
+    print_stages(stats)
+    annotate(rows=seen)
+    if snapshot:
+        refresh_snapshot(engine)
+    return totals
 
 if __name__ == "__main__":
-    ingest(max_pages_per_keyword=25)
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=25, help="máximo de páginas por keyword")
+    parser.add_argument("--incremental", action="store_true", help="sólo ofertas nuevas desde la última ejecución")
+    parser.add_argument("--update", action="store_true", help="refrescar ofertas ya guardadas")
+    parser.add_argument("--countries", nargs="+", help="mercados a ingerir (por defecto INGEST_SPEC / ADZUNA_COUNTRIES)")
+    parser.add_argument("--spec", help="fichero JSON con países, keywords y cuotas (ver src/shards.py)")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS, help="peticiones en paralelo")
+    parser.add_argument("--replay", nargs="*", metavar="RUN",
+                        help="recargar desde el archivo de respuestas (todas las ejecuciones o las indicadas)")
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        if not runs(ARCHIVE_DIR):
+            print(f"⚠️ No archived runs in {ARCHIVE_DIR}")
+        else:
+            replay(args.replay or None, update=args.update)
+    else:
+        spec = load_spec(args.spec or INGEST_SPEC, countries=args.countries)
+        ingest(max_pages_per_keyword=args.pages, update=args.update, incremental=args.incremental,
+               spec=spec, workers=args.workers)
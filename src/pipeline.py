@@ -0,0 +1,168 @@
+import threading
+import time
+from queue import Empty, Full, Queue
+from typing import Callable, NamedTuple
+
+from .trace import span
+
+# Etapas en streaming, cada una en su thread y unidas por colas acotadas: la primera
+# produce (p. ej. páginas de la API), las demás reciben un Inbox y devuelven un iterable.
+# Si una etapa va lenta su cola se llena y la anterior espera (backpressure), así que la
+# memoria en vuelo no depende de cuántas páginas haya. Por etapa se guarda qué produce
+# (items, filas), cuánto espera a la anterior (starved) y cuánto a la siguiente (blocked).
+# Si una etapa falla se paran las anteriores; las siguientes terminan lo que ya les ha
+# llegado (p. ej. se escriben las páginas ya descargadas) y run() relanza el error.
+
+# Items por cola como máximo
+QUEUE_SIZE = 64
+# Cada cuánto se mira si otra etapa ha fallado mientras se espera en una cola
+POLL_S = 0.1
+
+_END = object()
+
+
+class Stopped(Exception):
+    # Una etapa posterior ha fallado: esta termina sin más
+    pass
+
+
+class Stage(NamedTuple):
+    name: str
+    fn: Callable            # primera etapa: fn() -> iterable; el resto: fn(inbox) -> iterable
+    size: Callable = len    # filas de cada item que produce (para rows/s)
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.rows = 0
+        self.elapsed = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.max_queue = 0
+
+    def stats(self) -> dict:
+        busy = max(self.elapsed - self.starved - self.blocked, 0.0)
+        return {
+            "items": self.items,
+            "rows": self.rows,
+            "rows_per_s": round(self.rows / self.elapsed) if self.elapsed else 0,
+            "busy_s": round(busy, 3),
+            "starved_s": round(self.starved, 3),
+            "blocked_s": round(self.blocked, 3),
+            "max_queue": self.max_queue,
+        }
+
+
+class Inbox:
+    # Entrada de una etapa: se itera (espera a la anterior) o next_nowait() coge lo que ya hay
+    def __init__(self, queue: Queue, stats: StageStats, stop: threading.Event):
+        self.queue = queue
+        self.stats = stats
+        self.stop = stop
+        self.ended = False
+
+    def __iter__(self):
+        while not self.ended:
+            t0 = time.perf_counter()
+            while True:
+                try:
+                    item = self.queue.get(timeout=POLL_S)
+                    break
+                except Empty:
+                    if self.stop.is_set():
+                        raise Stopped
+            self.stats.starved += time.perf_counter() - t0
+            if item is _END:
+                self.ended = True
+                return
+            yield item
+
+    def next_nowait(self):
+        # El siguiente item si ya está en la cola; None si no (o si se ha acabado)
+        if self.ended:
+            return None
+        try:
+            item = self.queue.get_nowait()
+        except Empty:
+            return None
+        if item is _END:
+            self.ended = True
+            return None
+        return item
+
+
+class Pipeline:
+    def __init__(self, name: str, stages: list, queue_size: int = QUEUE_SIZE):
+        self.name = name
+        self.stages = stages
+        self.queues = [Queue(maxsize=queue_size) for _ in stages[1:]]
+        self.stage_stats = [StageStats(s.name) for s in stages]
+        # stops[i]: alguna etapa posterior a i ha fallado
+        self.stops = [threading.Event() for _ in stages]
+        self.error = None
+        self.lock = threading.Lock()
+
+    def run(self):
+        # Bloquea hasta que terminan todas las etapas; relanza el primer error
+        threads = [
+            threading.Thread(target=self._run_stage, args=(i,), name=f"{self.name}.{s.name}", daemon=True)
+            for i, s in enumerate(self.stages)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if self.error is not None:
+            raise self.error
+        return self.stats()
+
+    def stats(self) -> dict:
+        return {s.name: s.stats() for s in self.stage_stats}
+
+    def _run_stage(self, i: int):
+        stage, stats = self.stages[i], self.stage_stats[i]
+        out = self.queues[i] if i < len(self.queues) else None
+        t0 = time.perf_counter()
+        items = None
+        try:
+            with span(f"{self.name}.{stage.name}") as s:
+                items = stage.fn(Inbox(self.queues[i - 1], stats, self.stops[i])) if i else stage.fn()
+                for item in items:
+                    stats.items += 1
+                    stats.rows += stage.size(item)
+                    if out is not None:
+                        self._put(out, item, stats, self.stops[i])
+                s.set(rows=stats.rows)
+        except Stopped:
+            pass
+        except BaseException as e:
+            with self.lock:
+                self.error = self.error or e
+            for stop in self.stops[:i]:
+                stop.set()
+        finally:
+            if hasattr(items, "close"):
+                items.close()  # generador a medias (p. ej. fetch_pages cancela lo pendiente)
+            if out is not None:
+                try:
+                    self._put(out, _END, stats, self.stops[i])
+                except Stopped:
+                    pass
+            stats.elapsed = time.perf_counter() - t0
+
+    @staticmethod
+    def _put(queue: Queue, item, stats: StageStats, stop: threading.Event):
+        if stop.is_set():
+            raise Stopped
+        t0 = time.perf_counter()
+        while True:
+            try:
+                queue.put(item, timeout=POLL_S)
+                break
+            except Full:
+                if stop.is_set():
+                    raise Stopped
+        stats.blocked += time.perf_counter() - t0
+        stats.max_queue = max(stats.max_queue, queue.qsize())
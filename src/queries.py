@@ -0,0 +1,235 @@
+import pandas as pd
+from sqlalchemy import text
+
+from .config import COUNTRY
+from .sketch import QUANTILES, quantiles
+from .skills import SKILLS
+
+# Consultas del dashboard: cada una agrega en SQLite y sólo lee las columnas que necesita
+# (nunca la descripción). Los filtros del dashboard (empresa válida, empleador directo,
+# ciudad distinta de "España") van en el WHERE de SCOPE.
+# Los conteos por día / ciudad / rol / skill y las sumas de salario se leen de las
+# tablas rollup_*, que la ingesta mantiene al día: su coste no depende del histórico.
+# Las agregaciones recorren toda la tabla: el "+" unario delante de una columna evita
+# que SQLite elija su índice (búsquedas aleatorias fila a fila, más lentas que un scan).
+
+JOB_BOARD_NAMES = ["indeed", "linkedin", "infojobs", "jooble", "trabajos.com"]
+
+# Anuncios válidos: del mercado del dashboard, empresa con nombre real (no un portal de
+# empleo) y ciudad concreta. Cambiar COUNTRY obliga a recalcular las rollups.
+VALID_POSTING = """
+    coalesce(j.country, '{country}') = '{country}'
+    AND +j.company IS NOT NULL
+    AND trim(j.company, ' ' || char(9, 10, 13)) != ''
+    AND lower(j.company) != 'unknown'
+    AND j.company NOT LIKE '%.com%'
+    AND lower(j.company) NOT IN ({job_boards})
+    AND lower(replace(coalesce(f.city, ''), 'Ñ', 'ñ')) != 'españa'
+""".format(country=COUNTRY, job_boards=", ".join(f"'{b}'" for b in JOB_BOARD_NAMES))
+
+# Ofertas válidas: anuncios válidos sin contar las repeticiones de otra oferta (src/dedup.py).
+# Es también el universo de las tablas rollup_* (src/rollups.py).
+VALID_JOB = f"""{VALID_POSTING}
+    AND coalesce(f.is_canonical, 1) = 1
+"""
+
+SCOPE = f"""
+    FROM jobs j
+    JOIN job_features f ON f.job_id = j.id
+    WHERE {VALID_JOB}
+      AND f.company_type = 'Direct Employer'
+"""
+
+# Media de salary_min / salary_max ignorando nulos
+SALARY = """
+    CASE
+      WHEN j.salary_min IS NOT NULL AND j.salary_max IS NOT NULL THEN (j.salary_min + j.salary_max) / 2.0
+      ELSE coalesce(j.salary_min, j.salary_max)
+    END
+"""
+
+# Una fila por skill para "explotar" skills_mask con un JOIN
+SKILL_BITS_CTE = "skill_bits(bit, skill) AS (VALUES {})".format(
+    ", ".join(f"({i}, '{s}')" for i, s in enumerate(SKILLS))
+)
+
+
+# Filtro del dashboard sobre las rollups (ya limitadas a ofertas válidas)
+DIRECT = "company_type = 'Direct Employer'"
+
+
+def read(engine, sql: str, **params) -> pd.DataFrame:
+    return pd.read_sql(text(sql), engine, params=params)
+
+
+def overview_stats(engine) -> dict:
+    row = read(engine, f"""
+        SELECT
+          SUM(offers) AS total,
+          SUM(remote) AS remote,
+          SUM(with_skill) AS with_skill,
+          SUM(CASE WHEN lower(trim(city)) = 'madrid' THEN offers END) AS madrid,
+          SUM(CASE WHEN lower(trim(city)) = 'barcelona' THEN offers END) AS barcelona
+        FROM rollup_daily
+        WHERE {DIRECT}
+    """).iloc[0]
+    return {k: int(v or 0) for k, v in row.items()}
+
+
+def duplicate_count(engine) -> int:
+    # Anuncios del universo del dashboard descartados por repetir otra oferta
+    return int(read(engine, f"""
+        SELECT COUNT(*) AS n
+        FROM job_features f
+        CROSS JOIN jobs j ON j.id = f.job_id
+        WHERE f.is_canonical = 0
+          AND {VALID_POSTING}
+          AND f.company_type = 'Direct Employer'
+    """)["n"].iloc[0])
+
+
+def top_cities(engine, n: int = 10) -> pd.DataFrame:
+    return read(engine, f"""
+        SELECT CASE WHEN city = '' THEN 'Unknown' ELSE city END AS city, SUM(offers) AS count
+        FROM rollup_daily
+        WHERE {DIRECT}
+        GROUP BY 1
+        ORDER BY count DESC, city
+        LIMIT :n
+    """, n=n)
+
+
+def top_companies(engine, n: int = -1) -> pd.DataFrame:
+    # n=-1: todas
+    return read(engine, f"""
+        SELECT +j.company AS company, COUNT(*) AS offers
+        {SCOPE}
+        GROUP BY 1
+        ORDER BY offers DESC, MIN(j.rowid)
+        LIMIT :n
+    """, n=n)
+
+
+def role_counts(engine) -> pd.DataFrame:
+    return read(engine, f"""
+        SELECT role, SUM(offers) AS offers
+        FROM rollup_daily
+        WHERE {DIRECT}
+        GROUP BY role
+        ORDER BY offers DESC, role
+    """)
+
+
+def top_skills(engine, n: int = -1) -> pd.DataFrame:
+    return read(engine, f"""
+        SELECT skill, SUM(mentions) AS count
+        FROM rollup_skill_daily
+        WHERE {DIRECT}
+        GROUP BY skill
+        ORDER BY count DESC, skill
+        LIMIT :n
+    """, n=n)
+
+
+def company_top_skills(engine, per_company: int = 5) -> pd.DataFrame:
+    # company, skills ("sql, python, ...") con las per_company skills más citadas de cada empresa
+    ranked = read(engine, f"""
+        WITH {SKILL_BITS_CTE},
+        scoped AS (SELECT +j.company AS company, f.skills_mask AS mask {SCOPE}),
+        counts AS (
+          SELECT company, s.skill AS skill, COUNT(*) AS count
+          FROM scoped
+          JOIN skill_bits s ON (scoped.mask >> s.bit) & 1
+          GROUP BY company, s.skill
+        )
+        SELECT company, skill
+        FROM (
+          SELECT company, skill, ROW_NUMBER() OVER (PARTITION BY company ORDER BY count DESC, skill) AS rn
+          FROM counts
+        )
+        WHERE rn <= :k
+        ORDER BY company, rn
+    """, k=per_company)
+    return ranked.groupby("company", sort=False)["skill"].agg(", ".join).rename("skills").reset_index()
+
+
+def daily_trend(engine) -> pd.DataFrame:
+    trend = read(engine, f"""
+        SELECT day AS date, SUM(offers) AS offers
+        FROM rollup_daily
+        WHERE {DIRECT} AND day != ''
+        GROUP BY day
+        ORDER BY day
+    """)
+    trend["date"] = pd.to_datetime(trend["date"]).dt.date
+    return trend
+
+
+def salary_summary(engine, exact: bool = False) -> dict:
+    row = read(engine, f"""
+        SELECT SUM(n) AS n, SUM(total) / SUM(n) AS avg_salary
+        FROM rollup_salary
+        WHERE {DIRECT}
+    """).iloc[0]
+    n = int(row["n"] or 0)
+    pct = salary_percentiles(engine, group=None, exact=exact)
+    return {
+        "n": n,
+        "avg_salary": row["avg_salary"] if n else None,
+        **{name: pct[name].iloc[0] if len(pct) else None for name in QUANTILES},
+    }
+
+
+def salary_percentiles(engine, group: str | None, exact: bool = False) -> pd.DataFrame:
+    # group ("city", "role" o None: global) + p25/median/p75/p90 de salary.
+    # Por defecto desde los sketches de rollup_salary_sketch (error relativo <= 1%);
+    # exact=True los calcula sobre todas las ofertas, para validar.
+    key = group or "''"
+    if exact:
+        values = read(engine, f"SELECT {'+f.' + group if group else key} AS grp, {SALARY} AS v {SCOPE}")
+        values = values[(values["v"] > 0) & values["grp"].notna()]
+        pct = values.groupby("grp")["v"].quantile(list(QUANTILES.values())).unstack()
+        pct.columns = list(QUANTILES)
+        pct = pct.reset_index()
+    else:
+        buckets = read(engine, f"""
+            SELECT {key} AS grp, bucket, SUM(n) AS n
+            FROM rollup_salary_sketch
+            WHERE {DIRECT}
+            GROUP BY 1, 2
+            ORDER BY 1, 2
+        """)
+        pct = pd.DataFrame(
+            [{"grp": grp, **quantiles(b["bucket"], b["n"])} for grp, b in buckets.groupby("grp")],
+            columns=["grp", *QUANTILES],
+        )
+        pct = pct[pct["grp"] != ""] if group else pct
+    return pct.rename(columns={"grp": group or "grp"})
+
+
+def salary_by(engine, group: str, exact: bool = False) -> pd.DataFrame:
+    # group: "city" o "role" -> group, avg_salary, median_salary, p25/p75/p90, n
+    stats = read(engine, f"""
+        SELECT {group}, SUM(total) / SUM(n) AS avg_salary, SUM(n) AS n
+        FROM rollup_salary
+        WHERE {DIRECT} AND {group} != ''
+        GROUP BY {group}
+        ORDER BY {group}
+    """)
+    pct = salary_percentiles(engine, group, exact=exact)
+    return stats.merge(pct, on=group, how="left")[[group, "avg_salary", *QUANTILES, "n"]]
+
+
+def latest_offers(engine, n: int) -> pd.DataFrame:
+    # A igualdad de fecha, por id (el mismo orden que Selection.latest en el cubo). Con
+    # SCOPE el planificador ordenaría todas las ofertas; CROSS JOIN deja jobs fuera y
+    # recorre ix_jobs_created_at, ordenando por id sólo los empates
+    return read(engine, f"""
+        SELECT j.created, j.title, j.company, f.city, j.category, j.url
+        FROM jobs j
+        CROSS JOIN job_features f ON f.job_id = j.id
+        WHERE {VALID_JOB}
+          AND f.company_type = 'Direct Employer'
+        ORDER BY j.created_at DESC, j.id DESC
+        LIMIT :n
+    """, n=n)
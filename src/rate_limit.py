@@ -0,0 +1,150 @@
+import random
+import threading
+import time
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class QuotaExhausted(RuntimeError):
+    pass
+
+
+class TokenBucket:
+    # rate = tokens por segundo, capacity = ráfaga máxima. rate <= 0 desactiva el límite.
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        # Bloquea hasta tener un token; devuelve los segundos esperados
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def retry_after_seconds(response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+class RequestScheduler:
+    # Token bucket + presupuesto diario (día UTC) + reintentos (429/5xx) con backoff exponencial
+    # y jitter. spent_today: peticiones ya hechas hoy por ejecuciones anteriores (db.load_api_usage);
+    # las de este proceso quedan en issued para guardarlas (db.save_api_usage).
+    def __init__(self, rate: float = 0, burst: float = 1, daily_limit: int = 0,
+                 max_retries: int = 5, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 spent_today: int = 0):
+        self.bucket = TokenBucket(rate, burst)
+        self.daily_limit = daily_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.lock = threading.Lock()
+        self.day = utc_today()
+        self.issued_today = spent_today
+        self.issued = {}  # día ISO -> peticiones de este proceso
+        self.blocked_until = 0.0  # pausa global tras un Retry-After
+
+        self.requests = 0
+        self.retried = 0
+        self.throttled_wait = 0.0
+        self.backoff_wait = 0.0
+
+    def _take_daily(self):
+        with self.lock:
+            today = utc_today()
+            if today != self.day:
+                self.day = today
+                self.issued_today = 0
+            if self.daily_limit and self.issued_today >= self.daily_limit:
+                raise QuotaExhausted(f"Daily request budget exhausted ({self.daily_limit})")
+            self.issued_today += 1
+            self.issued[today.isoformat()] = self.issued.get(today.isoformat(), 0) + 1
+            self.requests += 1
+
+    def _wait_turn(self):
+        waited = self.bucket.acquire()
+        with self.lock:
+            pause = self.blocked_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+        with self.lock:
+            self.throttled_wait += waited
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        if retry_after is not None:
+            delay = min(retry_after, self.backoff_max)
+            # si el servidor pide esperar, frenamos a todos los threads
+            with self.lock:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            return delay
+        cap = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return random.uniform(0, cap)
+
+    def send(self, do_request):
+        # do_request() -> requests.Response. Devuelve la última respuesta (puede ser un error).
+        attempt = 0
+        while True:
+            self._wait_turn()
+            self._take_daily()
+            try:
+                response = do_request()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = None
+            else:
+                if response.status_code not in RETRY_STATUS or attempt >= self.max_retries:
+                    return response
+                retry_after = retry_after_seconds(response)
+
+            delay = self._backoff(attempt, retry_after)
+            with self.lock:
+                self.retried += 1
+                self.backoff_wait += delay
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "spent_today": self.issued_today,
+                "retried": self.retried,
+                "throttled_wait_s": round(self.throttled_wait, 3),
+                "backoff_wait_s": round(self.backoff_wait, 3),
+            }
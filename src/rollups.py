@@ -0,0 +1,165 @@
+import argparse
+
+from sqlalchemy import text
+
+from .queries import SALARY, SKILL_BITS_CTE, VALID_JOB
+
+# Tablas rollup_* (modelos en src/db.py): agregados de las ofertas válidas que lee el
+# dashboard; los percentiles de salario salen de rollup_salary_sketch (src/sketch.py).
+# Se mantienen de forma incremental en la misma transacción que escribe jobs /
+# job_features: se resta la contribución previa de las ofertas que se reescriben y se
+# suma la nueva. `python -m src.rollups --rebuild` las recalcula enteras. De paso se
+# apuntan en snapshot_dirty los meses de esas ofertas, los que hay que re-exportar a Parquet.
+
+TABLES = ["rollup_daily", "rollup_skill_daily", "rollup_salary", "rollup_salary_sketch"]
+
+# {source} define las ofertas que se agregan (todas o las de rollup_ids).
+# CROSS JOIN fija el orden en SQLite: rollup_ids no tiene estadísticas y, si no,
+# el planificador recorre jobs entero en vez de buscar cada id.
+ROLLUP_SQL = [
+    f"""
+    INSERT INTO rollup_daily (day, city, role, company_type, offers, remote, with_skill)
+    SELECT coalesce(date(j.created_at), ''), coalesce(f.city, ''), f.role, f.company_type,
+           :sign * COUNT(*), :sign * SUM(f.is_remote), :sign * SUM(f.skills_mask != 0)
+    FROM {{source}}
+    JOIN job_features f ON f.job_id = j.id
+    WHERE {VALID_JOB}
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (day, city, role, company_type) DO UPDATE SET
+      offers = offers + excluded.offers,
+      remote = remote + excluded.remote,
+      with_skill = with_skill + excluded.with_skill
+    """,
+    f"""
+    WITH {SKILL_BITS_CTE}
+    INSERT INTO rollup_skill_daily (day, skill, company_type, mentions)
+    SELECT coalesce(date(j.created_at), ''), s.skill, f.company_type, :sign * COUNT(*)
+    FROM {{source}}
+    JOIN job_features f ON f.job_id = j.id
+    CROSS JOIN skill_bits s ON (f.skills_mask >> s.bit) & 1
+    WHERE {VALID_JOB}
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, skill, company_type) DO UPDATE SET
+      mentions = mentions + excluded.mentions
+    """,
+    f"""
+    INSERT INTO rollup_salary (city, role, company_type, n, total)
+    SELECT city, role, company_type, :sign * COUNT(*), :sign * SUM(v)
+    FROM (
+      SELECT coalesce(f.city, '') AS city, f.role AS role, f.company_type AS company_type,
+             {SALARY} AS v
+      FROM {{source}}
+      JOIN job_features f ON f.job_id = j.id
+      WHERE {VALID_JOB}
+    )
+    WHERE v > 0
+    GROUP BY 1, 2, 3
+    ON CONFLICT (city, role, company_type) DO UPDATE SET
+      n = n + excluded.n,
+      total = total + excluded.total
+    """,
+    f"""
+    INSERT INTO rollup_salary_sketch (city, role, company_type, bucket, n)
+    SELECT city, role, company_type, salary_bucket(v), :sign * COUNT(*)
+    FROM (
+      SELECT coalesce(f.city, '') AS city, f.role AS role, f.company_type AS company_type,
+             {SALARY} AS v
+      FROM {{source}}
+      JOIN job_features f ON f.job_id = j.id
+      WHERE {VALID_JOB}
+    )
+    WHERE v > 0
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (city, role, company_type, bucket) DO UPDATE SET
+      n = n + excluded.n
+    """,
+]
+
+# Grupos que se quedan a cero al restar
+PRUNE_SQL = [
+    "DELETE FROM rollup_daily WHERE offers = 0",
+    "DELETE FROM rollup_skill_daily WHERE mentions = 0",
+    "DELETE FROM rollup_salary WHERE n = 0",
+    "DELETE FROM rollup_salary_sketch WHERE n = 0",
+]
+
+
+def _aggregate(conn, source: str, sign: int):
+    for sql in ROLLUP_SQL:
+        conn.execute(text(sql.format(source=source)), {"sign": sign})
+    if sign < 0:
+        for sql in PRUNE_SQL:
+            conn.execute(text(sql))
+
+
+def apply_rollups(conn, ids, sign: int = 1):
+    # Suma (sign=1) o resta (sign=-1) la contribución actual de las ofertas ids.
+    # Sólo cuentan las que ya tienen job_features.
+    if not ids:
+        return
+    conn.execute(text("CREATE TEMP TABLE IF NOT EXISTS rollup_ids (id TEXT PRIMARY KEY)"))
+    conn.execute(text("DELETE FROM rollup_ids"))
+    conn.execute(
+        text("INSERT OR IGNORE INTO rollup_ids (id) VALUES (:id)"), [{"id": i} for i in ids],
+    )
+    _aggregate(conn, "rollup_ids r CROSS JOIN jobs j ON j.id = r.id", sign)
+    conn.execute(text(
+        "INSERT INTO snapshot_dirty (month) "
+        "SELECT DISTINCT coalesce(strftime('%Y-%m', j.created_at), 'unknown') "
+        "FROM rollup_ids r CROSS JOIN jobs j ON j.id = r.id"
+    ))
+
+
+def recompute(conn):
+    for table in TABLES:
+        conn.execute(text(f"DELETE FROM {table}"))
+    _aggregate(conn, "jobs j", 1)
+    conn.execute(text("INSERT INTO snapshot_dirty (month) VALUES ('*')"))
+
+
+def rebuild(engine):
+    from .db import bump_data_version  # src/db.py importa este módulo
+
+    with engine.begin() as conn:
+        recompute(conn)
+        bump_data_version(conn)
+
+
+def rollups_missing(engine) -> bool:
+    # Bases de datos anteriores a una tabla rollup: hay features pero no su agregado
+    with engine.connect() as conn:
+        def has_rows(table):
+            return conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first() is not None
+
+        return (
+            (has_rows("job_features") and not has_rows("rollup_daily"))
+            or (has_rows("rollup_salary") and not has_rows("rollup_salary_sketch"))
+        )
+
+
+def ensure_built(engine):
+    # Se calculan una vez a partir de jobs si faltan
+    if rollups_missing(engine):
+        rebuild(engine)
+
+
+def table_sizes(engine) -> dict:
+    with engine.connect() as conn:
+        return {t: conn.execute(text(f"SELECT COUNT(*) FROM {t}")).scalar() for t in TABLES}
+
+
+if __name__ == "__main__":
+    from .config import DB_PATH
+    from .db import get_engine, init_db
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rebuild", action="store_true",
+                        help="recalcular las rollups desde jobs / job_features")
+    args = parser.parse_args()
+
+    engine = get_engine(DB_PATH)
+    init_db(engine)
+    if args.rebuild:
+        rebuild(engine)
+    sizes = " | ".join(f"{t}={n}" for t, n in table_sizes(engine).items())
+    print(f"✅ Rollups {'rebuilt' if args.rebuild else 'ok'} | {sizes} | db={DB_PATH}")
@@ -0,0 +1,165 @@
+import argparse
+import re
+
+import pandas as pd
+from sqlalchemy import text
+
+from .queries import VALID_JOB, read
+
+# Búsqueda de texto completo sobre título y descripción con SQLite FTS5.
+# jobs_fts es una tabla "external content": no copia el texto, indexa jobs por rowid y
+# los triggers la mantienen al día con cualquier INSERT / UPDATE / DELETE en jobs
+# (también los upserts de la ingesta). Un VACUUM puede renumerar los rowid de jobs:
+# después hay que reconstruirla (python -m src.search --rebuild).
+
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+      title, description,
+      content='jobs', content_rowid='rowid',
+      tokenize="unicode61 remove_diacritics 2"
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+      INSERT INTO jobs_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+      INSERT INTO jobs_fts (jobs_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, description ON jobs BEGIN
+      INSERT INTO jobs_fts (jobs_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+      INSERT INTO jobs_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+]
+
+# bm25 con más peso para el título
+RANK = "bm25(10.0, 1.0)"
+
+# Palabras; "analyt*" busca por prefijo
+TOKEN_RE = re.compile(r"(\w+)(\*?)")
+
+# Ofertas más recientes (por rowid) entre las que se ordena por relevancia al empezar
+SEARCH_WINDOW = 20_000
+
+# Candidatos por relevancia antes de aplicar el filtro del dashboard
+CANDIDATES_PER_RESULT = 4
+
+SEARCH_COLUMNS = ["id", "created", "title", "company", "city", "category", "url", "snippet"]
+
+# 1) los :k rowid mejor puntuados de la ventana, sólo con el índice FTS
+# 2) filtro del dashboard sobre esos candidatos
+# 3) snippet sólo para los :n resultados (CROSS JOIN fija el orden de los joins)
+SEARCH_SQL = """
+    WITH candidates AS (
+      SELECT rowid AS rid, rank
+      FROM jobs_fts
+      WHERE jobs_fts MATCH :q AND rowid > :since
+      ORDER BY rank
+      LIMIT :k
+    ),
+    top AS (
+      SELECT c.rid, c.rank
+      FROM candidates c
+      CROSS JOIN jobs j ON j.rowid = c.rid
+      CROSS JOIN job_features f ON f.job_id = j.id
+      WHERE {VALID_JOB}
+        AND f.company_type = 'Direct Employer'
+      ORDER BY c.rank
+      LIMIT :n
+    )
+    SELECT j.id, j.created, j.title, j.company, f.city, j.category, j.url,
+           snippet(jobs_fts, 1, '[', ']', '…', 12) AS snippet
+    FROM {snippet_source}
+    CROSS JOIN jobs j ON j.rowid = jobs_fts.rowid
+    CROSS JOIN job_features f ON f.job_id = j.id
+    WHERE jobs_fts MATCH :q
+    ORDER BY top.rank
+"""
+
+# Para el snippet FTS5 vuelve a evaluar la consulta: por rowid es lo más rápido con
+# palabras completas, pero un prefijo se expande en cada búsqueda y compensa recorrer
+# el rango de rowid de los resultados una sola vez.
+SNIPPET_BY_ROWID = "top CROSS JOIN jobs_fts ON jobs_fts.rowid = top.rid"
+SNIPPET_BY_RANGE = (
+    "jobs_fts CROSS JOIN top ON top.rid = jobs_fts.rowid "
+    "AND jobs_fts.rowid >= (SELECT min(rid) FROM top)"
+)
+
+
+def ensure_fts(conn):
+    # Idempotente: crea índice y triggers si faltan y lo llena la primera vez
+    exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'")).first()
+    for ddl in FTS_DDL:
+        conn.execute(text(ddl))
+    if not exists:
+        _rebuild(conn)
+
+
+def _rebuild(conn):
+    conn.execute(text("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')"))
+    conn.execute(text("INSERT INTO jobs_fts (jobs_fts, rank) VALUES ('rank', :rank)"), {"rank": RANK})
+
+
+def rebuild(engine):
+    with engine.begin() as conn:
+        ensure_fts(conn)
+        _rebuild(conn)
+        conn.execute(text("INSERT INTO jobs_fts (jobs_fts) VALUES ('optimize')"))
+
+
+def fts_query(query: str) -> str:
+    # Texto libre -> consulta FTS5 segura: todas las palabras (AND) entre comillas
+    return " ".join(f'"{word}"{star}' for word, star in TOKEN_RE.findall(query or ""))
+
+
+def search(engine, query: str, limit: int = 50, window: int | None = SEARCH_WINDOW) -> pd.DataFrame:
+    # Ofertas del dashboard (mismo universo que queries.SCOPE) que contienen todas las
+    # palabras, ordenadas por relevancia, con un fragmento de la descripción ([coincidencia]).
+    # bm25 se calcula para cada coincidencia: con términos frecuentes y un millón de ofertas
+    # pasa de 200 ms. Por eso sólo se puntúan las `window` más recientes (por rowid) y la
+    # ventana se duplica mientras falten resultados: son las más relevantes entre las
+    # recientes, no de todo el índice. window=None puntúa todas.
+    match = fts_query(query)
+    if not match:
+        return pd.DataFrame(columns=SEARCH_COLUMNS)
+    with engine.connect() as conn:
+        last = conn.execute(text("SELECT max(rowid) FROM jobs")).scalar() or 0
+    sql = SEARCH_SQL.format(
+        VALID_JOB=VALID_JOB,
+        snippet_source=SNIPPET_BY_RANGE if "*" in match else SNIPPET_BY_ROWID,
+    )
+    window, k = window or last, limit * CANDIDATES_PER_RESULT
+    while True:
+        found = read(engine, sql, q=match, n=limit, k=k, since=last - window)
+        if len(found) >= limit or window >= last:
+            return found[SEARCH_COLUMNS]
+        window, k = window * 2, k * 2
+
+
+if __name__ == "__main__":
+    from .config import DB_PATH
+    from .db import get_engine, init_db
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("query", nargs="?", help="texto a buscar")
+    parser.add_argument("--rebuild", action="store_true", help="reconstruir el índice desde jobs")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--all", action="store_true",
+                        help="ordenar por relevancia en todo el índice, no sólo entre las recientes")
+    args = parser.parse_args()
+
+    engine = get_engine(DB_PATH)
+    init_db(engine)
+    if args.rebuild:
+        rebuild(engine)
+        print(f"✅ Search index rebuilt | db={DB_PATH}")
+    if args.query:
+        with pd.option_context("display.max_colwidth", 80, "display.width", 200):
+            found = search(engine, args.query, args.limit, window=None if args.all else SEARCH_WINDOW)
+            print(found[["created", "title", "company", "snippet"]].to_string(index=False))
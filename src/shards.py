@@ -0,0 +1,61 @@
+import json
+from itertools import zip_longest
+
+from .config import (
+    ADZUNA_BURST, ADZUNA_DAILY_LIMIT, ADZUNA_MAX_RETRIES, ADZUNA_RPS, COUNTRIES, INGEST_SPEC, KEYWORDS,
+)
+from .rate_limit import RequestScheduler
+
+# Qué se ingiere: shards (país, keyword) y la cuota de cada país. Sin INGEST_SPEC, los
+# KEYWORDS en cada país de ADZUNA_COUNTRIES. Con un fichero JSON:
+#   {"keywords": ["data analyst", "sql"],
+#    "countries": {"es": {"keywords": ["analista de datos"], "daily_limit": 150},
+#                  "gb": {"rps": 0.2}}}
+# Los keywords de un país son los comunes más los suyos. rps / burst / daily_limit que no
+# se indican salen de repartir ADZUNA_RPS y ADZUNA_DAILY_LIMIT entre los países, de modo
+# que entre todos no pasan de la cuota de la cuenta.
+
+
+def load_spec(path=INGEST_SPEC, countries: list | None = None) -> dict:
+    # countries: sólo esos mercados (los que no están en el fichero usan los keywords comunes)
+    if path:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    else:
+        raw = {"keywords": KEYWORDS, "countries": {c: {} for c in COUNTRIES}}
+    if countries:
+        raw["countries"] = {c: (raw.get("countries") or {}).get(c, {}) for c in countries}
+
+    countries = raw.get("countries") or {}
+    if not countries:
+        raise ValueError("Ingest spec without countries")
+    n = len(countries)
+    spec = {}
+    for country, cfg in countries.items():
+        keywords = list(dict.fromkeys(list(raw.get("keywords", [])) + list(cfg.get("keywords", []))))
+        spec[country.lower()] = {
+            "keywords": keywords,
+            "rps": float(cfg.get("rps", ADZUNA_RPS / n)),
+            "burst": float(cfg.get("burst", ADZUNA_BURST)),
+            "daily_limit": int(cfg.get("daily_limit", max(1, ADZUNA_DAILY_LIMIT // n) if ADZUNA_DAILY_LIMIT else 0)),
+        }
+    return spec
+
+
+def shards(spec: dict) -> list:
+    # Intercalados por país: las primeras peticiones en vuelo son de mercados distintos y
+    # la cuota de uno no frena a los demás
+    by_country = [[(country, kw) for kw in cfg["keywords"]] for country, cfg in spec.items()]
+    return [s for group in zip_longest(*by_country) for s in group if s]
+
+
+def schedulers(spec: dict, spent: dict | None = None) -> dict:
+    # spent: {país: peticiones ya hechas hoy} (db.load_api_usage), descontadas de la cuota diaria
+    spent = spent or {}
+    return {
+        country: RequestScheduler(
+            rate=cfg["rps"], burst=cfg["burst"], daily_limit=cfg["daily_limit"], max_retries=ADZUNA_MAX_RETRIES,
+            spent_today=spent.get(country, 0),
+        )
+        for country, cfg in spec.items()
+    }
@@ -0,0 +1,41 @@
+import math
+
+# Sketch de cuantiles con cubetas logarítmicas (estilo DDSketch) para los salarios.
+# La cubeta k cubre (GAMMA^(k-1), GAMMA^k]; un sketch es un conteo por cubeta, así que
+# dos sketches se combinan (o se restan) sumando conteos. El cuantil devuelto está a
+# menos de un ALPHA relativo (1%) del valor exacto de ese rango.
+
+ALPHA = 0.01
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+LOG_GAMMA = math.log(GAMMA)
+
+QUANTILES = {"p25_salary": 0.25, "median_salary": 0.5, "p75_salary": 0.75, "p90_salary": 0.9}
+
+
+def salary_bucket(value):
+    # Registrada como función SQL en src/db.py; sólo valores > 0
+    if value is None or value <= 0:
+        return None
+    return math.ceil(math.log(value) / LOG_GAMMA)
+
+
+def bucket_value(bucket: int) -> float:
+    # Representante de la cubeta con error relativo <= ALPHA
+    return 2 * GAMMA ** bucket / (GAMMA + 1)
+
+
+def quantiles(buckets, counts, qs=QUANTILES) -> dict:
+    # buckets / counts: conteos por cubeta, ordenados por cubeta -> {nombre: valor}
+    total = sum(counts)
+    if not total:
+        return {name: None for name in qs}
+    out = {}
+    for name, q in qs.items():
+        rank = q * (total - 1)
+        seen = 0
+        for b, n in zip(buckets, counts):
+            seen += n
+            if seen > rank:
+                out[name] = bucket_value(b)
+                break
+    return out
@@ -1,5 +1,8 @@
 import re
 
+import pandas as pd
+
+# El orden define el bit de cada skill en skills_mask: añadir siempre al final
 SKILLS = [
     "sql", "python", "power bi", "tableau", "excel",
     "pandas", "numpy", "spark", "databricks",
@@ -10,14 +13,51 @@ SKILLS = [
     "etl", "api", "postgresql", "mysql"
 ]
 
+# Variantes que cuentan como la skill canónica
+SKILL_ALIASES = {
+    "power bi": ["power-bi", "powerbi"],
+    "spark": ["pyspark", "apache spark"],
+    "postgresql": ["postgres"],
+    "machine learning": ["machine-learning"],
+    "gcp": ["google cloud platform"],
+    "aws": ["amazon web services"],
+}
+
+SKILL_BITS = {s: i for i, s in enumerate(SKILLS)}
+
+ALIAS_TO_SKILL = {s: s for s in SKILLS}
+for skill, aliases in SKILL_ALIASES.items():
+    for alias in aliases:
+        ALIAS_TO_SKILL[alias] = skill
+
+# Una sola alternancia para todas las variantes, compilada una vez.
+# Las más largas primero para que "postgresql" gane a "postgres".
+SKILL_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(a) for a in sorted(ALIAS_TO_SKILL, key=len, reverse=True)) + r")\b"
+)
+
 def extract_skills(text: str):
     if not text:
         return []
-    t = text.lower()
-    found = []
-    for s in SKILLS:
-        # match palabra completa cuando aplica
-        pattern = r"\b" + re.escape(s) + r"\b"
-        if re.search(pattern, t):
-            found.append(s)
-    return sorted(set(found))
+    # match palabra completa cuando aplica; un único recorrido del texto
+    return sorted({ALIAS_TO_SKILL[m] for m in SKILL_RE.findall(text.lower())})
+
+def skills_mask(skills) -> int:
+    mask = 0
+    for s in skills:
+        mask |= 1 << SKILL_BITS[s]
+    return mask
+
+def mask_skills(mask: int):
+    return [s for s in sorted(SKILLS) if mask >> SKILL_BITS[s] & 1]
+
+def extract_skills_batch(texts: pd.Series) -> pd.Series:
+    # Lista ordenada de skills por fila (mismo resultado que extract_skills)
+    found = texts.fillna("").astype(str).str.lower().str.findall(SKILL_RE)
+    return found.map(lambda ms: sorted({ALIAS_TO_SKILL[m] for m in ms}))
+
+def skills_mask_batch(texts: pd.Series) -> pd.Series:
+    # Bitmask int64 por fila (bit i = SKILLS[i])
+    found = texts.fillna("").astype(str).str.lower().str.findall(SKILL_RE)
+    masks = [skills_mask({ALIAS_TO_SKILL[m] for m in ms}) for ms in found]
+    return pd.Series(masks, index=texts.index, dtype="int64")
@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import text
+
+from .config import DB_PATH, SNAPSHOT_DIR
+from .db import get_engine, init_db, data_version
+from .queries import SCOPE, VALID_JOB, read
+from .trace import annotate, traced
+
+# Copia columnar de las ofertas enriquecidas: Parquet particionado por mes de created_at
+# (month=2026-01/...), con ciudad / empresa / rol / tipo / categoría como diccionario y las
+# skills como bitmask. No incluye la descripción. La ingesta la pone al día al terminar
+# reescribiendo sólo los meses con cambios (tabla snapshot_dirty); los demás se enlazan
+# tal cual. load_jobs() la usa si está al día con la base de datos (data_version) y si no
+# lee SQLite.
+
+EXPORT_CHUNK = 200_000
+MANIFEST = "_manifest.json"
+
+DICT = pa.dictionary(pa.int32(), pa.string())
+SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("title", pa.string()),
+    ("company", DICT),
+    ("city", DICT),
+    ("role", DICT),
+    ("company_type", DICT),
+    ("category", DICT),
+    ("created", pa.string()),
+    ("created_at", pa.timestamp("us")),
+    ("url", pa.string()),
+    ("salary_min", pa.float64()),
+    ("salary_max", pa.float64()),
+    ("skills_mask", pa.int64()),
+    ("is_remote", pa.bool_()),
+    ("valid", pa.bool_()),  # cumple queries.VALID_JOB
+    ("month", pa.string()),
+])
+
+EXPORT_SQL = f"""
+    SELECT j.id, j.title, j.company, f.city, f.role, f.company_type, j.category,
+           j.created, j.created_at, j.url, j.salary_min, j.salary_max, f.skills_mask, f.is_remote,
+           CASE WHEN {VALID_JOB} THEN 1 ELSE 0 END AS valid,
+           coalesce(strftime('%Y-%m', j.created_at), 'unknown') AS month
+    FROM jobs j
+    JOIN job_features f ON f.job_id = j.id
+"""
+
+JOB_SIDE = {"id", "title", "company", "category", "created", "created_at", "url", "salary_min", "salary_max"}
+
+# Mismo universo que queries.SCOPE
+SCOPE_FILTER = [("valid", "=", True), ("company_type", "=", "Direct Employer")]
+
+
+def _month_range(month: str):
+    # Condición sobre created_at (indexado) de un mes del snapshot
+    if month == "unknown":
+        return "strftime('%Y-%m', j.created_at) IS NULL", {}
+    year, mon = map(int, month.split("-"))
+    end = f"{year + mon // 12:04d}-{mon % 12 + 1:02d}-01"
+    key = month.replace("-", "_")
+    return (
+        f"(j.created_at >= :start_{key} AND j.created_at < :end_{key})",
+        {f"start_{key}": f"{month}-01", f"end_{key}": end},
+    )
+
+
+def _link_tree(src, dst):
+    # Partición sin cambios: enlaces duros a sus ficheros (copia si el sistema no los admite)
+    dst.mkdir(parents=True)
+    for f in src.iterdir():
+        try:
+            os.link(f, dst / f.name)
+        except OSError:
+            shutil.copy2(f, dst / f.name)
+
+
+def _manifest(snapshot_dir):
+    path = snapshot_dir / MANIFEST
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+@traced("snapshot.export")
+def export_snapshot(engine, out_dir=SNAPSHOT_DIR, incremental: bool = False) -> int:
+    # Se escribe en un directorio temporal y se sustituye al final: los lectores nunca
+    # ven una copia a medias. Con incremental=True sólo se vuelven a leer de SQLite los
+    # meses de snapshot_dirty; si no hay copia previa (o está marcado "*"), todo.
+    version = data_version(engine)  # antes de leer: si hay escrituras durante el export, queda obsoleta
+    with engine.connect() as conn:
+        dirty = conn.execute(text("SELECT seq, month FROM snapshot_dirty")).all()
+    last = max((seq for seq, _ in dirty), default=0)
+    months = {m for _, m in dirty}
+    previous = _manifest(out_dir) if incremental else None
+    full = previous is None or "months" not in previous or "*" in months
+
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    counts, sql, params = {}, EXPORT_SQL, {}
+    if not full:
+        counts = {m: n for m, n in previous["months"].items() if m not in months}
+        for m in counts:
+            _link_tree(out_dir / f"month={m}", tmp / f"month={m}")
+        ranges = [_month_range(m) for m in sorted(months)] or [("0", {})]
+        sql += " WHERE " + " OR ".join(cond for cond, _ in ranges)
+        for _, p in ranges:
+            params.update(p)
+
+    with engine.connect() as conn:
+        for i, chunk in enumerate(pd.read_sql(text(sql), conn, params=params, chunksize=EXPORT_CHUNK)):
+            chunk["created_at"] = pd.to_datetime(chunk["created_at"], format="ISO8601")
+            chunk[["is_remote", "valid"]] = chunk[["is_remote", "valid"]].fillna(0).astype(bool)
+            ds.write_dataset(
+                pa.Table.from_pandas(chunk, schema=SCHEMA, preserve_index=False),
+                tmp,
+                format="parquet",
+                partitioning=ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive"),
+                basename_template=f"part-{i}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+            for m, n in chunk["month"].value_counts().items():
+                counts[m] = counts.get(m, 0) + int(n)
+
+    rows = sum(counts.values())
+    manifest = {"data_version": version, "rows": rows, "months": dict(sorted(counts.items()))}
+    (tmp / MANIFEST).write_text(json.dumps(manifest))
+    shutil.rmtree(out_dir, ignore_errors=True)
+    tmp.rename(out_dir)
+    with engine.begin() as conn:
+        # sólo lo que ya estaba apuntado al empezar: lo de escrituras posteriores queda pendiente
+        conn.execute(text("DELETE FROM snapshot_dirty WHERE seq <= :last"), {"last": last})
+    annotate(rows=rows, months=len(counts) if full else len(months))
+    return rows
+
+
+def snapshot_version(snapshot_dir=SNAPSHOT_DIR):
+    manifest = _manifest(snapshot_dir)
+    return manifest["data_version"] if manifest else None
+
+
+def load_snapshot(columns=None, filters=None, snapshot_dir=SNAPSHOT_DIR) -> pd.DataFrame:
+    # Sólo lee las columnas pedidas; los diccionarios llegan como category
+    table = pq.read_table(
+        snapshot_dir, columns=columns, filters=filters, memory_map=True,
+        partitioning="hive", schema=SCHEMA,
+    )
+    return table.to_pandas()
+
+
+def load_jobs(engine, columns, snapshot_dir=SNAPSHOT_DIR) -> pd.DataFrame:
+    # Ofertas del dashboard (SCOPE) con las columnas pedidas, desde Parquet si está al día
+    if snapshot_version(snapshot_dir) == data_version(engine):
+        return load_snapshot(columns, filters=SCOPE_FILTER, snapshot_dir=snapshot_dir)
+    cols = ", ".join(f"j.{c}" if c in JOB_SIDE else f"f.{c}" for c in columns)
+    jobs = read(engine, f"SELECT {cols} {SCOPE}")
+    if "created_at" in jobs:
+        jobs["created_at"] = pd.to_datetime(jobs["created_at"], format="ISO8601")
+    return jobs
+
+
+if __name__ == "__main__":
+    engine = get_engine(DB_PATH)
+    init_db(engine)
+    n = export_snapshot(engine)
+    print(f"✅ Snapshot done | rows={n} | dir={SNAPSHOT_DIR}")
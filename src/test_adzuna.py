@@ -9,6 +9,8 @@ def main():
     data = client.search_jobs("data analyst", page=1, results_per_page=RESULTS_PER_PAGE)
 
     print("✅ Response received")
+    if client.cache is not None:
+        print("Cache:", client.cache.stats())
     print("Keys:", list(data.keys()))
 
     count = data.get("count")
@@ -24,6 +26,7 @@ def main():
         print("Company:", (r0.get("company") or {}).get("display_name"))
         print("Location:", (r0.get("location") or {}).get("display_name"))
         print("URL:", r0.get("redirect_url") or r0.get("adref"))
+    client.close()
 
 if __name__ == "__main__":
     main()
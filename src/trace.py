@@ -0,0 +1,221 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from .config import TRACE, TRACE_PATH
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Instrumentación ligera por etapas: `with span("db.write", rows=n):` o @traced("ingest")
+# mide duración, filas y memoria (RSS y pico del proceso) de un bloque. Con JOBS_TRACE=1
+# cada span se añade como una línea JSON a TRACE_PATH; `python -m src.trace` lo resume
+# por etapa. Desactivado, span() devuelve siempre el mismo objeto vacío: el coste es una
+# comprobación por llamada. collect() guarda además los spans del thread actual en una
+# lista (el panel de diagnóstico del dashboard), aunque JOBS_TRACE esté desactivado.
+
+class _Local(threading.local):
+    # valores por defecto de clase: leerlos en un thread nuevo no lanza AttributeError
+    collected = None
+    stack = None
+
+
+_local = _Local()
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_file = None
+_page_kb = os.sysconf("SC_PAGE_SIZE") // 1024 if hasattr(os, "sysconf") else 4
+
+
+def rss_mb() -> float:
+    # memoria residente actual (Linux); 0.0 si no se puede leer
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _page_kb / 1024
+    except OSError:
+        return 0.0
+
+
+def peak_mb() -> float:
+    # pico de memoria residente del proceso desde que arrancó
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # macOS: bytes; Linux: KB
+
+
+class Span:
+    __slots__ = ("name", "attrs", "id", "parent", "start", "wall", "peak")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        stack = _stack()
+        self.id = next(_ids)
+        self.parent = stack[-1].id if stack else None
+        stack.append(self)
+        self.wall = time.time()
+        self.peak = peak_mb()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.start) * 1000
+        _stack().pop()
+        peak = peak_mb()
+        record = {
+            "ts": datetime.fromtimestamp(self.wall, timezone.utc).isoformat(timespec="milliseconds"),
+            "name": self.name,
+            "ms": round(ms, 3),
+            **self.attrs,
+            "rss_mb": round(rss_mb(), 1),
+            "peak_mb": round(peak, 1),
+            # cuánto ha subido el pico del proceso dentro de este span
+            "peak_growth_mb": round(peak - self.peak, 1),
+            "id": self.id,
+            "parent": self.parent,
+            "thread": threading.current_thread().name,
+            "pid": os.getpid(),
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        _emit(record)
+        return False
+
+    def set(self, **attrs):
+        # p. ej. rows=len(batch) cuando sólo se sabe al final
+        self.attrs.update(attrs)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+def _stack() -> list:
+    stack = _local.stack
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def span(name: str, **attrs):
+    if not (TRACE or _local.collected is not None):
+        return NO_SPAN
+    return Span(name, attrs)
+
+
+def traced(name: str | None = None):
+    # Decorador: un span por llamada, con el nombre dado o módulo.función
+    def decorate(fn):
+        label = name or f"{fn.__module__.removeprefix('src.')}.{fn.__qualname__}"
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not (TRACE or _local.collected is not None):
+                return fn(*args, **kwargs)
+            with Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def annotate(**attrs):
+    # Añade atributos al span abierto más interno de este thread (p. ej. filas al final)
+    stack = _local.stack
+    if stack:
+        stack[-1].set(**attrs)
+
+
+def collect(on: bool = True) -> list | None:
+    # Desde aquí, los spans de este thread también van a la lista devuelta (None: dejar de guardarlos)
+    _local.collected = [] if on else None
+    return _local.collected
+
+
+def _emit(record: dict):
+    global _file
+    collected = _local.collected
+    if collected is not None:
+        collected.append(record)
+    if not TRACE:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _lock:
+        if _file is None:
+            TRACE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _file = open(TRACE_PATH, "a", encoding="utf-8", buffering=1)
+        _file.write(line)
+
+
+def read(path=TRACE_PATH) -> list:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # última línea a medias (proceso interrumpido)
+    return records
+
+
+def summary(records: list) -> list:
+    # Una fila por etapa: llamadas, tiempo total / p50 / p95 / máximo, filas y pico de memoria
+    by_name = {}
+    for r in records:
+        by_name.setdefault(r["name"], []).append(r)
+    rows = []
+    for name, spans in by_name.items():
+        ms = sorted(s["ms"] for s in spans)
+        n_rows = sum(s.get("rows") or 0 for s in spans)
+        total = sum(ms)
+        rows.append({
+            "name": name,
+            "calls": len(ms),
+            "total_ms": round(total, 1),
+            "p50_ms": round(ms[len(ms) // 2], 2),
+            "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 2),
+            "max_ms": round(ms[-1], 2),
+            "rows": n_rows,
+            "rows_per_s": round(n_rows / total * 1000) if n_rows and total else None,
+            "peak_mb": max(s["peak_mb"] for s in spans),
+        })
+    return sorted(rows, key=lambda r: -r["total_ms"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default=TRACE_PATH, help="fichero JSONL (por defecto JOBS_TRACE_PATH)")
+    parser.add_argument("--last", type=int, help="sólo los últimos N spans")
+    args = parser.parse_args()
+    if not os.path.exists(args.path):
+        print(f"⚠️ No trace file at {args.path} (run with JOBS_TRACE=1)")
+        sys.exit(1)
+    records = read(args.path)[-args.last:] if args.last else read(args.path)
+    print(f"{'stage':28s} {'calls':>7s} {'total':>10s} {'p50':>9s} {'p95':>9s} {'max':>9s} {'rows':>10s} {'rows/s':>10s} {'peak':>8s}")
+    for r in summary(records):
+        rate = f"{r['rows_per_s']:,}" if r["rows_per_s"] else ""
+        print(f"{r['name']:28s} {r['calls']:7d} {r['total_ms']:8.0f}ms {r['p50_ms']:7.1f}ms {r['p95_ms']:7.1f}ms "
+              f"{r['max_ms']:7.1f}ms {r['rows']:10,} {rate:>10s} {r['peak_mb']:6.0f}MB")
+    print(f"✅ Trace | spans={len(records)} | file={args.path}")
@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+# Antes de importar src.config: credenciales ficticias, sin cuota, caché, archivo ni trazas,
+# y la copia Parquet y el archivo de respuestas en directorios temporales (nunca se toca db/)
+os.environ.update({
+    "ADZUNA_APP_ID": "test",
+    "ADZUNA_APP_KEY": "test",
+    "ADZUNA_RPS": "0",
+    "ADZUNA_DAILY_LIMIT": "0",
+    "ADZUNA_CACHE": "0",
+    "JOBS_ARCHIVE": "0",
+    "JOBS_TRACE": "0",
+    "JOBS_SNAPSHOT_DIR": tempfile.mkdtemp(prefix="jobs-snapshot-"),
+    "JOBS_ARCHIVE_DIR": tempfile.mkdtemp(prefix="jobs-archive-"),
+})
+
+import pytest  # noqa: E402
+
+from benchmarks.synthetic import posting  # noqa: E402
+from src.db import get_engine, init_db  # noqa: E402
+from src.ingest import job_row  # noqa: E402
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = get_engine(tmp_path / "jobs.sqlite")
+    init_db(engine)
+    yield engine
+    engine.dispose()
+
+
+def synthetic_rows(n: int, keyword: str = "data analyst", country: str = "es", start: int = 0) -> list:
+    # Filas de Job a partir de ofertas sintéticas (~10% re-publicaciones)
+    return [job_row(posting(keyword, country, seq), country) for seq in range(start, start + n)]
@@ -0,0 +1,77 @@
+from sqlalchemy import text
+
+from src import ingest as ingest_module
+from src.adzuna_stub import make_page, serve
+from src.archive import ArchiveWriter, read_pages, runs, shard_file
+from src.db import get_engine, init_db
+from src.ingest import ingest, replay
+
+# Archivo de respuestas (src/archive.py) y recarga sin red (python -m src.ingest --replay):
+# lo que se recarga de un archivo debe dar las mismas filas que la ingesta que lo escribió.
+
+SPEC = {"es": {"keywords": ["data analyst", "data engineer"], "rps": 0.0, "burst": 1.0, "daily_limit": 0}}
+
+
+def jobs(engine) -> list:
+    with engine.connect() as conn:
+        return [tuple(r) for r in conn.execute(text("SELECT * FROM jobs ORDER BY id"))]
+
+
+def fresh_db(path):
+    engine = get_engine(path)
+    init_db(engine)
+    return engine
+
+
+def test_replay_gives_the_same_rows(tmp_path, monkeypatch):
+    root = tmp_path / "archive"
+    monkeypatch.setattr(ingest_module, "ArchiveWriter", lambda: ArchiveWriter(root=root))
+    server, url = serve(total_per_keyword=120)
+    try:
+        live = fresh_db(tmp_path / "live.sqlite")
+        ingest(3, spec=SPEC, workers=2, engine=live, base_url=url, snapshot=False, archive=True)
+    finally:
+        server.shutdown()
+    assert len(runs(root)) == 1
+
+    replayed = fresh_db(tmp_path / "replayed.sqlite")
+    totals = replay(engine=replayed, root=root, snapshot=False)
+    assert totals["inserted"] == len(jobs(live)) > 0
+    assert jobs(replayed) == jobs(live)
+
+
+def test_replay_update_rewrites_rows(tmp_path):
+    root = tmp_path / "archive"
+    with ArchiveWriter(run="20260101T000000Z", root=root) as archive:
+        for page in (1, 2):
+            archive.write("data analyst", page, make_page("data analyst", "es", page, 20, 40))
+    engine = fresh_db(tmp_path / "jobs.sqlite")
+    replay(engine=engine, root=root, snapshot=False)
+    original = jobs(engine)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE jobs SET title = 'stale', salary_min = NULL"))
+
+    assert replay(engine=engine, root=root, snapshot=False)["skipped"] == 40
+    assert {r[1] for r in jobs(engine)} == {"stale"}
+    assert replay(engine=engine, update=True, root=root, snapshot=False)["updated"] == 40
+    assert jobs(engine) == original
+
+
+def test_truncated_final_member_does_not_crash_replay(tmp_path):
+    root = tmp_path / "archive"
+    run = "20260101T000000Z"
+    # dos miembros gzip en el mismo fichero (el writer abre en modo append)
+    path = root / run / shard_file("es", "data analyst")
+    with ArchiveWriter(run=run, root=root) as archive:
+        archive.write("data analyst", 1, make_page("data analyst", "es", 1, 20, 60))
+    first_member = path.stat().st_size
+    with ArchiveWriter(run=run, root=root) as archive:
+        for page in (2, 3):
+            archive.write("data analyst", page, make_page("data analyst", "es", page, 20, 60))
+    whole = path.read_bytes()
+    path.write_bytes(whole[:(first_member + len(whole)) // 2])  # corta el segundo miembro
+
+    assert [r["page"] for r in read_pages(run, root)][:1] == [1]
+    engine = fresh_db(tmp_path / "jobs.sqlite")
+    totals = replay(engine=engine, root=root, snapshot=False)
+    assert 20 <= totals["inserted"] < 60
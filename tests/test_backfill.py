@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+
+from src import enrich
+from src.db import FEATURE_COLUMNS, get_engine, init_db, load_checkpoint, upsert_jobs
+from src.enrich import ENRICH_VERSION, backfill
+
+from conftest import synthetic_rows
+
+# backfill --all guarda el último id escrito (backfill_state): si se corta a mitad, la
+# siguiente ejecución sigue desde ahí y el resultado es el mismo que de una vez.
+
+RUN = f"all-v{ENRICH_VERSION}"
+ROWS, CHUNK = 500, 50
+
+
+def unenriched_db(path):
+    # ofertas sin features, como una base de datos antes de migrar
+    engine = get_engine(path)
+    init_db(engine)
+    upsert_jobs(engine, synthetic_rows(ROWS))
+    return engine
+
+
+def features(engine) -> list:
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT {', '.join(FEATURE_COLUMNS)} FROM job_features ORDER BY job_id")).all()
+
+
+def test_interrupted_backfill_resumes_from_checkpoint(tmp_path, monkeypatch):
+    serial = unenriched_db(tmp_path / "serial.sqlite")
+    assert backfill(serial, force=True, chunk=CHUNK) == ROWS
+
+    engine = unenriched_db(tmp_path / "jobs.sqlite")
+    upsert = enrich.upsert_features
+    written = []
+
+    def failing(engine, rows):
+        # el cuarto bloque no llega a escribirse
+        if len(written) == 3 * CHUNK:
+            raise RuntimeError("killed")
+        written.extend(r["job_id"] for r in rows)
+        return upsert(engine, rows)
+
+    monkeypatch.setattr(enrich, "upsert_features", failing)
+    with pytest.raises(RuntimeError):
+        backfill(engine, force=True, chunk=CHUNK)
+    assert len(written) == 3 * CHUNK
+    assert load_checkpoint(engine, RUN) == (max(written), 3 * CHUNK)
+
+    # la siguiente ejecución (con workers) sólo hace lo que falta
+    monkeypatch.setattr(enrich, "upsert_features", upsert)
+    seen = []
+    assert backfill(engine, force=True, chunk=CHUNK, workers=2, progress=lambda n, last: seen.append(last)) == ROWS - 3 * CHUNK
+    assert min(seen) > max(written)
+    assert load_checkpoint(engine, RUN) is None
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM job_features WHERE enrich_version = :v"),
+                            {"v": ENRICH_VERSION}).scalar() == ROWS
+    assert features(engine) == features(serial)
@@ -0,0 +1,109 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import frame
+from src.analytics.cube import UNKNOWN_CITY, Cube
+from src.analytics.dataset import Filters
+from src.skills import SKILLS
+
+# Las vistas con filtros salen del cubo (src/analytics/cube.py): para varias combinaciones
+# de filtros deben coincidir con filtrar las filas con pandas y contar a mano.
+
+CITIES = ["Madrid", "Barcelona", "Valencia", "Sevilla", None]
+ROLES = ["Data Analyst", "Data Engineer", "Data Scientist", "Other"]
+COMPANIES = [f"Company {i}" for i in range(30)]
+
+FILTERS = [
+    Filters(roles=("Data Analyst",)),
+    Filters(cities=("Madrid", UNKNOWN_CITY)),
+    Filters(skill="python"),
+    Filters(skill="power bi", cities=("Barcelona",)),
+    Filters(remote=True),
+    Filters(remote=False, roles=("Data Engineer", "Other")),
+    Filters(start=date(2026, 2, 1), end=date(2026, 2, 28)),
+    Filters(start=date(2026, 3, 10)),
+    Filters(roles=("Data Scientist",), cities=("Valencia",), skill="sql", remote=False,
+            start=date(2026, 1, 15), end=date(2026, 3, 31)),
+    Filters(cities=("Nowhere",)),
+]
+
+
+@pytest.fixture(scope="module")
+def rows() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    n = 3000
+    created = pd.Series(pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 120 * 24 * 60, n), unit="min"))
+    created[rng.random(n) < 0.02] = pd.NaT
+    salary = np.where(rng.random(n) < 0.4, rng.integers(18, 90, n) * 1000.0, np.nan)
+    spread = rng.choice([0.0, 4000.0, 8000.0, np.nan], n)
+    masks = np.zeros(n, dtype=np.uint64)
+    for _ in range(3):
+        hit = rng.random(n) < 0.5
+        masks[hit] |= np.uint64(1) << rng.integers(0, len(SKILLS), n)[hit].astype(np.uint64)
+    return frame.compact(pd.DataFrame({
+        "id": [f"job-{i}" for i in rng.permutation(n)],
+        "company": rng.choice(COMPANIES, n),
+        "city": rng.choice(np.array(CITIES, dtype=object), n),
+        "role": rng.choice(ROLES, n),
+        "created_at": created,
+        "is_remote": rng.choice([0.0, 1.0, np.nan], n, p=[0.6, 0.3, 0.1]),
+        "skills_mask": masks,
+        "salary_min": salary,
+        "salary_max": salary + spread,
+    }))
+
+
+def brute(rows: pd.DataFrame, f: Filters) -> pd.DataFrame:
+    keep = pd.Series(True, index=rows.index)
+    if f.roles:
+        keep &= rows["role"].isin(f.roles)
+    if f.cities:
+        keep &= rows["city"].astype(object).fillna(UNKNOWN_CITY).isin(f.cities)
+    if f.remote is not None:
+        keep &= rows["is_remote"].fillna(0).astype(bool) == f.remote
+    day = rows["created_at"].dt.date
+    if f.start is not None:
+        keep &= rows["created_at"].notna() & (day >= f.start)
+    if f.end is not None:
+        keep &= rows["created_at"].notna() & (day <= f.end)
+    if f.skill is not None:
+        keep &= np.array([bool(int(m) >> SKILLS.index(f.skill) & 1) for m in rows["skills_mask"]])
+    return rows[keep]
+
+
+def skill_counts(rows: pd.DataFrame) -> list:
+    counts = {s: sum(int(m) >> i & 1 for m in rows["skills_mask"]) for i, s in enumerate(SKILLS)}
+    return sorted(((s, c) for s, c in counts.items() if c), key=lambda sc: (-sc[1], sc[0]))
+
+
+def salaries(rows: pd.DataFrame) -> list:
+    out = []
+    for lo, hi in zip(rows["salary_min"], rows["salary_max"]):
+        values = [v for v in (lo, hi) if v == v]
+        if values and sum(values) / len(values) > 0:
+            out.append(sum(values) / len(values))
+    return out
+
+
+@pytest.mark.parametrize("filters", FILTERS, ids=str)
+def test_selection_matches_brute_force(rows, filters):
+    selection = Cube(rows).select(filters)
+    expected = brute(rows, filters)
+
+    assert selection.overview()["total"] == len(expected)
+    assert selection.rows.sum() == len(expected)
+    assert list(map(tuple, selection.top_skills().to_numpy())) == skill_counts(expected)
+
+    companies = frame.company_counts(rows[selection.rows])
+    assert dict(companies.to_numpy()) == expected["company"].astype(str).value_counts().to_dict()
+
+    salary = selection.salary_summary()
+    paid = salaries(expected)
+    assert salary["n"] == len(paid)
+    if paid:
+        assert salary["avg_salary"] == pytest.approx(sum(paid) / len(paid))
+    else:
+        assert salary["avg_salary"] is None
@@ -0,0 +1,66 @@
+from sqlalchemy import event
+
+from src import analytics, frame
+from src.analytics import dataset
+from src.analytics.dataset import NO_FILTERS
+from src.analytics.metrics import LATEST_COLUMNS, ROWS
+from src.db import save_api_usage, upsert_jobs
+from src.enrich import enrich_rows
+
+from conftest import synthetic_rows
+
+# analytics.dataset() se llama en cada rerun de Streamlit: mientras el fichero no cambie
+# devuelve el mismo Dataset sin abrir una conexión.
+
+
+def test_same_dataset_until_the_data_changes(engine):
+    upsert_jobs(engine, synthetic_rows(50), enrich=enrich_rows)
+    checkouts = []
+    event.listen(engine, "checkout", lambda *_: checkouts.append(1))
+
+    ds = dataset(engine)
+    opened = len(checkouts)
+    assert dataset(engine) is ds
+    assert len(checkouts) == opened
+
+    upsert_jobs(engine, synthetic_rows(50, start=50), enrich=enrich_rows)
+    newer = dataset(engine)
+    assert newer is not ds and newer.version > ds.version
+    assert dataset(engine) is newer
+
+    # otra escritura que no es de datos (cuota de la API): cambia el fichero, no la versión
+    save_api_usage(engine, {"es": {"2026-01-01": 3}})
+    assert dataset(engine) is newer
+
+
+def test_unfiltered_metrics_do_not_load_rows(engine):
+    # sin filtros todo sale de SQL; el frame (ROWS) sólo hace falta con filtros
+    upsert_jobs(engine, synthetic_rows(400), enrich=enrich_rows)
+    ds = dataset(engine)
+    for fn, kwargs in analytics.METRICS:
+        fn(ds, **kwargs)
+    assert not any(key[0] == "frame" for key in ds.memo)
+
+    # y da lo mismo que calcularlo sobre las filas
+    rows = ds.frame(ROWS)
+    by_frame = frame.company_counts(rows)
+    by_sql = analytics.company_counts(ds)
+    assert sorted(map(tuple, by_sql.to_numpy())) == sorted(map(tuple, by_frame.to_numpy()))
+    skills = dict(frame.company_top_skills(rows).to_numpy())
+    breakdown = analytics.company_breakdown(ds)
+    assert all(skills.get(c, "—") == s for c, s in breakdown[["company", "skills"]].to_numpy())
+    latest = rows.sort_values(["created_at", "id"], ascending=False)[LATEST_COLUMNS]
+    assert analytics.latest_offers(ds).to_numpy().tolist() == latest.to_numpy().tolist()
+
+
+def test_latest_offers_same_order_with_and_without_filters(engine):
+    # muchas ofertas con la misma fecha: SQL y el cubo desempatan igual (id desc)
+    rows = synthetic_rows(300)
+    for r in rows[::3]:
+        r["created_at"], r["created"] = rows[-1]["created_at"], rows[-1]["created"]
+    upsert_jobs(engine, rows, enrich=enrich_rows)
+    ds = dataset(engine)
+    by_sql = analytics.latest_offers(ds, limit=60)
+    by_cube = ds.frame(ROWS).iloc[analytics.data_cube(ds).select(NO_FILTERS).latest(60)][LATEST_COLUMNS]
+    assert by_sql["created"].duplicated().sum() > 50  # los empates pasan del límite
+    assert by_sql.to_numpy().tolist() == by_cube.to_numpy().tolist()
@@ -0,0 +1,63 @@
+from sqlalchemy import text
+
+from src.db import upsert_jobs
+from src.dedup import cluster_all
+from src.enrich import enrich_rows
+
+from conftest import synthetic_rows
+
+# Grupos de ofertas repetidas (src/dedup.py): una canónica por grupo, la más antigua de las
+# válidas, y asignarlos de forma incremental al escribir da los mismos grupos que
+# recalcularlos desde cero.
+
+
+def groups(conn) -> set:
+    rows = conn.execute(text("SELECT job_id, cluster_id FROM job_features")).all()
+    by_cluster = {}
+    for job_id, cluster_id in rows:
+        by_cluster.setdefault(cluster_id or job_id, set()).add(job_id)
+    return {frozenset(members) for members in by_cluster.values()}
+
+
+def write(engine, rows, update=False):
+    return upsert_jobs(engine, rows, update=update, enrich=enrich_rows)
+
+
+def test_one_canonical_per_group(engine):
+    for start in range(0, 400, 100):
+        write(engine, synthetic_rows(100, start=start))
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT job_id, cluster_id, is_canonical FROM job_features")).all()
+    canonical = {job_id for job_id, _, flag in rows if flag}
+    assert all(flag in (0, 1) and cluster_id for _, cluster_id, flag in rows)
+    # la canónica de cada grupo es su propio cluster_id y el resto apunta a una canónica
+    assert all((cluster_id == job_id) == bool(flag) for job_id, cluster_id, flag in rows)
+    assert {cluster_id for _, cluster_id, _ in rows} == canonical
+    assert len(canonical) < len(rows)  # las sintéticas traen ~10% de re-publicaciones
+
+
+def test_incremental_matches_rebuild(engine):
+    for start in range(0, 400, 80):
+        write(engine, synthetic_rows(80, start=start))
+    with engine.connect() as conn:
+        incremental = groups(conn)
+        cluster_all(conn)
+        rebuilt = groups(conn)
+        conn.rollback()
+    assert incremental == rebuilt
+
+
+def test_repost_joins_older_offer(engine):
+    original = synthetic_rows(1, start=5)[0]
+    write(engine, [original])
+    repost = dict(original, id="repost-1", url="https://example.com/repost",
+                  created="2026-03-01T10:00:00Z", created_at=None)
+    write(engine, [repost])
+    with engine.connect() as conn:
+        flags = dict((r[0], r[1:]) for r in conn.execute(text(
+            "SELECT job_id, cluster_id, is_canonical FROM job_features"
+        )))
+        unique = conn.execute(text("SELECT COUNT(*) FROM job_features WHERE is_canonical = 1")).scalar()
+    assert flags[original["id"]] == (original["id"], 1)
+    assert flags["repost-1"] == (original["id"], 0)
+    assert unique == 1
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from src.classify import (
+    classify_company, classify_role, extract_city, remote_flag,
+    classify_company_batch, classify_role_batch, extract_city_batch, remote_flag_batch,
+)
+from src.enrich import enrich_frame, enrich_row
+from src.skills import extract_skills, extract_skills_batch, skills_mask, skills_mask_batch
+
+from conftest import synthetic_rows
+
+# Las reglas vectorizadas (src/classify.py, src/skills.py) deben dar lo mismo que las
+# originales por fila, también con campos vacíos
+
+EDGE_CASES = [
+    {"id": "none", "title": None, "company": None, "location": None, "description": None},
+    {"id": "empty", "title": "", "company": "", "location": "", "description": ""},
+    {"id": "spain", "title": "Data Engineer (Remote)", "company": "Adecco", "location": "España",
+     "description": "Python, PySpark y power-bi. Teletrabajo."},
+    {"id": "accents", "title": "Ingeniero/a de Datos", "company": "Telefónica Tech",
+     "location": "Alcobendas, Madrid", "description": "SQL Server, postgres, dbt y Tableau. Híbrido."},
+    # \b junto a letras no ASCII (Python re y RE2 no coinciden)
+    {"id": "bi-tilde", "title": "Técnico de BIñ", "company": "Ñandú", "location": "Logroño", "description": ""},
+    {"id": "bi-accent", "title": "ÁBI developer", "company": None, "location": None, "description": None},
+    {"id": "bi-greek", "title": "ΣBI", "company": None, "location": None, "description": None},
+    {"id": "datos-accent", "title": "Ingeniera de datosé", "company": None, "location": None, "description": None},
+]
+
+
+@pytest.fixture(scope="module")
+def jobs() -> pd.DataFrame:
+    rows = EDGE_CASES + [
+        r for kw in ("data analyst", "data engineer", "power bi") for r in synthetic_rows(400, keyword=kw)
+    ]
+    return pd.DataFrame(rows, columns=["id", "title", "company", "location", "description"])
+
+
+def as_values(s) -> list:
+    s = pd.Series(s).reset_index(drop=True).astype(object)
+    return s.where(s.notna(), None).tolist()
+
+
+@pytest.mark.parametrize("by_row, batch, column", [
+    (classify_company, classify_company_batch, "company"),
+    (extract_city, extract_city_batch, "location"),
+    (classify_role, classify_role_batch, "title"),
+])
+def test_classify_batch_matches_rows(jobs, by_row, batch, column):
+    assert as_values(batch(jobs[column])) == as_values(jobs[column].apply(by_row))
+
+
+def test_remote_and_skills_batch_match_rows(jobs):
+    text = jobs["title"].fillna("") + " " + jobs["description"].fillna("")
+    assert as_values(remote_flag_batch(text)) == as_values(text.apply(remote_flag))
+    assert as_values(extract_skills_batch(text)) == as_values(text.apply(extract_skills))
+    assert as_values(skills_mask_batch(text)) == [skills_mask(extract_skills(t)) for t in text]
+
+
+def test_enrich_frame_matches_enrich_row(jobs):
+    expected = pd.DataFrame([enrich_row(r) for r in jobs.to_dict("records")])
+    got = enrich_frame(jobs).reset_index(drop=True)
+    assert list(got.columns) == list(expected.columns)
+    for column in expected.columns:
+        assert as_values(got[column]) == as_values(expected[column]), column
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from src import http_cache
+from src.adzuna_client import AdzunaClient
+from src.adzuna_stub import serve
+from src.http_cache import ResponseCache
+
+# Caché de respuestas de la API (src/http_cache.py) contra el stub, que manda ETag y
+# responde 304 a If-None-Match. El reloj de la caché se mueve a mano.
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(http_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def stub_url():
+    server, url = serve(total_per_keyword=30)
+    yield url
+    server.shutdown()
+
+
+def counting_client(url, cache):
+    # cliente que apunta las cabeceras de cada petición real
+    client = AdzunaClient(base_url=url, cache=cache)
+    sent = []
+    get = client.session.get
+
+    def spy(*args, headers=None, **kwargs):
+        sent.append(dict(headers or {}))
+        return get(*args, headers=headers, **kwargs)
+
+    client.session.get = spy
+    return client, sent
+
+
+def test_fresh_entry_served_without_request(tmp_path, clock, stub_url):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=3600)
+    client, sent = counting_client(stub_url, cache)
+    first = client.search_jobs("data analyst")
+    clock[0] += 3599
+    assert client.search_jobs("data analyst") == first
+    assert len(sent) == 1
+    assert cache.stats()["hits"] == 1
+    client.close()
+
+
+def test_stale_entry_revalidated_with_304(tmp_path, clock, stub_url):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=100)
+    client, sent = counting_client(stub_url, cache)
+    first = client.search_jobs("data analyst")
+
+    clock[0] += 150  # caducada: petición condicional, el stub contesta 304
+    assert client.search_jobs("data analyst") == first
+    assert len(sent) == 2 and sent[1]["If-None-Match"].startswith('"')
+    assert cache.stats()["revalidated"] == 1
+
+    clock[0] += 50  # el 304 la ha renovado otro TTL
+    assert client.search_jobs("data analyst") == first
+    assert len(sent) == 2
+    client.close()
+
+
+def test_lru_eviction_above_size_limit(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_bytes=5000)
+    for i in range(4):
+        clock[0] += 1
+        cache.put(f"k{i}", "u", os.urandom(1000))  # no comprime: ~1 KB cada una
+    clock[0] += 1
+    assert cache.get("k0")[1]  # k0 pasa a ser la más reciente
+
+    clock[0] += 1
+    cache.put("k4", "u", os.urandom(1000))
+    clock[0] += 1
+    cache.put("k5", "u", os.urandom(1000))
+
+    kept = {k for k in ("k0", "k1", "k2", "k3", "k4", "k5") if cache.get(k)[0] is not None}
+    assert "k0" in kept and "k5" in kept and "k1" not in kept
+    assert cache.stats()["evicted"] >= 1
+    assert cache.total <= cache.max_bytes
+    cache.close()
+
+
+def test_credentials_not_in_cache_key(tmp_path, monkeypatch, stub_url):
+    url = "https://api.adzuna.com/v1/api/jobs/es/search/1"
+    params = {"what": "data", "results_per_page": 50}
+    key = ResponseCache.key(url, {**params, "app_id": "a", "app_key": "secret-1"})
+    assert key == ResponseCache.key(url, {**params, "app_id": "b", "app_key": "secret-2"})
+    assert key == ResponseCache.key(url, params)
+    assert key != ResponseCache.key(url, {**params, "what": "bi"})
+
+    # y no se guardan en disco
+    monkeypatch.setattr("src.adzuna_client.ADZUNA_APP_KEY", "very-secret-key")
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    client = AdzunaClient(base_url=stub_url, cache=cache)
+    client.search_jobs("data analyst")
+    client.close()
+    assert b"very-secret-key" not in (tmp_path / "cache.sqlite").read_bytes()
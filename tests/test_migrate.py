@@ -0,0 +1,70 @@
+from sqlalchemy import inspect, text
+
+from src.db import data_pending, data_version, get_engine, init_db, schema_pending, upsert_jobs
+from src.enrich import backfill, enrich_rows
+from src.rollups import rebuild
+
+from conftest import synthetic_rows
+
+# El dashboard sólo comprueba (schema_pending / data_pending) y la migración va aparte
+# (python -m src.db --migrate = init_db + backfill): comprobar no escribe nada y, tras
+# migrar, no queda nada pendiente.
+
+LEGACY_JOBS = """
+    CREATE TABLE jobs (
+      id VARCHAR PRIMARY KEY, title VARCHAR, company VARCHAR, location VARCHAR,
+      category VARCHAR, created VARCHAR, description TEXT, url VARCHAR,
+      salary_min FLOAT, salary_max FLOAT, salary_is_predicted INTEGER,
+      salary_interval VARCHAR, currency VARCHAR
+    )
+"""
+
+
+def legacy_db(path):
+    # Base de datos de antes de job_features, created_at, country...
+    engine = get_engine(path)
+    columns = ["id", "title", "company", "location", "category", "created", "description", "url",
+               "salary_min", "salary_max"]
+    with engine.begin() as conn:
+        conn.execute(text(LEGACY_JOBS))
+        conn.execute(
+            text(f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"),
+            [{c: r[c] for c in columns} for r in synthetic_rows(50)],
+        )
+    return engine
+
+
+def test_check_does_not_migrate(tmp_path):
+    engine = legacy_db(tmp_path / "jobs.sqlite")
+    pending = schema_pending(engine)
+    assert "table job_features" in pending and "column jobs.created_at" in pending
+    assert inspect(engine).get_table_names() == ["jobs"]
+
+
+def test_migrate_leaves_nothing_pending(tmp_path):
+    engine = legacy_db(tmp_path / "jobs.sqlite")
+    init_db(engine)
+    assert schema_pending(engine) == []
+    assert data_pending(engine) == ["job features"]
+    assert backfill(engine) == 50
+    assert data_pending(engine) == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT SUM(offers) FROM rollup_daily")).scalar() > 0
+        assert conn.execute(text("SELECT COUNT(*) FROM jobs WHERE length(created_at) = 26")).scalar() == 50
+
+
+def test_fresh_db_has_nothing_pending(engine):
+    assert schema_pending(engine) == []
+    assert data_pending(engine) == []
+
+
+def test_rebuilds_bump_the_data_version(engine):
+    # el dashboard y el snapshot sólo recalculan si sube data_version
+    upsert_jobs(engine, synthetic_rows(20), enrich=enrich_rows)
+    before = data_version(engine)
+    rebuild(engine)
+    assert data_version(engine) == before + 1
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE jobs SET created_at = NULL"))
+    init_db(engine)
+    assert data_version(engine) == before + 2
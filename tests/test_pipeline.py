@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from src.pipeline import Pipeline, Stage
+
+# Pipeline por etapas con colas acotadas (src/pipeline.py)
+
+
+def numbers(n):
+    return lambda: ([i] for i in range(n))
+
+
+def double(pages):
+    for page in pages:
+        yield [2 * x for x in page]
+
+
+def collect(out):
+    def sink(pages):
+        for page in pages:
+            out.extend(page)
+            yield page
+    return sink
+
+
+def test_items_flow_in_order_with_stats():
+    out = []
+    stats = Pipeline("t", [Stage("src", numbers(500)), Stage("double", double), Stage("sink", collect(out))],
+                     queue_size=4).run()
+    assert out == [2 * i for i in range(500)]
+    assert stats["src"]["rows"] == stats["sink"]["rows"] == 500
+    assert all(s["max_queue"] <= 4 for s in stats.values())
+
+
+def test_upstream_error_lets_downstream_drain():
+    # lo ya producido se termina de procesar (p. ej. se escriben las páginas descargadas)
+    def failing():
+        yield from ([i] for i in range(10))
+        raise RuntimeError("api down")
+
+    out = []
+    with pytest.raises(RuntimeError, match="api down"):
+        Pipeline("t", [Stage("src", failing), Stage("sink", collect(out))]).run()
+    assert out == list(range(10))
+
+
+def test_downstream_error_stops_producer():
+    produced = []
+
+    def source():
+        for i in range(100_000):
+            produced.append(i)
+            yield [i]
+
+    def failing(pages):
+        for page in pages:
+            if page[0] == 10:  # 5 tras double
+                raise ValueError("disk full")
+            yield page
+
+    t0 = time.perf_counter()
+    with pytest.raises(ValueError, match="disk full"):
+        Pipeline("t", [Stage("src", source), Stage("mid", double), Stage("sink", failing)], queue_size=4).run()
+    assert len(produced) < 100  # las colas acotadas frenan al productor
+    assert time.perf_counter() - t0 < 5
+
+
+def test_next_nowait_batches_queued_items():
+    batches = []
+
+    def slow_writer(pages):
+        for page in pages:
+            time.sleep(0.02)
+            batch = list(page)
+            while (more := pages.next_nowait()) is not None:
+                batch.extend(more)
+            batches.append(batch)
+            yield batch
+
+    Pipeline("t", [Stage("src", numbers(50)), Stage("write", slow_writer)], queue_size=64).run()
+    assert sorted(x for b in batches for x in b) == list(range(50))
+    assert len(batches) < 50
@@ -0,0 +1,139 @@
+from datetime import date
+
+import pytest
+import requests
+
+from src import rate_limit
+from src.adzuna_client import AdzunaClient
+from src.db import load_api_usage, save_api_usage
+from src.rate_limit import QuotaExhausted, RequestScheduler, TokenBucket, retry_after_seconds
+from src.shards import schedulers
+
+# Reintentos, backoff y cuota diaria de src/rate_limit.py con respuestas de una sesión
+# falsa; time.sleep no espera, sólo apunta cuánto se habría dormido.
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(rate_limit.time, "sleep", slept.append)
+    return slept
+
+
+def response(status: int, **headers) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update(headers)
+    r._content = b'{"results": []}'
+    return r
+
+
+def replies(*items):
+    # do_request() que devuelve (o lanza) cada item por orden
+    items = iter(items)
+
+    def do_request():
+        item = next(items)
+        if isinstance(item, Exception):
+            raise item
+        return item
+    return do_request
+
+
+def test_429_then_200_retries_with_backoff(sleeps):
+    scheduler = RequestScheduler(max_retries=3, backoff_base=2.0)
+    got = scheduler.send(replies(response(429), response(200)))
+    assert got.status_code == 200
+    assert len(sleeps) == 1 and 0 <= sleeps[0] <= 2.0  # jitter en [0, base * 2^0]
+    stats = scheduler.stats()
+    assert stats["requests"] == 2 and stats["retried"] == 1
+
+
+def test_backoff_cap_grows_exponentially(monkeypatch, sleeps):
+    caps = []
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda lo, hi: caps.append(hi) or hi)
+    scheduler = RequestScheduler(max_retries=4, backoff_base=1.0, backoff_max=5.0)
+    scheduler.send(replies(*[response(503)] * 4, response(200)))
+    assert caps == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_retry_after_is_honoured_and_capped(sleeps):
+    scheduler = RequestScheduler(max_retries=2, backoff_max=60.0)
+    assert scheduler.send(replies(response(429, **{"Retry-After": "7"}), response(200))).status_code == 200
+    assert sleeps[0] == 7.0
+    assert scheduler.stats()["backoff_wait_s"] == 7.0
+
+    sleeps.clear()
+    scheduler = RequestScheduler(max_retries=2, backoff_max=3.0)
+    scheduler.send(replies(response(503, **{"Retry-After": "120"}), response(200)))
+    assert sleeps[0] == 3.0
+    # la pausa es para todos los threads: la siguiente petición también espera
+    assert scheduler.blocked_until > 0 and sleeps[1] <= 3.0
+
+
+def test_retry_after_header_formats():
+    assert retry_after_seconds(response(429, **{"Retry-After": "12"})) == 12.0
+    assert retry_after_seconds(response(429, **{"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after_seconds(response(429, **{"Retry-After": "soon"})) is None
+    assert retry_after_seconds(response(429)) is None
+
+
+def test_5xx_retries_exhausted_raise(sleeps):
+    scheduler = RequestScheduler(max_retries=2)
+    client = AdzunaClient(base_url="http://adzuna.invalid", scheduler=scheduler)
+    calls = []
+    client.session.get = lambda *a, **kw: calls.append(1) or response(503)
+    with pytest.raises(requests.HTTPError):
+        client.search_jobs("data analyst")
+    assert len(calls) == 3  # 1 + max_retries
+    client.close()
+
+    scheduler = RequestScheduler(max_retries=1)
+    with pytest.raises(requests.ConnectionError):
+        scheduler.send(replies(requests.ConnectionError(), requests.ConnectionError()))
+
+
+def test_daily_limit_rolls_over_per_utc_day(monkeypatch, sleeps):
+    day = [date(2026, 3, 1)]
+    monkeypatch.setattr(rate_limit, "utc_today", lambda: day[0])
+    scheduler = RequestScheduler(daily_limit=2)
+    ok = lambda: response(200)  # noqa: E731
+    scheduler.send(ok)
+    scheduler.send(ok)
+    with pytest.raises(QuotaExhausted):
+        scheduler.send(ok)
+
+    day[0] = date(2026, 3, 2)
+    scheduler.send(ok)
+    assert scheduler.issued == {"2026-03-01": 2, "2026-03-02": 1}
+    assert scheduler.stats()["spent_today"] == 1
+
+
+def test_api_usage_carries_over_between_runs(engine, sleeps):
+    spec = {"es": {"rps": 0.0, "burst": 1.0, "daily_limit": 3}, "gb": {"rps": 0.0, "burst": 1.0, "daily_limit": 0}}
+    today = rate_limit.utc_today().isoformat()
+
+    first = schedulers(spec, load_api_usage(engine, today))
+    for _ in range(2):
+        first["es"].send(lambda: response(200))
+    first["gb"].send(lambda: response(200))
+    save_api_usage(engine, {country: s.issued for country, s in first.items()})
+    assert load_api_usage(engine, today) == {"es": 2, "gb": 1}
+
+    # la siguiente ejecución del mismo día sólo tiene una petición más en "es"
+    second = schedulers(spec, load_api_usage(engine, today))
+    second["es"].send(lambda: response(200))
+    with pytest.raises(QuotaExhausted):
+        second["es"].send(lambda: response(200))
+    save_api_usage(engine, {country: s.issued for country, s in second.items()})
+    assert load_api_usage(engine, today) == {"es": 3, "gb": 1}
+
+
+def test_token_bucket_waits_for_a_token(monkeypatch, sleeps):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limit.time, "sleep", lambda s: sleeps.append(s) or now.__setitem__(0, now[0] + s))
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    assert bucket.acquire() == 0.0 and bucket.acquire() == 0.0  # ráfaga
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert TokenBucket(rate=0).acquire() == 0.0
@@ -0,0 +1,84 @@
+from sqlalchemy import text
+
+from src.db import upsert_jobs
+from src.enrich import enrich_rows
+from src.queries import SCOPE, read
+from src.search import fts_query, search
+
+from conftest import synthetic_rows
+
+# Búsqueda FTS5 (src/search.py): los triggers mantienen jobs_fts al día con jobs y la
+# búsqueda escapa el texto libre, ignora acentos y amplía la ventana de recientes.
+
+
+def matches(engine, query: str) -> set:
+    with engine.connect() as conn:
+        return {r[0] for r in conn.execute(
+            text("SELECT j.id FROM jobs_fts CROSS JOIN jobs j ON j.rowid = jobs_fts.rowid WHERE jobs_fts MATCH :q"),
+            {"q": fts_query(query)},
+        )}
+
+
+def check_index(engine):
+    # integrity-check con rank=1 compara el índice con el contenido de jobs (falla si difieren)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO jobs_fts (jobs_fts, rank) VALUES ('integrity-check', 1)"))
+
+
+def in_scope(engine) -> list:
+    # ids que puede devolver search(), de la más antigua a la más reciente
+    return read(engine, f"SELECT j.id {SCOPE} ORDER BY j.rowid")["id"].tolist()
+
+
+def retitle(engine, job_id: str, title: str):
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE jobs SET title = :t WHERE id = :id"), {"t": title, "id": job_id})
+
+
+def test_triggers_keep_index_in_sync(engine):
+    rows = synthetic_rows(50)
+    upsert_jobs(engine, rows, enrich=enrich_rows)
+    assert matches(engine, rows[0]["title"]) >= {rows[0]["id"]}
+    check_index(engine)
+
+    # upsert que cambia el título: sale la palabra vieja, entra la nueva
+    upsert_jobs(engine, [dict(rows[0], title="Zorblax Wrangler")], update=True, enrich=enrich_rows)
+    assert matches(engine, "zorblax") == {rows[0]["id"]}
+    check_index(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM jobs WHERE id = :id"), {"id": rows[0]["id"]})
+    assert matches(engine, "zorblax") == set()
+    check_index(engine)
+
+
+def test_fts_query_escapes_quotes_and_operators(engine):
+    upsert_jobs(engine, synthetic_rows(50), enrich=enrich_rows)
+    raw = 'data" OR analyst -sql NEAR( title:x ^bi'
+    assert fts_query(raw) == '"data" "OR" "analyst" "sql" "NEAR" "title" "x" "bi"'
+    matches(engine, raw)  # sin error de sintaxis FTS5
+    assert fts_query("  ") == "" and search(engine, '"-*').empty
+    assert fts_query("analyt*") == '"analyt"*'
+
+
+def test_prefix_and_accent_insensitive_search(engine):
+    upsert_jobs(engine, synthetic_rows(200), enrich=enrich_rows)
+    ids = in_scope(engine)
+    retitle(engine, ids[0], "Analytics Engineer")
+    retitle(engine, ids[1], "Ingeniería de Datos")
+
+    assert ids[0] in set(search(engine, "analyt*", limit=200)["id"])
+    assert ids[0] not in set(search(engine, "analyt", limit=200)["id"])
+    for query in ("ingenieria", "INGENIERÍA", "ingeniería"):
+        assert search(engine, query)["id"].tolist() == [ids[1]]
+
+
+def test_window_grows_to_older_matches(engine):
+    upsert_jobs(engine, synthetic_rows(200), enrich=enrich_rows)
+    ids = in_scope(engine)
+    retitle(engine, ids[0], "Quokka Analyst")  # la más antigua, fuera de una ventana de 10
+    retitle(engine, ids[-1], "Quokka Engineer")
+
+    found = search(engine, "quokka", limit=2, window=10)
+    assert set(found["id"]) == {ids[0], ids[-1]}
+    assert search(engine, "quokka", limit=2, window=None)["id"].tolist() == found["id"].tolist()
@@ -0,0 +1,69 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.db import upsert_jobs
+from src.enrich import enrich_rows
+from src.queries import SALARY, SCOPE, read, salary_percentiles
+from src.sketch import ALPHA, QUANTILES, quantiles, salary_bucket
+
+from conftest import synthetic_rows
+
+# Sketch de cuantiles (src/sketch.py): devuelve el valor de rango floor(q * (n - 1)) con
+# error relativo <= ALPHA, así que se compara con el cuantil exacto "lower"; y combinar
+# sketches es sumar sus conteos por cubeta.
+
+
+def sketch(values) -> Counter:
+    return Counter(salary_bucket(v) for v in values)
+
+
+def estimate(counts: Counter) -> dict:
+    buckets = sorted(counts)
+    return quantiles(buckets, [counts[b] for b in buckets])
+
+
+def exact_lower(values) -> dict:
+    return {name: np.quantile(values, q, method="lower") for name, q in QUANTILES.items()}
+
+
+def random_salaries(rng, n: int) -> np.ndarray:
+    # mezcla de salarios anuales, mensuales y algún extremo
+    annual = rng.lognormal(np.log(40_000), 0.5, n)
+    monthly = rng.uniform(900, 6000, n)
+    return np.where(rng.random(n) < 0.8, annual, monthly) * np.where(rng.random(n) < 0.01, 50, 1)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 10, 101, 5000])
+def test_quantiles_within_alpha_of_exact(n):
+    rng = np.random.default_rng(n)
+    for _ in range(20):
+        values = random_salaries(rng, n)
+        got, exact = estimate(sketch(values)), exact_lower(values)
+        for name in QUANTILES:
+            assert abs(got[name] - exact[name]) <= ALPHA * exact[name] * (1 + 1e-9)
+
+
+def test_merged_sketches_equal_one_sketch():
+    rng = np.random.default_rng(0)
+    parts = [random_salaries(rng, n) for n in (7, 300, 1, 2500)]
+    merged = sum((sketch(p) for p in parts), Counter())
+    assert merged == sketch(np.concatenate(parts))
+    assert estimate(merged) == estimate(sketch(np.concatenate(parts)))
+    assert estimate(Counter()) == {name: None for name in QUANTILES}
+
+
+def test_rollup_sketches_within_alpha(engine):
+    # el mismo límite sobre rollup_salary_sketch, global y por grupo
+    upsert_jobs(engine, synthetic_rows(2000), enrich=enrich_rows)
+    for group in [None, "city", "role"]:
+        key = f"+f.{group}" if group else "''"
+        values = read(engine, f"SELECT {key} AS grp, {SALARY} AS v {SCOPE}")
+        values = values[(values["v"] > 0) & values["grp"].notna() & ((values["grp"] != "") | (group is None))]
+        got = salary_percentiles(engine, group).set_index(group or "grp")
+        assert sorted(got.index) == sorted(values["grp"].unique())
+        for grp, v in values.groupby("grp")["v"]:
+            exact = exact_lower(v.to_numpy())
+            for name in QUANTILES:
+                assert abs(got.loc[grp, name] - exact[name]) <= ALPHA * exact[name] * (1 + 1e-9)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from src.db import data_version, upsert_jobs
+from src.enrich import enrich_rows
+from src.snapshot import EXPORT_SQL, MANIFEST, export_snapshot, load_snapshot, snapshot_version
+
+from conftest import synthetic_rows
+
+# La ingesta reescribe sólo los meses del snapshot con ofertas cambiadas (snapshot_dirty):
+# el resultado debe ser el mismo que exportarlo entero.
+
+
+def write(engine, rows, update=False):
+    return upsert_jobs(engine, rows, update=update, enrich=enrich_rows)
+
+
+def by_month(engine) -> dict:
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"SELECT month, id, valid, city FROM ({EXPORT_SQL})")).all()
+    return {(m, i, bool(v), c) for m, i, v, c in rows}
+
+
+def in_snapshot(out_dir) -> dict:
+    df = load_snapshot(["month", "id", "valid", "city"], snapshot_dir=out_dir)
+    return {(m, i, bool(v), c) for m, i, v, c in df.itertuples(index=False)}
+
+
+def shifted(rows, days):
+    return [dict(r, created_at=r["created_at"] + timedelta(days=days)) for r in rows]
+
+
+def files(out_dir) -> dict:
+    return {str(p.relative_to(out_dir)): p.stat().st_ino for p in out_dir.glob("month=*/*.parquet")}
+
+
+def test_incremental_refresh_matches_full_export(engine, tmp_path):
+    out_dir = tmp_path / "snapshot"
+    write(engine, synthetic_rows(200))
+    later = shifted(synthetic_rows(100, start=200), 62)
+    write(engine, later)
+    export_snapshot(engine, out_dir, incremental=True)  # sin copia previa: entera
+    before = files(out_dir)
+
+    # ofertas nuevas otro mes más tarde y una del segundo mes reescrita con otra ciudad;
+    # el primer mes no cambia
+    write(engine, shifted(synthetic_rows(50, start=300), 124))
+    write(engine, [dict(later[0], location="Bilbao, Vizcaya")], update=True)
+    assert snapshot_version(out_dir) != data_version(engine)
+
+    n = export_snapshot(engine, out_dir, incremental=True)
+    assert snapshot_version(out_dir) == data_version(engine)
+    assert in_snapshot(out_dir) == by_month(engine)
+    assert n == len(by_month(engine))
+
+    # el mes sin cambios conserva sus ficheros (enlazados, no reescritos)
+    months = sorted({m for m, *_ in by_month(engine)})
+    assert len(months) == 3
+    kept = {p: i for p, i in files(out_dir).items() if p.startswith(f"month={months[0]}/")}
+    assert kept and all(before.get(p) == i for p, i in kept.items())
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM snapshot_dirty")).scalar() == 0
+    assert (out_dir / MANIFEST).exists()
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src import ingest as ingest_module
+from src.adzuna_client import AdzunaClient
+from src.adzuna_stub import EPOCH, serve
+from src.db import load_api_usage, load_watermarks
+from src.ingest import incremental_filters, ingest
+from src.rate_limit import utc_today
+
+# Ingesta incremental (src/ingest.py): la marca de agua de cada shard es el created más
+# reciente guardado, avanza sólo si no queda un hueco y no se toca si la cuota se agota.
+
+KEYWORDS = ["data analyst", "data engineer"]
+
+
+def spec(daily_limit: int = 0) -> dict:
+    return {"es": {"keywords": KEYWORDS, "rps": 0.0, "burst": 1.0, "daily_limit": daily_limit}}
+
+
+def created(seq: int) -> str:
+    # created de la oferta seq del stub
+    return (EPOCH + timedelta(hours=seq)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(total: int) -> str:
+        server, url = serve(total_per_keyword=total)
+        servers.append(server)
+        return url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def run(engine, url, daily_limit: int = 0) -> dict:
+    return ingest(10, incremental=True, spec=spec(daily_limit), workers=2, engine=engine, base_url=url,
+                  snapshot=False, archive=False)
+
+
+def test_incremental_filters():
+    now = datetime(2026, 3, 10, 12, tzinfo=timezone.utc)
+    filters = incremental_filters({("es", "a"): "2026-03-07T12:00:00Z"}, now, [("es", "a"), ("es", "b")])
+    assert filters[("es", "a")] == {"sort_by": "date", "max_days_old": 4}  # 3 días + 1 de margen
+    assert filters[("es", "b")] == {"sort_by": "date"}
+
+
+def test_watermark_advances_with_new_offers(engine, stub):
+    totals = run(engine, stub(120))
+    assert totals["inserted"] == 2 * 120
+    assert load_watermarks(engine) == {("es", kw): created(119) for kw in KEYWORDS}
+
+    # sin ofertas nuevas: nada que insertar y la marca no se mueve
+    totals = run(engine, stub(120))
+    assert totals["inserted"] == 0
+    assert load_watermarks(engine) == {("es", kw): created(119) for kw in KEYWORDS}
+
+    # 30 nuevas por keyword: se insertan sólo esas y la marca pasa a la más reciente
+    totals = run(engine, stub(150))
+    assert totals["inserted"] == 2 * 30
+    assert load_watermarks(engine) == {("es", kw): created(149) for kw in KEYWORDS}
+
+
+def test_watermark_kept_when_quota_runs_out(engine, stub):
+    run(engine, stub(60))
+    before = load_watermarks(engine)
+
+    # queda una sola petición para dos keywords (la cuota cuenta lo gastado hoy): el mercado
+    # se queda sin cuota y su marca no avanza, aunque una página sí llegue (quedaría un hueco
+    # en el otro keyword)
+    spent = load_api_usage(engine, utc_today().isoformat())["es"]
+    totals = run(engine, stub(200), daily_limit=spent + 1)
+    assert totals["inserted"] > 0
+    assert load_watermarks(engine) == before
+    assert load_api_usage(engine, utc_today().isoformat())["es"] == spent + 1
+
+
+def test_daily_budget_persists_across_runs(engine, stub):
+    url = stub(60)
+    run(engine, url, daily_limit=3)
+    assert load_api_usage(engine, utc_today().isoformat()) == {"es": 3}
+    # la siguiente ejecución del mismo día ya no tiene cuota
+    assert run(engine, url, daily_limit=3)["inserted"] == 0
+    assert load_api_usage(engine, utc_today().isoformat()) == {"es": 3}
+
+
+def test_client_closed_when_the_pipeline_fails(engine, stub, monkeypatch):
+    closed = []
+    monkeypatch.setattr(AdzunaClient, "close", lambda self: closed.append(self))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(ingest_module, "upsert_jobs", fail)
+    with pytest.raises(RuntimeError, match="disk full"):
+        run(engine, stub(40))
+    assert len(closed) == 1